@@ -22,6 +22,10 @@ def create_app(config_name=None):
     config_name = config_name or os.environ.get('FLASK_ENV', 'default')
     app.config.from_object(config[config_name])
     
+    # Keep uploaded files in memory instead of Werkzeug's temporary files
+    from app.ingest import IngestRequest
+    app.request_class = IngestRequest
+    
     # Ensure absolute paths for upload folders
     if not os.path.isabs(app.config['UPLOAD_FOLDER']):
         app.config['UPLOAD_FOLDER'] = os.path.join(project_root, app.config['UPLOAD_FOLDER'])
@@ -55,4 +59,17 @@ def create_app(config_name=None):
     from app.routes import main_bp  # Import main blueprint from routes
     app.register_blueprint(main_bp)  # Register the main blueprint with the app
     
+    # 51-60: Maintenance commands (flask --app main <command>)
+    @app.cli.command('migrate-images')
+    def migrate_images_command():
+        """Move images embedded in card documents into the image store"""
+        from app.mongo import migrate_card_images
+        migrate_card_images(on_progress=lambda stats: print(f"🖼️ Migrated {stats['migrated']} images..."))
+    
+    @app.cli.command('backfill-countries')
+    def backfill_countries_command():
+        """Resolve the country of cards stored without one (run once, or from cron after imports)"""
+        from app.mongo import backfill_card_countries
+        backfill_card_countries(on_progress=lambda stats: print(f"🌍 Checked {stats['checked']} cards..."))
+    
     return app  # Return configured Flask app instance
\ No newline at end of file
@@ -0,0 +1,109 @@
+# 1-10: Import modules
+import os
+import hashlib
+import tempfile
+import threading
+from dotenv import load_dotenv
+from gridfs import GridFSBucket
+from gridfs.errors import NoFile
+
+# 11-20: Load image store settings
+load_dotenv()
+IMAGE_STORE = os.getenv('IMAGE_STORE', 'gridfs').lower()  # gridfs or filesystem
+IMAGE_STORE_PATH = os.getenv('IMAGE_STORE_PATH', 'data/card_images')  # Outside static/, so images are only served by the card image routes
+IMAGE_BUCKET = 'card_images'
+REF_PREFIX = 'sha256:'
+
+def image_key(image_bytes):
+    """Content address of an image: its SHA-256 hex digest"""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+def image_mime_type(image_bytes):
+    """MIME type from the leading bytes of a PNG, JPEG or WEBP image"""
+    if image_bytes.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if image_bytes[:4] == b'RIFF' and image_bytes[8:12] == b'WEBP':
+        return 'image/webp'
+    return 'image/jpeg'
+
+def _ref_key(image_ref):
+    if not image_ref or not image_ref.startswith(REF_PREFIX):
+        raise ValueError(f"Invalid image reference: {image_ref}")
+    return image_ref[len(REF_PREFIX):]
+
+# 21-70: Content-addressed stores; identical images are stored once
+class GridFSImageStore:
+    """Images as GridFS files named by their hash, shared by every worker and host"""
+
+    def __init__(self, database):
+        self.bucket = GridFSBucket(database, bucket_name=IMAGE_BUCKET)
+        self.files = database[f'{IMAGE_BUCKET}.files']
+
+    def put(self, image_bytes):
+        key = image_key(image_bytes)
+        if not self.files.find_one({'filename': key}, {'_id': 1}):
+            self.bucket.upload_from_stream(key, image_bytes, metadata={'content_type': image_mime_type(image_bytes)})
+        return REF_PREFIX + key
+
+    def get(self, image_ref):
+        try:
+            return self.bucket.open_download_stream_by_name(_ref_key(image_ref)).read()
+        except NoFile:
+            return None
+
+    def delete(self, image_ref):
+        for entry in self.files.find({'filename': _ref_key(image_ref)}, {'_id': 1}):
+            self.bucket.delete(entry['_id'])
+
+class FileImageStore:
+    """Images as files under IMAGE_STORE_PATH/ab/cd/<hash>, written atomically"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def put(self, image_bytes):
+        key = image_key(image_bytes)
+        path = self._path(key)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(image_bytes)
+            os.replace(temp_path, path)
+        return REF_PREFIX + key
+
+    def get(self, image_ref):
+        try:
+            with open(self._path(_ref_key(image_ref)), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def delete(self, image_ref):
+        try:
+            os.remove(self._path(_ref_key(image_ref)))
+        except FileNotFoundError:
+            pass
+
+# 71-90: Process-wide store, recreated after a fork (gunicorn --preload)
+_store = None
+_store_pid = None
+_store_lock = threading.Lock()
+
+def get_image_store():
+    """Get the configured image store (IMAGE_STORE=gridfs or filesystem)"""
+    global _store, _store_pid
+    with _store_lock:
+        if _store is None or _store_pid != os.getpid():
+            if IMAGE_STORE == 'filesystem':
+                project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+                root = IMAGE_STORE_PATH if os.path.isabs(IMAGE_STORE_PATH) else os.path.join(project_root, IMAGE_STORE_PATH)
+                _store = FileImageStore(root)
+            else:
+                from app.mongo import collection
+                _store = GridFSImageStore(collection.database)
+            _store_pid = os.getpid()
+    return _store
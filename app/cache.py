@@ -0,0 +1,156 @@
+# 1-10: Import modules
+import os
+import hashlib
+import threading
+from datetime import datetime
+from pymongo import ASCENDING
+from dotenv import load_dotenv
+from app import mongo
+from app.mongo import increment_counters, get_counters
+
+# 11-20: Load cache settings
+load_dotenv()
+EXTRACTION_CACHE_ENABLED = os.getenv('EXTRACTION_CACHE_ENABLED', 'True').lower() == 'true'
+EXTRACTION_CACHE_TTL_DAYS = int(os.getenv('EXTRACTION_CACHE_TTL_DAYS', 90))
+EXTRACTION_CACHE_MAX_ENTRIES = int(os.getenv('EXTRACTION_CACHE_MAX_ENTRIES', 50000))
+CACHE_FIELDS = ['name', 'phone', 'email', 'company', 'country', 'flag']
+CACHE_COUNTER_NAME = 'extraction_cache'
+
+# Check the size bound every N writes instead of on every insert
+_TRIM_INTERVAL = 100
+_writes_since_trim = 0
+_indexes_ready = False
+_state_lock = threading.Lock()
+
+# 21-40: Cache keys and collection access
+def make_cache_key(image_bytes, prompt, model):
+    """
+    Build a cache key from the raw image bytes and the prompt/model version
+    """
+    image_hash = hashlib.sha256(image_bytes).hexdigest()
+    version_hash = hashlib.sha256(f"{model}\n{prompt}".encode('utf-8')).hexdigest()
+    return f"{version_hash[:16]}:{image_hash}"
+
+def _cache_collection():
+    """
+    Get the MongoDB cache collection shared by all gunicorn workers
+    Expired entries are removed by a TTL index on created_at
+    """
+    global _indexes_ready
+    cache_collection = mongo.collection.database['extraction_cache']
+
+    if not _indexes_ready:
+        with _state_lock:
+            if not _indexes_ready:
+                try:
+                    cache_collection.create_index([("created_at", ASCENDING)],
+                                                  expireAfterSeconds=EXTRACTION_CACHE_TTL_DAYS * 24 * 3600,
+                                                  name="cache_ttl_idx")
+                    cache_collection.create_index([("last_used_at", ASCENDING)], name="cache_last_used_idx")
+                except Exception as e:
+                    print(f"⚠️ Cache index creation warning: {str(e)}")
+                _indexes_ready = True
+
+    return cache_collection
+
+# 41-100: Cache lookups and writes
+def get_cached_extraction(cache_key):
+    """
+    Return the cached structured result for a key, or None on a miss
+    """
+    if not EXTRACTION_CACHE_ENABLED:
+        return None
+
+    try:
+        entry = _cache_collection().find_one_and_update(
+            {'_id': cache_key},
+            {'$set': {'last_used_at': datetime.now()}, '$inc': {'hits': 1}},
+            projection={'data': 1}
+        )
+
+        if entry:
+            increment_counters(CACHE_COUNTER_NAME, {'hits': 1})
+            print(f"⚡ Extraction cache hit: {cache_key[:24]}...")
+            return dict(entry['data'])
+
+        increment_counters(CACHE_COUNTER_NAME, {'misses': 1})
+        return None
+
+    except Exception as e:
+        print(f"❌ Error reading extraction cache: {str(e)}")
+        return None
+
+def store_cached_extraction(cache_key, data):
+    """
+    Store a structured result; empty extractions (failed API calls) are never cached
+    """
+    if not EXTRACTION_CACHE_ENABLED or not data:
+        return
+
+    if not any(str(data.get(field, '')).strip() for field in ['name', 'email', 'phone', 'company']):
+        return
+
+    try:
+        now = datetime.now()
+        _cache_collection().update_one(
+            {'_id': cache_key},
+            {
+                '$set': {'data': {field: data.get(field, '') for field in CACHE_FIELDS}, 'last_used_at': now},
+                '$setOnInsert': {'created_at': now, 'hits': 0}
+            },
+            upsert=True
+        )
+        increment_counters(CACHE_COUNTER_NAME, {'writes': 1})
+        _maybe_trim_cache()
+
+    except Exception as e:
+        print(f"❌ Error writing extraction cache: {str(e)}")
+
+def _maybe_trim_cache():
+    """
+    Evict least recently used entries once the cache grows past its size bound
+    """
+    global _writes_since_trim
+    with _state_lock:
+        _writes_since_trim += 1
+        if _writes_since_trim < _TRIM_INTERVAL:
+            return
+        _writes_since_trim = 0
+
+    cache_collection = _cache_collection()
+    excess = cache_collection.estimated_document_count() - EXTRACTION_CACHE_MAX_ENTRIES
+    if excess <= 0:
+        return
+
+    stale_ids = [entry['_id'] for entry in cache_collection.find({}, {'_id': 1})
+                 .sort('last_used_at', ASCENDING).limit(excess)]
+    result = cache_collection.delete_many({'_id': {'$in': stale_ids}})
+    increment_counters(CACHE_COUNTER_NAME, {'evictions': result.deleted_count})
+    print(f"🧹 Evicted {result.deleted_count} extraction cache entries")
+
+# 101-120: Cache statistics for monitoring
+def get_cache_stats():
+    """
+    Get hit/miss counters shared by all workers plus the current cache size
+    """
+    counters = get_counters(CACHE_COUNTER_NAME)
+    hits = counters.get('hits', 0)
+    misses = counters.get('misses', 0)
+    lookups = hits + misses
+
+    try:
+        entries = _cache_collection().estimated_document_count()
+    except Exception:
+        entries = None
+
+    return {
+        'enabled': EXTRACTION_CACHE_ENABLED,
+        'entries': entries,
+        'max_entries': EXTRACTION_CACHE_MAX_ENTRIES,
+        'ttl_days': EXTRACTION_CACHE_TTL_DAYS,
+        'hits': hits,
+        'misses': misses,
+        'writes': counters.get('writes', 0),
+        'evictions': counters.get('evictions', 0),
+        'hit_rate': round(hits / lookups, 3) if lookups else 0.0
+    }
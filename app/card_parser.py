@@ -0,0 +1,104 @@
+# 1-10: Import modules
+import re
+
+# 11-40: Field patterns
+EMAIL_RE = re.compile(r'[A-Za-z0-9._%+-]+\s?@\s?[A-Za-z0-9.-]+\.[A-Za-z]{2,}')
+PHONE_RE = re.compile(r'\+?\(?\d[\d\s().-]{5,}\d')
+WEBSITE_RE = re.compile(r'(?:https?://|www\.)[A-Za-z0-9.-]+\.[A-Za-z]{2,}\S*'
+                        r'|\b[A-Za-z0-9-]+\.(?:com|net|org|io|co|biz|info|in|uk|de|fr|ae|sg|au)(?:\.[a-z]{2})?\b', re.IGNORECASE)
+PHONE_LABEL_RE = re.compile(r'^\s*(?:tel|phone|ph|mob|mobile|cell|m|t|p|office|direct)\b\.?\s*[:.]?\s*', re.IGNORECASE)
+
+COMPANY_HINTS = {
+    'inc', 'inc.', 'ltd', 'ltd.', 'llc', 'llp', 'plc', 'gmbh', 'ag', 'sa', 'srl', 'bv', 'pvt', 'pvt.', 'pte',
+    'corp', 'corp.', 'corporation', 'company', 'co.', 'limited', 'group', 'holdings', 'industries',
+    'technologies', 'technology', 'solutions', 'systems', 'services', 'consulting', 'labs', 'enterprises',
+    'international', 'global', 'partners', 'associates', 'studio', 'agency', 'bank', 'university'
+}
+DESIGNATION_HINTS = {
+    'manager', 'director', 'ceo', 'cto', 'cfo', 'coo', 'founder', 'co-founder', 'engineer', 'head', 'president',
+    'officer', 'executive', 'consultant', 'lead', 'vp', 'vice', 'partner', 'specialist', 'analyst', 'architect',
+    'developer', 'designer', 'sales', 'marketing', 'owner', 'chairman', 'advisor', 'coordinator', 'associate'
+}
+ADDRESS_HINTS = {'street', 'st.', 'road', 'rd.', 'avenue', 'ave', 'floor', 'suite', 'building', 'po', 'box', 'nagar', 'sector'}
+
+# 41-60: Confidence weights per rule (multiplied by the OCR confidence of the source line)
+RULE_WEIGHTS = {
+    'pattern': 1.0,         # email/phone/website regex match
+    'company_hint': 0.9,    # line contains a company suffix such as Ltd or GmbH
+    'name_shape': 0.75,     # 2-4 capitalized words near the top of the card
+    'email_domain': 0.4     # company guessed from the email domain
+}
+
+def _words(text):
+    return [word.strip(',;:|').lower() for word in text.split()]
+
+def _is_contact_line(text):
+    return bool(EMAIL_RE.search(text) or WEBSITE_RE.search(text) or PHONE_RE.search(text))
+
+def _clean_phone(match):
+    phone = re.sub(r'\s+', ' ', match).strip(' .-')
+    digits = re.sub(r'\D', '', phone)
+    return phone if 7 <= len(digits) <= 15 else ''
+
+def _looks_like_name(text):
+    """Two to four alphabetic words, each starting with a capital letter"""
+    words = text.split()
+    if not 2 <= len(words) <= 4:
+        return False
+    if any(hint in _words(text) for hint in COMPANY_HINTS | DESIGNATION_HINTS | ADDRESS_HINTS):
+        return False
+    return all(re.fullmatch(r"[A-Z][A-Za-z.'-]*", word) for word in words)
+
+# 61-140: Rule-based field parsing
+def parse_card_lines(lines):
+    """
+    Parse visiting card fields from OCR text lines
+    lines is a list of (text, confidence) tuples in reading order, confidence in 0-100
+    Returns (fields, confidence) where confidence maps each found field to a 0-1 score
+    """
+    fields = {'name': '', 'phone': '', 'email': '', 'company': '', 'website': '', 'designation': ''}
+    confidence = {}
+
+    def found(field, value, line_conf, rule):
+        if value and not fields[field]:
+            fields[field] = value
+            confidence[field] = round(max(0.0, min(1.0, line_conf / 100.0)) * RULE_WEIGHTS[rule], 3)
+
+    lines = [(text.strip(), conf) for text, conf in lines if text and text.strip()]
+
+    # Contact details are the most regular, match them first
+    for text, conf in lines:
+        email = EMAIL_RE.search(text)
+        if email:
+            found('email', email.group(0).replace(' ', ''), conf, 'pattern')
+
+        website = WEBSITE_RE.search(text)
+        if website and not email:
+            found('website', website.group(0).rstrip('.,;'), conf, 'pattern')
+
+        if not email and not website:
+            for match in PHONE_RE.findall(PHONE_LABEL_RE.sub('', text)):
+                found('phone', _clean_phone(match), conf, 'pattern')
+
+    # Company, designation and name from the remaining free-text lines
+    free_lines = [(text, conf) for text, conf in lines if not _is_contact_line(text)]
+    for text, conf in free_lines:
+        words = _words(text)
+        if any(word in COMPANY_HINTS for word in words):
+            found('company', text, conf, 'company_hint')
+        elif any(word in DESIGNATION_HINTS for word in words) and len(words) <= 6:
+            found('designation', text, conf, 'name_shape')
+
+    for text, conf in free_lines:
+        if text not in (fields['company'], fields['designation']) and _looks_like_name(text):
+            found('name', text, conf, 'name_shape')
+            break
+
+    # Fall back to the email domain for the company name
+    if not fields['company'] and fields['email']:
+        domain = fields['email'].split('@')[-1].split('.')[0]
+        if domain.lower() not in ('gmail', 'yahoo', 'hotmail', 'outlook', 'icloud', 'aol', 'protonmail'):
+            found('company', domain.replace('-', ' ').title(),
+                  confidence['email'] * 100, 'email_domain')
+
+    return fields, confidence
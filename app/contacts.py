@@ -0,0 +1,80 @@
+# 1-10: Import modules
+import re
+import unicodedata
+from app.countries import CALLING_CODES, UNKNOWN_COUNTRY
+
+# Canonical contact keys stored next to the raw card fields, one index each
+CONTACT_KEY_FIELDS = ('email_norm', 'phone_norm', 'name_norm')
+
+# 11-30: Country to calling code lookup for national phone numbers
+COUNTRY_CALLING_CODES = {}
+for _prefix, _code in sorted(CALLING_CODES.items(), key=lambda entry: len(entry[0])):
+    COUNTRY_CALLING_CODES.setdefault(_code, _prefix)
+COUNTRY_CALLING_CODES.update({'CA': '1', 'KZ': '7'})  # Share +1 / +7 with the US / Russia
+
+E164_MIN_DIGITS = 7
+E164_MAX_DIGITS = 15
+_PHONE_SPLIT_RE = re.compile(r'[,;/|]|\s{3,}')
+_NAME_STRIP_RE = re.compile(r'[^\w\s]')
+_SPACES_RE = re.compile(r'\s+')
+
+# 31-90: Normalizers
+def normalize_email(email):
+    """Lowercased, trimmed email address; empty when it is not an address"""
+    email = (email or '').strip().lower()
+    return email if '@' in email else ''
+
+def normalize_phone(phone, country=''):
+    """
+    Digits-only E.164 form of the first number in a phone field ("+91 98765 43210" -> "919876543210")
+    National numbers get the calling code of the card's country (ISO code) with the trunk 0 dropped;
+    they are kept as bare digits when the country is unknown
+    """
+    phone = _PHONE_SPLIT_RE.split((phone or '').strip())[0].replace('(0)', '').strip()
+    digits = re.sub(r'\D', '', phone)
+
+    if phone.startswith('+'):
+        pass
+    elif digits.startswith('00'):
+        digits = digits[2:]
+    elif country and country != UNKNOWN_COUNTRY and country in COUNTRY_CALLING_CODES:
+        calling_code = COUNTRY_CALLING_CODES[country]
+        if calling_code == '1':
+            # NANP numbers are written with or without the leading 1
+            digits = digits if len(digits) == 11 and digits.startswith('1') else '1' + digits
+        else:
+            digits = calling_code + digits.lstrip('0')
+
+    return digits if E164_MIN_DIGITS <= len(digits) <= E164_MAX_DIGITS else ''
+
+def normalize_name(name):
+    """Case-folded, accent-stripped name with punctuation dropped and whitespace collapsed"""
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return _SPACES_RE.sub(' ', _NAME_STRIP_RE.sub(' ', stripped.casefold())).strip()
+
+def contact_keys(card):
+    """
+    Canonical duplicate-detection keys for a card dict
+    Returns {'email_norm', 'phone_norm', 'name_norm'}, empty strings for missing fields
+    """
+    return {
+        'email_norm': normalize_email(card.get('email')),
+        'phone_norm': normalize_phone(card.get('phone'), card.get('country', '')),
+        'name_norm': normalize_name(card.get('name'))
+    }
+
+def duplicate_clauses(keys):
+    """
+    Equality clauses that may identify the same contact: email or phone, or the name alone
+    for cards that carry neither. An email or phone hit is only the same contact when
+    names_compatible() agrees, since colleagues share switchboard numbers and info@ addresses
+    """
+    clauses = [{field: keys[field]} for field in ('email_norm', 'phone_norm') if keys.get(field)]
+    if not clauses and keys.get('name_norm'):
+        clauses.append({'name_norm': keys['name_norm']})
+    return clauses
+
+def names_compatible(keys, other):
+    """Whether two cards' contact keys can belong to one person: the same name, or no name on either side"""
+    return not keys.get('name_norm') or not other.get('name_norm') or keys['name_norm'] == other['name_norm']
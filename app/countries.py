@@ -0,0 +1,271 @@
+# 1-10: Import modules
+import re
+import unicodedata
+
+# pycountry supplies the full ISO 3166 name list; a built-in subset is used without it
+try:
+    import pycountry
+except ImportError:
+    pycountry = None
+
+UNKNOWN_COUNTRY = 'UNKNOWN'
+UNKNOWN_FLAG = '🌍'
+
+# 11-60: Static alias, city and calling-code tables
+FALLBACK_COUNTRIES = {
+    'AE': 'United Arab Emirates', 'AR': 'Argentina', 'AT': 'Austria', 'AU': 'Australia', 'BD': 'Bangladesh',
+    'BE': 'Belgium', 'BR': 'Brazil', 'CA': 'Canada', 'CH': 'Switzerland', 'CL': 'Chile', 'CN': 'China',
+    'CO': 'Colombia', 'CZ': 'Czechia', 'DE': 'Germany', 'DK': 'Denmark', 'EG': 'Egypt', 'ES': 'Spain',
+    'FI': 'Finland', 'FR': 'France', 'GB': 'United Kingdom', 'GR': 'Greece', 'HK': 'Hong Kong',
+    'ID': 'Indonesia', 'IE': 'Ireland', 'IL': 'Israel', 'IN': 'India', 'IT': 'Italy', 'JP': 'Japan',
+    'KE': 'Kenya', 'KR': 'South Korea', 'LK': 'Sri Lanka', 'MX': 'Mexico', 'MY': 'Malaysia', 'NG': 'Nigeria',
+    'NL': 'Netherlands', 'NO': 'Norway', 'NP': 'Nepal', 'NZ': 'New Zealand', 'PH': 'Philippines',
+    'PK': 'Pakistan', 'PL': 'Poland', 'PT': 'Portugal', 'QA': 'Qatar', 'RO': 'Romania', 'RU': 'Russia',
+    'SA': 'Saudi Arabia', 'SE': 'Sweden', 'SG': 'Singapore', 'TH': 'Thailand', 'TR': 'Turkey',
+    'TW': 'Taiwan', 'UA': 'Ukraine', 'US': 'United States', 'VN': 'Vietnam', 'ZA': 'South Africa'
+}
+
+EXTRA_ALIASES = {
+    'usa': 'US', 'u.s.a.': 'US', 'u.s.': 'US', 'america': 'US', 'united states of america': 'US',
+    'uk': 'GB', 'u.k.': 'GB', 'britain': 'GB', 'great britain': 'GB', 'england': 'GB', 'scotland': 'GB',
+    'wales': 'GB', 'northern ireland': 'GB', 'uae': 'AE', 'u.a.e.': 'AE', 'emirates': 'AE',
+    'south korea': 'KR', 'korea': 'KR', 'north korea': 'KP', 'russia': 'RU', 'iran': 'IR', 'vietnam': 'VN',
+    'czech republic': 'CZ', 'holland': 'NL', 'deutschland': 'DE', 'espana': 'ES', 'turkiye': 'TR',
+    'taiwan': 'TW', 'syria': 'SY', 'laos': 'LA', 'bolivia': 'BO', 'venezuela': 'VE', 'tanzania': 'TZ',
+    'moldova': 'MD', 'ksa': 'SA', 'prc': 'CN', 'bharat': 'IN', 'hindustan': 'IN', 'nippon': 'JP'
+}
+
+# Business hubs that commonly appear in card addresses without the country name
+CITY_ALIASES = {
+    'new york': 'US', 'san francisco': 'US', 'los angeles': 'US', 'chicago': 'US', 'seattle': 'US',
+    'boston': 'US', 'austin': 'US', 'silicon valley': 'US', 'london': 'GB', 'manchester': 'GB',
+    'mumbai': 'IN', 'bombay': 'IN', 'new delhi': 'IN', 'delhi': 'IN', 'bangalore': 'IN', 'bengaluru': 'IN',
+    'hyderabad': 'IN', 'chennai': 'IN', 'pune': 'IN', 'kolkata': 'IN', 'gurgaon': 'IN', 'gurugram': 'IN',
+    'noida': 'IN', 'ahmedabad': 'IN', 'dubai': 'AE', 'abu dhabi': 'AE', 'sharjah': 'AE', 'riyadh': 'SA',
+    'jeddah': 'SA', 'doha': 'QA', 'toronto': 'CA', 'vancouver': 'CA', 'montreal': 'CA', 'sydney': 'AU',
+    'melbourne': 'AU', 'berlin': 'DE', 'munich': 'DE', 'frankfurt': 'DE', 'hamburg': 'DE', 'paris': 'FR',
+    'amsterdam': 'NL', 'rotterdam': 'NL', 'zurich': 'CH', 'geneva': 'CH', 'tokyo': 'JP', 'osaka': 'JP',
+    'shanghai': 'CN', 'beijing': 'CN', 'shenzhen': 'CN', 'seoul': 'KR', 'karachi': 'PK', 'lahore': 'PK',
+    'dhaka': 'BD', 'colombo': 'LK', 'kathmandu': 'NP', 'kuala lumpur': 'MY', 'jakarta': 'ID',
+    'bangkok': 'TH', 'manila': 'PH', 'istanbul': 'TR', 'moscow': 'RU', 'madrid': 'ES', 'barcelona': 'ES',
+    'milan': 'IT', 'rome': 'IT', 'stockholm': 'SE', 'oslo': 'NO', 'copenhagen': 'DK', 'helsinki': 'FI',
+    'dublin': 'IE', 'lisbon': 'PT', 'warsaw': 'PL', 'vienna': 'AT', 'brussels': 'BE', 'cairo': 'EG',
+    'lagos': 'NG', 'nairobi': 'KE', 'johannesburg': 'ZA', 'cape town': 'ZA', 'sao paulo': 'BR',
+    'mexico city': 'MX', 'buenos aires': 'AR', 'tel aviv': 'IL', 'auckland': 'NZ', 'atlanta': 'US',
+    'dallas': 'US', 'houston': 'US', 'miami': 'US', 'denver': 'US', 'washington dc': 'US'
+}
+
+# US states, so "Newark, New Jersey" is not read as Jersey and "Santa Fe, New Mexico" as Mexico
+US_STATES = (
+    'alabama', 'alaska', 'arizona', 'arkansas', 'california', 'colorado', 'connecticut', 'delaware', 'florida',
+    'hawaii', 'idaho', 'illinois', 'indiana', 'iowa', 'kansas', 'kentucky', 'louisiana', 'maine', 'maryland',
+    'massachusetts', 'michigan', 'minnesota', 'mississippi', 'missouri', 'montana', 'nebraska', 'nevada',
+    'new hampshire', 'new jersey', 'new mexico', 'new york', 'north carolina', 'north dakota', 'ohio', 'oklahoma',
+    'oregon', 'pennsylvania', 'rhode island', 'south carolina', 'south dakota', 'tennessee', 'texas', 'utah',
+    'vermont', 'virginia', 'washington', 'west virginia', 'wisconsin', 'wyoming'
+)
+
+# Country names that are also places elsewhere; in an address they only count when nothing else does
+WEAK_ADDRESS_TOKENS = {'georgia', 'jersey'}
+
+# ITU-T E.164 country calling codes; +1 defaults to the US, Canadian area codes are listed
+CALLING_CODES = {
+    '1': 'US', '7': 'RU', '76': 'KZ', '77': 'KZ', '20': 'EG', '27': 'ZA', '30': 'GR', '31': 'NL', '32': 'BE',
+    '33': 'FR', '34': 'ES', '36': 'HU', '39': 'IT', '40': 'RO', '41': 'CH', '43': 'AT', '44': 'GB', '45': 'DK',
+    '46': 'SE', '47': 'NO', '48': 'PL', '49': 'DE', '51': 'PE', '52': 'MX', '53': 'CU', '54': 'AR', '55': 'BR',
+    '56': 'CL', '57': 'CO', '58': 'VE', '60': 'MY', '61': 'AU', '62': 'ID', '63': 'PH', '64': 'NZ', '65': 'SG',
+    '66': 'TH', '81': 'JP', '82': 'KR', '84': 'VN', '86': 'CN', '90': 'TR', '91': 'IN', '92': 'PK', '93': 'AF',
+    '94': 'LK', '95': 'MM', '98': 'IR', '211': 'SS', '212': 'MA', '213': 'DZ', '216': 'TN', '218': 'LY',
+    '220': 'GM', '221': 'SN', '225': 'CI', '233': 'GH', '234': 'NG', '237': 'CM', '244': 'AO', '249': 'SD',
+    '250': 'RW', '251': 'ET', '254': 'KE', '255': 'TZ', '256': 'UG', '260': 'ZM', '263': 'ZW', '264': 'NA',
+    '267': 'BW', '351': 'PT', '352': 'LU', '353': 'IE', '354': 'IS', '355': 'AL', '356': 'MT', '357': 'CY',
+    '358': 'FI', '359': 'BG', '370': 'LT', '371': 'LV', '372': 'EE', '373': 'MD', '374': 'AM', '375': 'BY',
+    '380': 'UA', '381': 'RS', '382': 'ME', '385': 'HR', '386': 'SI', '387': 'BA', '389': 'MK', '420': 'CZ',
+    '421': 'SK', '423': 'LI', '852': 'HK', '853': 'MO', '855': 'KH', '856': 'LA', '880': 'BD', '886': 'TW',
+    '960': 'MV', '961': 'LB', '962': 'JO', '963': 'SY', '964': 'IQ', '965': 'KW', '966': 'SA', '967': 'YE',
+    '968': 'OM', '970': 'PS', '971': 'AE', '972': 'IL', '973': 'BH', '974': 'QA', '975': 'BT', '976': 'MN',
+    '977': 'NP', '992': 'TJ', '993': 'TM', '994': 'AZ', '995': 'GE', '996': 'KG', '998': 'UZ'
+}
+CANADA_AREA_CODES = ['204', '226', '236', '249', '250', '289', '306', '343', '365', '403', '416', '418', '431',
+                     '437', '438', '450', '506', '514', '519', '548', '579', '581', '587', '604', '613', '639',
+                     '647', '672', '705', '709', '778', '780', '782', '807', '819', '825', '867', '873', '902', '905']
+
+# Legal-form suffixes that point to one country. Forms used in several countries (Ltd, LLP, LLC,
+# Inc, AG) and bare forms that are also words ("spa", "as", "ab") are left out; those only count
+# in their dotted or written-out spelling
+COMPANY_SUFFIXES = {
+    'pvt ltd': 'IN', 'pvt. ltd': 'IN', 'private limited': 'IN', 'gmbh': 'DE', 'sarl': 'FR', 's.a.r.l.': 'FR',
+    's.a.s.': 'FR', 's.p.a.': 'IT', 's.r.l.': 'IT', 'b.v.': 'NL', 'n.v.': 'NL', 'pty ltd': 'AU',
+    'pty. ltd': 'AU', 'pte ltd': 'SG', 'pte. ltd': 'SG', 'sdn bhd': 'MY', 'sdn. bhd': 'MY', 'k.k.': 'JP',
+    'oyj': 'FI', 'a/s': 'DK', 'sp. z o.o.': 'PL'
+}
+
+# Country-code TLDs that are sold as generic domains and say nothing about the country
+VANITY_TLDS = {'ai', 'am', 'cc', 'co', 'fm', 'gg', 'io', 'ly', 'me', 'nu', 'sh', 'so', 'to', 'tv', 'vc', 'ws'}
+
+MAX_NGRAM = 4  # Longest alias in words ("united states of america")
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9.'&/-]*")
+
+# 61-130: Index construction (once at import)
+def _normalize(text):
+    """Lowercase, strip accents and collapse whitespace"""
+    text = unicodedata.normalize('NFKD', str(text or '')).encode('ascii', 'ignore').decode()
+    return ' '.join(text.lower().replace(',', ' ').split())
+
+def flag_for_code(code):
+    """Flag emoji from an ISO 3166-1 alpha-2 code"""
+    if not code or len(code) != 2 or not code.isalpha():
+        return UNKNOWN_FLAG
+    return ''.join(chr(0x1F1E6 + ord(char) - ord('A')) for char in code.upper())
+
+def _build_indexes():
+    names, aliases = {}, {}
+    if pycountry is not None:
+        for country in pycountry.countries:
+            names[country.alpha_2] = getattr(country, 'common_name', None) or country.name
+            for name in (country.name, getattr(country, 'common_name', None), getattr(country, 'official_name', None)):
+                if name:
+                    aliases[_normalize(name)] = country.alpha_2
+            # "Korea, Republic of" is also written "Republic of Korea"
+            if ', ' in country.name:
+                head, tail = country.name.split(', ', 1)
+                aliases[_normalize(f"{tail} {head}")] = country.alpha_2
+    else:
+        names.update(FALLBACK_COUNTRIES)
+        aliases.update({_normalize(name): code for code, name in FALLBACK_COUNTRIES.items()})
+
+    aliases.update(EXTRA_ALIASES)
+    # Prefer the everyday names ("Russia", "Turkey") for display
+    names.update(FALLBACK_COUNTRIES)
+
+    # ISO codes only count when they are the whole field ("IN" is also an English word)
+    codes = {code.lower(): code for code in names}
+    if pycountry is not None:
+        codes.update({country.alpha_3.lower(): country.alpha_2 for country in pycountry.countries})
+
+    # Token index over names, cities and US states for free address text
+    tokens = {alias.strip('.'): code for alias, code in aliases.items()}
+    tokens.update({state: 'US' for state in US_STATES})
+    tokens.update(CITY_ALIASES)
+    return names, aliases, codes, tokens
+
+def _build_trie(prefixes):
+    trie = {}
+    for prefix, code in prefixes.items():
+        node = trie
+        for digit in prefix:
+            node = node.setdefault(digit, {})
+        node['code'] = code
+    return trie
+
+COUNTRY_NAMES, COUNTRY_ALIASES, COUNTRY_CODES, ADDRESS_TOKENS = _build_indexes()
+# Token lookups drop trailing dots ("s.p.a." is matched as "s.p.a")
+COMPANY_SUFFIX_INDEX = {suffix.rstrip('.'): code for suffix, code in COMPANY_SUFFIXES.items()}
+TLD_COUNTRIES = dict({code.lower(): code for code in COUNTRY_NAMES}, uk='GB')
+CALLING_CODE_TRIE = _build_trie(dict(CALLING_CODES, **{f"1{area}": 'CA' for area in CANADA_AREA_CODES}))
+
+# 131-220: Lookups
+def country_from_name(text):
+    """Exact alias or ISO code match on a whole country field"""
+    key = _normalize(text).strip('. ')
+    return COUNTRY_ALIASES.get(key) or COUNTRY_CODES.get(key)
+
+def country_from_text(text):
+    """
+    Scan free text (e.g. an address) for country names, cities and US states, longest phrase first
+    Returns the last country mentioned, which on cards is usually the country line; names that
+    are also places elsewhere (WEAK_ADDRESS_TOKENS) only count when nothing else is mentioned
+    """
+    words = _TOKEN_RE.findall(_normalize(text))
+    found = weak = None
+    i = 0
+    while i < len(words):
+        for size in range(min(MAX_NGRAM, len(words) - i), 0, -1):
+            phrase = ' '.join(words[i:i + size]).strip('.')
+            code = ADDRESS_TOKENS.get(phrase)
+            if code:
+                if phrase in WEAK_ADDRESS_TOKENS:
+                    weak = code
+                else:
+                    found = code
+                i += size
+                break
+        else:
+            i += 1
+    return found or weak
+
+def country_from_phone(phone):
+    """
+    Longest E.164 calling-code prefix of an international number (+CC or 00CC)
+    Local numbers without a country code return None
+    """
+    phone = str(phone or '').strip()
+    if phone.startswith('+'):
+        digits = re.sub(r'\D', '', phone)
+    elif phone.startswith('00'):
+        digits = re.sub(r'\D', '', phone)[2:]
+    else:
+        return None
+
+    node, code = CALLING_CODE_TRIE, None
+    for digit in digits[:4]:
+        node = node.get(digit)
+        if node is None:
+            break
+        code = node.get('code', code)
+    return code
+
+def country_from_domain(email='', website=''):
+    """
+    Country of the country-code TLD of an email or website domain ("acme.co.uk" is GB)
+    Generic TLDs and ccTLDs sold as vanity domains (.io, .co, .ai) return None
+    """
+    for address in (email, website):
+        address = str(address or '').strip().lower()
+        if not address:
+            continue
+        domain = address.rsplit('@', 1)[-1] if '@' in address else re.sub(r'^[a-z]+://', '', address)
+        tld = domain.split('/')[0].split(':')[0].rstrip('.').rsplit('.', 1)[-1]
+        if tld not in VANITY_TLDS and tld in TLD_COUNTRIES:
+            return TLD_COUNTRIES[tld]
+    return None
+
+def country_from_company(company):
+    """Country implied by the legal-form suffix at the end of a company name"""
+    words = _TOKEN_RE.findall(_normalize(company))
+    for size in (3, 2, 1):
+        if len(words) >= size:
+            code = COMPANY_SUFFIX_INDEX.get(' '.join(words[-size:]).rstrip('.'))
+            if code:
+                return code
+    return None
+
+def resolve_country(country='', phone='', address='', company='', email='', website=''):
+    """
+    Resolve a card's country from the strongest available evidence:
+    the extracted country field, then the phone calling code, then the email or website
+    country-code domain, then address text, then the company legal form.
+    Returns {'country': ISO code or 'UNKNOWN', 'name', 'flag', 'source'}
+    """
+    evidence = (
+        ('country_field', lambda: country_from_name(country) or country_from_text(country)),
+        ('phone_prefix', lambda: country_from_phone(phone)),
+        ('email_domain', lambda: country_from_domain(email, website)),
+        ('address', lambda: country_from_text(address)),
+        ('company_suffix', lambda: country_from_company(company)),
+    )
+    for source, lookup in evidence:
+        code = lookup()
+        if code:
+            return {'country': code, 'name': COUNTRY_NAMES.get(code, code), 'flag': flag_for_code(code), 'source': source}
+
+    return {'country': UNKNOWN_COUNTRY, 'name': 'Unknown', 'flag': UNKNOWN_FLAG, 'source': 'none'}
+
+def resolve_card_country(card):
+    """Resolve the country for a card dict, ignoring a stored 'UNKNOWN' placeholder"""
+    country = card.get('country') or ''
+    if country == UNKNOWN_COUNTRY:
+        country = ''
+    return resolve_country(country=country, phone=card.get('phone') or '', address=card.get('address') or '',
+                           company=card.get('company') or '', email=card.get('email') or '',
+                           website=card.get('website') or '')
@@ -0,0 +1,269 @@
+# 1-10: Import modules
+import os
+import re
+import zlib
+from difflib import SequenceMatcher
+import numpy as np
+from dotenv import load_dotenv
+from app.countries import COMPANY_SUFFIXES
+from app.contacts import contact_keys, normalize_name
+from app.mongo import MERGE_FIELDS
+
+# 11-30: Load fuzzy dedup settings
+load_dotenv()
+DEDUP_BANDS = int(os.getenv('DEDUP_BANDS', 24))
+DEDUP_ROWS = int(os.getenv('DEDUP_ROWS', 3))
+DEDUP_MATCH_THRESHOLD = float(os.getenv('DEDUP_MATCH_THRESHOLD', 0.8))
+DEDUP_MIN_NAME_SIMILARITY = float(os.getenv('DEDUP_MIN_NAME_SIMILARITY', 0.7))
+# Buckets larger than this (very common names) are skipped rather than compared pairwise
+DEDUP_MAX_BUCKET = int(os.getenv('DEDUP_MAX_BUCKET', 200))
+
+SHINGLE_SIZE = 3
+# Score weights; an identical email or phone is strong evidence on its own
+SCORE_WEIGHTS = {'name': 0.55, 'company': 0.3, 'email': 0.15}
+EXACT_CONTACT_SCORE = 0.95
+# Words that say nothing about which company it is
+COMPANY_STOPWORDS = {'the', 'and', 'co', 'company', 'ltd', 'limited', 'corp', 'corporation', 'incorporated',
+                     'group', 'plc', 'private', 'pvt', 'llc', 'inc'} | set(COMPANY_SUFFIXES)
+FREE_EMAIL_DOMAINS = {'gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'live.com', 'icloud.com',
+                      'aol.com', 'protonmail.com', 'rediffmail.com', 'yahoo.co.in', 'example.com'}
+
+# MinHash permutations h(x) = (a*x + b) mod p over 32-bit shingle hashes; a < 2^31 keeps a*x inside uint64
+_HASH_PRIME = np.uint64(4294967311)
+_rng = np.random.RandomState(20240517)
+_PERM_A = _rng.randint(1, 2 ** 31, size=DEDUP_BANDS * DEDUP_ROWS).astype(np.uint64)
+_PERM_B = _rng.randint(0, 2 ** 31, size=DEDUP_BANDS * DEDUP_ROWS).astype(np.uint64)
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+# 31-80: Card features and shingles
+def normalize_company(company):
+    """Company name without legal forms and filler words ("ACME Inc." -> "acme")"""
+    words = _WORD_RE.findall(normalize_name(company))
+    return ' '.join(word for word in words if word not in COMPANY_STOPWORDS)
+
+def card_features(card):
+    """The normalized fields fuzzy matching looks at"""
+    keys = {field: card.get(field) for field in ('email_norm', 'phone_norm', 'name_norm')}
+    if keys['name_norm'] is None:
+        keys = contact_keys(card)
+    local, _, domain = (keys['email_norm'] or '').partition('@')
+    return {
+        'id': card['id'],
+        'name': keys['name_norm'] or '',
+        'company': normalize_company(card.get('company')),
+        'email': keys['email_norm'] or '',
+        'email_local': local,
+        'email_domain': domain if domain not in FREE_EMAIL_DOMAINS else '',
+        'phone': keys['phone_norm'] or ''
+    }
+
+def _char_shingles(text, prefix):
+    padded = f" {text} "
+    if len(padded) <= SHINGLE_SIZE:
+        return {prefix + padded}
+    return {prefix + padded[i:i + SHINGLE_SIZE] for i in range(len(padded) - SHINGLE_SIZE + 1)}
+
+def card_shingles(features):
+    """Character 3-grams of name, company and email local part, plus the company email domain"""
+    shingles = set()
+    if features['name']:
+        shingles |= _char_shingles(features['name'], 'n:')
+    if features['company']:
+        shingles |= _char_shingles(features['company'], 'c:')
+    if features['email_local']:
+        shingles |= _char_shingles(features['email_local'], 'e:')
+    if features['email_domain']:
+        shingles.add('d:' + features['email_domain'])
+    return shingles
+
+# 81-120: MinHash signatures and LSH banding
+def minhash_signature(shingles):
+    """MinHash signature (DEDUP_BANDS * DEDUP_ROWS values) of a shingle set"""
+    hashes = np.fromiter((zlib.crc32(shingle.encode()) for shingle in shingles), dtype=np.uint64, count=len(shingles))
+    return ((_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _HASH_PRIME).min(axis=1)
+
+class LSHIndex:
+    """
+    Banded LSH buckets over MinHash signatures. Cards whose signatures agree on every row
+    of at least one band become candidate pairs; with 24 bands of 3 rows a pair with
+    Jaccard similarity 0.5 is caught ~96% of the time, one at 0.2 ~17%.
+    """
+
+    def __init__(self, bands=DEDUP_BANDS, rows=DEDUP_ROWS):
+        self.bands = bands
+        self.rows = rows
+        self.buckets = {}
+
+    def add(self, card_id, signature):
+        for band in range(self.bands):
+            key = (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            self.buckets.setdefault(key, []).append(card_id)
+
+    def candidate_pairs(self, max_bucket=DEDUP_MAX_BUCKET):
+        """Unique (smaller id, larger id) pairs sharing a bucket"""
+        pairs = set()
+        for members in self.buckets.values():
+            if len(members) < 2 or len(members) > max_bucket:
+                continue
+            for i in range(len(members)):
+                for j in range(i + 1, len(members)):
+                    pair = (members[i], members[j]) if members[i] < members[j] else (members[j], members[i])
+                    pairs.add(pair)
+        return pairs
+
+# 121-160: Pair scoring
+def _similarity(a, b):
+    if not a or not b:
+        return None
+    return 1.0 if a == b else SequenceMatcher(None, a, b).ratio()
+
+def score_pair(a, b):
+    """
+    Similarity of two card feature dicts in [0, 1]
+    Missing fields count as neutral (0.5); an identical email or phone lifts the score
+    when the names agree reasonably
+    """
+    name = _similarity(a['name'], b['name'])
+    if name is None:
+        return 0.0
+    company = _similarity(a['company'], b['company'])
+    if a['email'] and a['email'] == b['email']:
+        email = 1.0
+    elif a['email_domain'] and a['email_domain'] == b['email_domain']:
+        email = 0.5
+    else:
+        email = 0.0 if a['email'] and b['email'] else 0.5
+
+    score = (SCORE_WEIGHTS['name'] * name
+             + SCORE_WEIGHTS['company'] * (0.5 if company is None else company)
+             + SCORE_WEIGHTS['email'] * email)
+    exact_contact = (a['email'] and a['email'] == b['email']) or (a['phone'] and a['phone'] == b['phone'])
+    if exact_contact and name >= 0.5:
+        score = max(score, EXACT_CONTACT_SCORE)
+    return score if name >= DEDUP_MIN_NAME_SIMILARITY or exact_contact else 0.0
+
+# 161-200: Union-find clustering
+class UnionFind:
+    """Disjoint sets over card IDs with path halving and union by size"""
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def find(self, item):
+        self.parent.setdefault(item, item)
+        self.size.setdefault(item, 1)
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+
+    def groups(self):
+        clusters = {}
+        for item in self.parent:
+            clusters.setdefault(self.find(item), []).append(item)
+        return [sorted(members) for members in clusters.values() if len(members) > 1]
+
+def find_clusters(cards, threshold=DEDUP_MATCH_THRESHOLD, on_progress=None):
+    """
+    Group an iterable of card dicts (name, company, email, phone and their *_norm keys, no images)
+    into clusters of probable duplicates
+    on_progress(scanned) is called every 1000 cards
+    Returns (clusters, stats): clusters sorted lists of card IDs, stats scanned/candidates/matched counts
+    """
+    index = LSHIndex()
+    features = {}
+    scanned = 0
+    for card in cards:
+        scanned += 1
+        card_feature = card_features(card)
+        shingles = card_shingles(card_feature)
+        if shingles:
+            features[card['id']] = card_feature
+            index.add(card['id'], minhash_signature(shingles))
+        if on_progress and scanned % 1000 == 0:
+            on_progress(scanned)
+
+    candidates = index.candidate_pairs()
+    union_find = UnionFind()
+    matched = 0
+    for a, b in candidates:
+        if score_pair(features[a], features[b]) >= threshold:
+            union_find.union(a, b)
+            matched += 1
+
+    clusters = sorted(union_find.groups())
+    return clusters, {'scanned': scanned, 'candidates': len(candidates), 'matched_pairs': matched}
+
+# 201-260: Merge planning
+def _completeness(record):
+    return sum(1 for field in MERGE_FIELDS if record.get(field))
+
+def plan_merge(records):
+    """
+    Plan merging a cluster of stored cards (without images) into its most complete card, oldest first on ties
+    Returns {'survivor', 'removed', 'update', 'label_changes'} or None when fewer than two cards remain;
+    label_changes maps label_id -> card count change
+    """
+    if len(records) < 2:
+        return None
+
+    records = sorted(records, key=lambda record: record['id'])
+    survivor = max(records, key=lambda record: (_completeness(record), -record['id']))
+    others = [record for record in records if record is not survivor]
+
+    # Fill the survivor's empty fields from the other cards, oldest first
+    fill = {}
+    for record in others:
+        for field in MERGE_FIELDS:
+            if record.get(field) and not survivor.get(field) and field not in fill:
+                fill[field] = record[field]
+    if 'country' in fill:
+        donor = next(record for record in others if record.get('country') == fill['country'])
+        fill['flag'] = donor.get('flag', '🌍')
+        fill['country_source'] = donor.get('country_source', 'none')
+
+    # Keep one label on the survivor; every label and event seen stays in its history
+    label_changes = {}
+    for record in others:
+        if record.get('label_id') is not None:
+            label_changes[record['label_id']] = label_changes.get(record['label_id'], 0) - 1
+    if survivor.get('label_id') is None:
+        labelled = next((record for record in others if record.get('label_id') is not None), None)
+        if labelled:
+            fill.update({'label_id': labelled['label_id'], 'label_name': labelled.get('label_name'), 'is_sorted': True})
+            label_changes[labelled['label_id']] += 1
+
+    labels = [{'label_id': record['label_id'], 'label_name': record.get('label_name')}
+              for record in records if record.get('label_id') is not None]
+    events = [{field: record.get(field, '') for field in ('event_name', 'event_date', 'event_location', 'event_host')}
+              for record in records if record.get('event_name')]
+    merged_from = [{field: record.get(field) for field in ('id', 'filename', 'name', 'company', 'email', 'phone',
+                                                              'label_id', 'label_name', 'event_name', 'timestamp')}
+                   for record in others]
+
+    fill.update(contact_keys({**survivor, **fill}))
+    update = {'$set': fill, '$push': {'merged_from': {'$each': merged_from}}}
+    add_to_set = {}
+    if labels:
+        add_to_set['label_history'] = {'$each': labels}
+    if events:
+        add_to_set['event_history'] = {'$each': events}
+    if add_to_set:
+        update['$addToSet'] = add_to_set
+
+    return {
+        'survivor': survivor['id'],
+        'removed': [record['id'] for record in others],
+        'update': update,
+        'label_changes': {label_id: change for label_id, change in label_changes.items() if change}
+    }
@@ -0,0 +1,283 @@
+# 1-10: Import modules
+import os
+import hashlib
+import threading
+from contextlib import nullcontext
+from dotenv import load_dotenv
+from app.preprocess import preprocess_image_array
+from app.card_parser import parse_card_lines
+from app.ocr import (preprocess_image, extraction_cache_key, extract_data_from_preprocessed, get_country_flag,
+                     GEMINI_MODEL, EXTRACTION_PROMPT)
+from app.cache import make_cache_key, get_cached_extraction, store_cached_extraction
+from app.mongo import increment_counters, get_counters
+
+# Local OCR is optional; the Tesseract engine reports itself unavailable without it
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
+# 11-20: Load engine selection settings
+load_dotenv()
+OCR_ENGINE = os.getenv('OCR_ENGINE', 'gemini').lower()
+TESSERACT_LANG = os.getenv('TESSERACT_LANG', 'eng')
+TESSERACT_CONFIG = os.getenv('TESSERACT_CONFIG', '--oem 1 --psm 3')
+TESSERACT_LONG_EDGE = int(os.getenv('TESSERACT_LONG_EDGE', 2000))
+TIERED_MIN_CONFIDENCE = float(os.getenv('TIERED_MIN_CONFIDENCE', 0.6))
+TIERED_REQUIRED_FIELDS = ['name', 'email', 'phone', 'company']
+TIER_COUNTER_NAME = 'extraction_tiers'
+
+# Bump when the rule-based parser changes so cached local results are not reused
+LOCAL_PARSER_VERSION = 1
+
+class EngineUnavailableError(Exception):
+    """Raised when an unknown or unavailable OCR engine is requested"""
+
+# 21-60: Engine interface
+class OCREngine:
+    """
+    One way of turning a card image into structured data.
+    Extraction is split into preprocess() and extract_preprocessed() so upload jobs can
+    report both stages; extract() runs both and goes through the shared extraction cache.
+    """
+    name = ''
+    uses_api = False  # API engines take an in-flight slot from the extraction engine
+
+    def available(self):
+        return True
+
+    def cache_key(self, image_bytes):
+        """Cache key for an image, or None when results should not be cached"""
+        return None
+
+    def preprocess(self, image_bytes):
+        raise NotImplementedError
+
+    def extract_preprocessed(self, preprocessed):
+        raise NotImplementedError
+
+    def slot(self, extraction_engine):
+        """Context manager to hold while extract_preprocessed() runs"""
+        return extraction_engine.limit() if self.uses_api else nullcontext()
+
+    def extract(self, image_bytes):
+        """Extract structured data from raw image bytes, served from the cache when possible"""
+        cache_key = self.cache_key(image_bytes)
+        if cache_key:
+            cached_data = get_cached_extraction(cache_key)
+            if cached_data is not None:
+                return cached_data
+
+        data = self.extract_preprocessed(self.preprocess(image_bytes))
+        if cache_key:
+            store_cached_extraction(cache_key, data)
+        return data
+
+# 61-80: Gemini Vision API engine
+class GeminiEngine(OCREngine):
+    name = 'gemini'
+    uses_api = True
+
+    def cache_key(self, image_bytes):
+        return extraction_cache_key(image_bytes)
+
+    def preprocess(self, image_bytes):
+        return preprocess_image(image_bytes)
+
+    def extract_preprocessed(self, preprocessed):
+        return extract_data_from_preprocessed(preprocessed)
+
+# 81-150: Local Tesseract engine with rule-based field parsing
+class TesseractEngine(OCREngine):
+    name = 'tesseract'
+
+    def __init__(self, lang=TESSERACT_LANG, config=TESSERACT_CONFIG, long_edge=TESSERACT_LONG_EDGE):
+        self.lang = lang
+        self.config = config
+        self.long_edge = long_edge
+        self._available = None
+        self._lock = threading.Lock()
+
+    def available(self):
+        """pytesseract is installed and the tesseract binary can be run"""
+        with self._lock:
+            if self._available is None:
+                self._available = False
+                if pytesseract is not None:
+                    try:
+                        print(f"🔤 Tesseract {pytesseract.get_tesseract_version()} available for local OCR")
+                        self._available = True
+                    except Exception as e:
+                        print(f"⚠️ Tesseract binary not usable: {str(e)}")
+            return self._available
+
+    def cache_key(self, image_bytes):
+        settings = f"tesseract:{self.lang}:{self.config}:{self.long_edge}:parser-v{LOCAL_PARSER_VERSION}"
+        return make_cache_key(image_bytes, settings, 'tesseract')
+
+    def preprocess(self, image_bytes):
+        # Tesseract reads the grayscale array directly, no need to re-encode
+        return preprocess_image_array(image_bytes, self.long_edge)
+
+    def read_lines(self, gray):
+        """
+        Run Tesseract on a grayscale array
+        Returns a list of (text, confidence) tuples, one per detected text line in reading order
+        """
+        if not self.available():
+            raise EngineUnavailableError('Tesseract OCR is not installed')
+
+        data = pytesseract.image_to_data(gray, lang=self.lang, config=self.config, output_type=pytesseract.Output.DICT)
+
+        lines = {}
+        for i, word in enumerate(data['text']):
+            word = (word or '').strip()
+            conf = float(data['conf'][i])
+            if not word or conf < 0:
+                continue
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            lines.setdefault(key, []).append((word, conf))
+
+        return [(' '.join(word for word, _ in words), sum(conf for _, conf in words) / len(words))
+                for _, words in sorted(lines.items())]
+
+    def extract_scored(self, gray):
+        """Extract structured data plus a 0-1 confidence per found field"""
+        fields, confidence = parse_card_lines(self.read_lines(gray))
+        fields['country'] = ''
+        fields['flag'] = get_country_flag('')
+        return fields, confidence
+
+    def extract_preprocessed(self, preprocessed):
+        return self.extract_scored(preprocessed)[0]
+
+# 151-180: Deterministic fake engine for tests and load benchmarks
+class FakeEngine(OCREngine):
+    """Derives a stable, plausible card from the image hash without any OCR"""
+    name = 'fake'
+
+    def preprocess(self, image_bytes):
+        return hashlib.sha256(image_bytes).hexdigest()
+
+    def extract_preprocessed(self, preprocessed):
+        digest = preprocessed
+        number = int(digest[:12], 16)
+        return {
+            'name': f"Test Contact {digest[:6].upper()}",
+            'phone': f"+1 555 {number % 1000:03d} {number // 1000 % 10000:04d}",
+            'email': f"contact.{digest[:8]}@example.com",
+            'company': f"Example Corp {digest[6:9].upper()}",
+            'country': 'United States',
+            'flag': get_country_flag('United States')
+        }
+
+# 181-260: Tiered engine, local OCR first and Gemini only for the gaps
+class TieredEngine(OCREngine):
+    """
+    Runs a cheap local Tesseract pass and keeps its result when every required field was
+    found with enough confidence. Other cards are escalated to Gemini, whose fields take
+    precedence while local extras (website, designation) fill the gaps.
+    Tier outcomes are counted across workers so avoided API calls can be monitored.
+    """
+    name = 'tiered'
+
+    def __init__(self, local_engine, api_engine, min_confidence=TIERED_MIN_CONFIDENCE,
+                 required_fields=TIERED_REQUIRED_FIELDS):
+        self.local_engine = local_engine
+        self.api_engine = api_engine
+        self.min_confidence = min_confidence
+        self.required_fields = required_fields
+
+    def available(self):
+        return self.api_engine.available()
+
+    def cache_key(self, image_bytes):
+        local = self.local_engine
+        settings = (f"tiered:{self.min_confidence}:{local.lang}:{local.config}:{local.long_edge}:"
+                    f"parser-v{LOCAL_PARSER_VERSION}\n{EXTRACTION_PROMPT}")
+        return make_cache_key(image_bytes, settings, GEMINI_MODEL)
+
+    def preprocess(self, image_bytes):
+        # Gemini preprocesses separately, and only if the card gets escalated
+        gray = self.local_engine.preprocess(image_bytes) if self.local_engine.available() else None
+        return {'image_bytes': image_bytes, 'gray': gray}
+
+    def weak_fields(self, fields, confidence):
+        """Required fields that are missing or below the confidence threshold"""
+        return [field for field in self.required_fields
+                if not fields.get(field) or confidence.get(field, 0.0) < self.min_confidence]
+
+    def extract_preprocessed(self, preprocessed):
+        local_data = {}
+        if preprocessed['gray'] is None:
+            tier = 'local_unavailable'
+        else:
+            try:
+                local_data, confidence = self.local_engine.extract_scored(preprocessed['gray'])
+                weak = self.weak_fields(local_data, confidence)
+                if not weak:
+                    increment_counters(TIER_COUNTER_NAME, {'local': 1})
+                    return local_data
+                tier = 'escalated_missing' if any(not local_data.get(field) for field in weak) else 'escalated_low_confidence'
+                print(f"⬆️ Escalating to Gemini, weak fields: {', '.join(weak)}")
+            except Exception as e:
+                print(f"⚠️ Local OCR pass failed, escalating to Gemini: {str(e)}")
+                tier = 'local_error'
+
+        # Imported here, the extraction engine module imports this one
+        from app.extraction import extraction_engine
+        with extraction_engine.limit():
+            api_data = self.api_engine.extract(preprocessed['image_bytes'])
+        increment_counters(TIER_COUNTER_NAME, {'gemini': 1, tier: 1})
+
+        merged = {field: value for field, value in local_data.items() if value}
+        merged.update({field: value for field, value in api_data.items() if value})
+        return dict(api_data, **merged)
+
+def get_tier_stats():
+    """
+    Get per-tier hit counts shared by all workers
+    """
+    counters = get_counters(TIER_COUNTER_NAME)
+    local = counters.get('local', 0)
+    gemini = counters.get('gemini', 0)
+    total = local + gemini
+
+    return {
+        'min_confidence': TIERED_MIN_CONFIDENCE,
+        'local': local,
+        'gemini': gemini,
+        'escalated_missing': counters.get('escalated_missing', 0),
+        'escalated_low_confidence': counters.get('escalated_low_confidence', 0),
+        'local_error': counters.get('local_error', 0),
+        'local_unavailable': counters.get('local_unavailable', 0),
+        'local_hit_rate': round(local / total, 3) if total else 0.0,
+        'api_calls_avoided': local
+    }
+
+# 261-300: Engine registry and selection
+_gemini_engine = GeminiEngine()
+_tesseract_engine = TesseractEngine()
+ENGINES = {engine.name: engine for engine in (_gemini_engine, _tesseract_engine, FakeEngine(),
+                                              TieredEngine(_tesseract_engine, _gemini_engine))}
+
+def get_engine(name=None):
+    """
+    Get an engine by name, defaulting to the OCR_ENGINE setting
+    Raises EngineUnavailableError for unknown or unavailable engines
+    """
+    name = (name or OCR_ENGINE).strip().lower()
+    engine = ENGINES.get(name)
+    if engine is None:
+        raise EngineUnavailableError(f"Unknown OCR engine '{name}'. Choose one of: {', '.join(ENGINES)}")
+    if not engine.available():
+        raise EngineUnavailableError(f"OCR engine '{name}' is not available on this server")
+    return engine
+
+def get_engine_stats():
+    """Configured default engine and which engines this server can run"""
+    return {
+        'default': OCR_ENGINE,
+        'available': [name for name, engine in ENGINES.items() if engine.available()],
+        'gemini_model': GEMINI_MODEL
+    }
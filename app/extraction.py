@@ -0,0 +1,131 @@
+# 1-10: Import modules
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from app.ocr import (extract_data_from_preprocessed, extract_batch_from_preprocessed,
+                     preprocess_image, extraction_cache_key, plan_batches)
+from app.cache import get_cached_extraction, store_cached_extraction
+
+# 11-20: Load engine settings
+load_dotenv()
+EXTRACTION_MAX_WORKERS = int(os.getenv('EXTRACTION_MAX_WORKERS', 4))
+EXTRACTION_MAX_IN_FLIGHT = int(os.getenv('EXTRACTION_MAX_IN_FLIGHT', 8))
+
+# 21-70: Bounded concurrent extraction engine
+class ExtractionEngine:
+    """
+    Fans per-file extraction calls out to a worker pool.
+    Results come back in input order and one failing file never affects the others.
+    The in-flight semaphore is shared by every batch in the process so concurrent
+    uploads together stay inside the API quota.
+    """
+
+    def __init__(self, max_workers=EXTRACTION_MAX_WORKERS, max_in_flight=EXTRACTION_MAX_IN_FLIGHT):
+        self.max_workers = max(1, int(max_workers))
+        self.max_in_flight = max(1, int(max_in_flight))
+        self._in_flight = threading.BoundedSemaphore(self.max_in_flight)
+
+    def limit(self):
+        """Context manager holding one of the process-wide in-flight API slots"""
+        return self._in_flight
+
+    def _run_task(self, task_fn, index, item):
+        """Run one task, isolating any error to this item"""
+        filename = item.get('filename', '')
+        try:
+            return {'index': index, 'filename': filename, 'data': task_fn(index, item), 'error': None}
+        except Exception as e:
+            print(f"❌ Extraction failed for {filename}: {str(e)}")
+            return {'index': index, 'filename': filename, 'data': None, 'error': str(e)}
+
+    def map(self, task_fn, items):
+        """
+        Run task_fn(index, item) for every item on the worker pool.
+        Returns a list of {'index', 'filename', 'data', 'error'} dicts in input order.
+        """
+        if not items:
+            return []
+
+        workers = min(self.max_workers, len(items))
+        print(f"⚙️ Extracting {len(items)} files with {workers} workers (max in flight: {self.max_in_flight})")
+
+        if workers == 1:
+            return [self._run_task(task_fn, idx, item) for idx, item in enumerate(items)]
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='extract') as executor:
+            futures = [executor.submit(self._run_task, task_fn, idx, item)
+                       for idx, item in enumerate(items)]
+            return [future.result() for future in futures]
+
+    def run_batched(self, items, on_state=None):
+        """
+        Extract structured data by packing several preprocessed cards into each Gemini request.
+        Cards a batch response fails to cover fall back to single-image calls.
+        on_state(index, state) is called as each item enters 'preprocessing' and 'extracting'.
+        Returns the same in-order result list as map().
+        """
+        notify = on_state or (lambda index, state: None)
+
+        # Phase 1: cache lookups and preprocessing on the worker pool
+        def prepare(index, item):
+            cache_key = extraction_cache_key(item['image_bytes'])
+            cached_data = get_cached_extraction(cache_key)
+            if cached_data is not None:
+                return {'cache_key': cache_key, 'data': cached_data}
+            notify(index, 'preprocessing')
+            return {'cache_key': cache_key, 'img_b64': preprocess_image(item['image_bytes'])}
+
+        prepared = self.map(prepare, items)
+        results = [
+            {'index': entry['index'], 'filename': entry['filename'],
+             'data': entry['data'].get('data') if entry['data'] else None, 'error': entry['error']}
+            for entry in prepared
+        ]
+
+        # Phase 2: pack uncached cards into size-bounded batches, one API call each
+        pending = [entry['index'] for entry in prepared if entry['data'] and 'img_b64' in entry['data']]
+        batches = [[pending[position] for position in batch]
+                   for batch in plan_batches([len(prepared[index]['data']['img_b64']) for index in pending])]
+
+        def extract_batch(batch_no, batch):
+            indices = batch['indices']
+            for index in indices:
+                notify(index, 'extracting')
+
+            img_b64_list = [prepared[index]['data']['img_b64'] for index in indices]
+            with self.limit():
+                covered = extract_batch_from_preprocessed(img_b64_list) if len(indices) > 1 else {}
+
+            # One failing fallback only fails its own card; covered cards stay extracted
+            batch_data = {}
+            for position, index in enumerate(indices):
+                data = covered.get(position)
+                if data is None:
+                    filename = items[index].get('filename', '')
+                    print(f"↩️ Falling back to single-image extraction for {filename}")
+                    try:
+                        with self.limit():
+                            data = extract_data_from_preprocessed(img_b64_list[position])
+                    except Exception as e:
+                        print(f"❌ Extraction failed for {filename}: {str(e)}")
+                        batch_data[index] = {'data': None, 'error': str(e)}
+                        continue
+                store_cached_extraction(prepared[index]['data']['cache_key'], data)
+                batch_data[index] = {'data': data, 'error': None}
+            return batch_data
+
+        if batches:
+            print(f"📦 Packed {len(pending)} images into {len(batches)} Gemini requests")
+        batch_items = [{'filename': f"batch {batch_no + 1}", 'indices': batch} for batch_no, batch in enumerate(batches)]
+        for batch_item, batch_result in zip(batch_items, self.map(extract_batch, batch_items)):
+            for index in batch_item['indices']:
+                if batch_result['error']:
+                    results[index]['error'] = batch_result['error']
+                else:
+                    results[index].update(batch_result['data'][index])
+
+        return results
+
+# Process-wide engine instance shared by all upload endpoints
+extraction_engine = ExtractionEngine()
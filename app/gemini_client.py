@@ -0,0 +1,196 @@
+# 1-10: Import modules
+import os
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from app.rate_limit import gemini_rate_limiter, RateLimitTimeout
+
+# 11-20: Load HTTP client settings
+load_dotenv()
+GEMINI_POOL_SIZE = int(os.getenv('GEMINI_POOL_SIZE', 10))
+GEMINI_MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', 3))
+GEMINI_BACKOFF_BASE = float(os.getenv('GEMINI_BACKOFF_BASE', 0.5))
+GEMINI_BACKOFF_MAX = float(os.getenv('GEMINI_BACKOFF_MAX', 20))
+GEMINI_BREAKER_THRESHOLD = int(os.getenv('GEMINI_BREAKER_THRESHOLD', 5))
+GEMINI_BREAKER_RESET_SECONDS = float(os.getenv('GEMINI_BREAKER_RESET_SECONDS', 30))
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Transport errors worth retrying: the connection failed, timed out or broke mid-response
+RETRYABLE_ERRORS = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)
+
+# 21-30: Client errors
+class GeminiAPIError(Exception):
+    """Raised when a Gemini request fails after all retries"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+class CircuitOpenError(GeminiAPIError):
+    """Raised without calling the API while the circuit breaker is open"""
+
+# 31-180: Pooled, retrying HTTP client with circuit breaker
+class GeminiClient:
+    """
+    Long-lived per-process HTTP client for the Gemini endpoint.
+    Keeps connections alive in a pool, retries 429/5xx and connection errors with
+    exponential backoff and jitter (honoring Retry-After), and opens a circuit
+    breaker after repeated failures so requests fail fast while the API is down.
+    """
+
+    def __init__(self, pool_size=GEMINI_POOL_SIZE, max_retries=GEMINI_MAX_RETRIES,
+                 backoff_base=GEMINI_BACKOFF_BASE, backoff_max=GEMINI_BACKOFF_MAX,
+                 breaker_threshold=GEMINI_BREAKER_THRESHOLD, breaker_reset_seconds=GEMINI_BREAKER_RESET_SECONDS,
+                 rate_limiter=gemini_rate_limiter):
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset_seconds = breaker_reset_seconds
+        self.rate_limiter = rate_limiter
+
+        self._lock = threading.Lock()
+        self._session = None
+        self._session_pid = None
+
+        # Circuit breaker state
+        self._consecutive_failures = 0
+        self._opened_at = None
+        self._half_open_trial = False
+
+        # Counters exposed for monitoring
+        self._stats = {'requests': 0, 'successes': 0, 'retries': 0, 'failures': 0,
+                       'breaker_opens': 0, 'short_circuits': 0}
+
+    def _get_session(self):
+        """Get the pooled session, recreating it after a fork (gunicorn --preload)"""
+        with self._lock:
+            if self._session is None or self._session_pid != os.getpid():
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._session = session
+                self._session_pid = os.getpid()
+            return self._session
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    # Circuit breaker helpers
+    def _before_request(self):
+        """
+        Fail fast while the breaker is open; let one trial request through after the reset timeout
+        Returns True for that trial request
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            if time.monotonic() - self._opened_at >= self.breaker_reset_seconds and not self._half_open_trial:
+                self._half_open_trial = True
+                return True
+            self._stats['short_circuits'] += 1
+        raise CircuitOpenError('Gemini API circuit breaker is open')
+
+    def _record_success(self):
+        with self._lock:
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._half_open_trial = False
+            self._stats['successes'] += 1
+
+    def _record_failure(self):
+        with self._lock:
+            self._stats['failures'] += 1
+            self._consecutive_failures += 1
+            if self._half_open_trial or (self._opened_at is None and self._consecutive_failures >= self.breaker_threshold):
+                self._stats['breaker_opens'] += 1
+                self._opened_at = time.monotonic()
+                self._half_open_trial = False
+                print(f"⛔ Gemini circuit breaker opened after {self._consecutive_failures} consecutive failures")
+
+    def _retry_delay(self, attempt, response=None):
+        """Delay before the next attempt: Retry-After if the server sent one, else backoff with full jitter"""
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.backoff_max)
+                except ValueError:
+                    try:
+                        delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                        return min(max(delay, 0), self.backoff_max)
+                    except (TypeError, ValueError):
+                        pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def post_json(self, url, payload, timeout=30):
+        """
+        POST a JSON payload and return the decoded JSON response
+        Raises GeminiAPIError (or CircuitOpenError) when the request ultimately fails
+        """
+        trial = self._before_request()
+        try:
+            return self._post_with_retries(url, payload, timeout)
+        finally:
+            if trial:
+                # However the trial ended, the next one may go through once the breaker allows it
+                with self._lock:
+                    self._half_open_trial = False
+
+    def _post_with_retries(self, url, payload, timeout):
+        session = self._get_session()
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count('retries')
+            self._count('requests')
+            response = None
+
+            try:
+                # Every attempt, retries included, counts against the node-wide quota
+                with self.rate_limiter.slot():
+                    response = session.post(url, json=payload, timeout=timeout)
+            except RateLimitTimeout as e:
+                raise GeminiAPIError(str(e))
+            except RETRYABLE_ERRORS as e:
+                last_error = GeminiAPIError(f"Gemini request failed: {e}")
+            except requests.RequestException as e:
+                # Malformed requests (bad URL, headers) will not succeed on retry
+                raise GeminiAPIError(f"Gemini request failed: {e}")
+            else:
+                if response.status_code < 400:
+                    self._record_success()
+                    return response.json()
+                last_error = GeminiAPIError(f"Gemini API returned HTTP {response.status_code}", response.status_code)
+                if response.status_code not in RETRYABLE_STATUSES:
+                    # Client errors are not the API being down, so they don't trip the breaker
+                    raise last_error
+
+            if attempt < self.max_retries:
+                delay = self._retry_delay(attempt, response)
+                print(f"🔁 {last_error}; retrying in {delay:.1f}s (attempt {attempt + 2}/{self.max_retries + 1})")
+                time.sleep(delay)
+
+        self._record_failure()
+        raise last_error
+
+    def get_stats(self):
+        """Get retry and circuit breaker counters for this process"""
+        with self._lock:
+            if self._opened_at is None:
+                state = 'closed'
+            elif time.monotonic() - self._opened_at >= self.breaker_reset_seconds:
+                state = 'half_open'
+            else:
+                state = 'open'
+            return dict(self._stats, breaker_state=state, consecutive_failures=self._consecutive_failures)
+
+# Process-wide client shared by all extraction calls
+gemini_client = GeminiClient()
@@ -0,0 +1,161 @@
+# 1-10: Import modules
+import os
+import time
+import uuid
+import atexit
+import socket
+import threading
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from pymongo.errors import DuplicateKeyError
+
+# 11-30: ID layout
+# 53 bits so IDs stay exact as JavaScript numbers in the frontend:
+#   41 bits  milliseconds since ID_EPOCH_MS (lasts until 2089)
+#    8 bits  node, leased per process
+#    4 bits  sequence within one millisecond
+load_dotenv()
+ID_EPOCH_MS = 1577836800000  # 2020-01-01 UTC; keeps new IDs above the old millisecond-timestamp IDs
+TIMESTAMP_BITS = 41
+NODE_BITS = 8
+SEQUENCE_BITS = 4
+MAX_NODE = (1 << NODE_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+# Nodes this host leases from, e.g. 64-79 to keep each host's workers in their own range
+ID_NODE_RANGE = os.getenv('ID_NODE_RANGE', f'0-{MAX_NODE}')
+# A node whose holder has not renewed it for this long is free again; holders renew at a third of it
+ID_NODE_TTL_SECONDS = int(os.getenv('ID_NODE_TTL_SECONDS', 300))
+ID_NODE_RENEW_SECONDS = ID_NODE_TTL_SECONDS / 3
+ID_NODES_COLLECTION = 'id_nodes'
+
+class NodeLeaseError(RuntimeError):
+    """Raised when every node is held by a live process; no ID is minted without a node"""
+
+def node_range(spec=None):
+    """First and last node of ID_NODE_RANGE ('64-79', or '7' for a single node)"""
+    first, _, last = (spec or ID_NODE_RANGE).partition('-')
+    first, last = int(first), int(last or first)
+    if not 0 <= first <= last <= MAX_NODE:
+        raise ValueError(f"ID_NODE_RANGE must lie within 0-{MAX_NODE}, got {spec or ID_NODE_RANGE!r}")
+    return first, last
+
+# 31-80: Node leases, one document per node with the holder's heartbeat
+_holder_token = None
+_holder_pid = None
+
+def _holder():
+    """Identity of this process as a node holder; forked children get their own"""
+    global _holder_token, _holder_pid
+    if _holder_pid != os.getpid():
+        _holder_token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        _holder_pid = os.getpid()
+    return _holder_token
+
+def lease_node_id(collection):
+    """
+    Lease a node number in ID_NODE_RANGE for this process: one that was never used, else one
+    whose holder's heartbeat expired (the holder was killed or recycled)
+    Every process leases, so workers forked from one preloaded app never share a node
+    Raises NodeLeaseError when every node in the range is held, rather than sharing one
+    """
+    first, last = node_range()
+    in_range = {'_id': {'$gte': first, '$lte': last}}
+    nodes = collection.database[ID_NODES_COLLECTION]
+    holder = _holder()
+    now = datetime.now()
+    used = {doc['_id'] for doc in nodes.find(in_range, {'_id': 1})}
+    for node in range(first, last + 1):
+        if node in used:
+            continue
+        try:
+            nodes.insert_one({'_id': node, 'holder': holder, 'heartbeat_at': now})
+            break
+        except DuplicateKeyError:
+            continue  # Another process took it first
+    else:
+        expired = nodes.find_one_and_update(
+            dict(in_range, heartbeat_at={'$lt': now - timedelta(seconds=ID_NODE_TTL_SECONDS)}),
+            {'$set': {'holder': holder, 'heartbeat_at': now}},
+            sort=[('heartbeat_at', 1)]
+        )
+        if expired is None:
+            raise NodeLeaseError(f"All record ID nodes {first}-{last} are held by live processes")
+        node = expired['_id']
+
+    atexit.register(release_node_lease, collection, node, holder, os.getpid())
+    return node
+
+def renew_node_lease(collection, node):
+    """
+    Refresh this process's heartbeat on its node
+    Returns False if the lease expired and another process took the node
+    """
+    result = collection.database[ID_NODES_COLLECTION].update_one(
+        {'_id': node, 'holder': _holder()}, {'$set': {'heartbeat_at': datetime.now()}})
+    return result.matched_count == 1
+
+def release_node_lease(collection, node, holder, pid):
+    """Free a node at exit so a new worker can take it at once (forked children skip their parent's)"""
+    if os.getpid() != pid:
+        return
+    try:
+        collection.database[ID_NODES_COLLECTION].update_one(
+            {'_id': node, 'holder': holder}, {'$set': {'heartbeat_at': datetime(1970, 1, 1)}})
+    except Exception:
+        pass
+
+# 31-90: Snowflake ID generator
+class SnowflakeIds:
+    """
+    Thread-safe generator of unique, increasing 53-bit integer IDs.
+    The node is leased lazily and again after a fork (gunicorn --preload), so every
+    worker process has its own. renew(node) is called before minting once the lease is
+    ID_NODE_RENEW_SECONDS old; if it reports the node lost, a new one is leased first.
+    When the 16 IDs of a millisecond are used up, or the clock steps backwards, the
+    generator moves on to the next millisecond rather than sleeping, so IDs keep increasing.
+    """
+
+    def __init__(self, node_source, renew=None):
+        self._node_source = node_source
+        self._renew = renew
+        self._lock = threading.Lock()
+        self._node = None
+        self._pid = None
+        self._renewed_at = 0.0
+        self._last_ms = -1
+        self._sequence = 0
+
+    def _ensure_node(self):
+        if (self._node is not None and self._pid == os.getpid() and self._renew
+                and time.monotonic() - self._renewed_at >= ID_NODE_RENEW_SECONDS):
+            if self._renew(self._node):
+                self._renewed_at = time.monotonic()
+            else:
+                print(f"⚠️ Record ID node {self._node} lease expired for process {self._pid}; leasing another")
+                self._node = None
+        if self._node is None or self._pid != os.getpid():
+            self._node = self._node_source() & MAX_NODE
+            self._pid = os.getpid()
+            self._renewed_at = time.monotonic()
+            self._last_ms = -1
+            self._sequence = 0
+            print(f"🆔 Record ID node {self._node} leased for process {self._pid}")
+
+    def next_id(self):
+        """Return a new unique ID"""
+        with self._lock:
+            self._ensure_node()
+            now_ms = int(time.time() * 1000) - ID_EPOCH_MS
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._sequence = 0
+            elif self._sequence < MAX_SEQUENCE:
+                self._sequence += 1
+            else:
+                self._last_ms += 1
+                self._sequence = 0
+            return (self._last_ms << (NODE_BITS + SEQUENCE_BITS)) | (self._node << SEQUENCE_BITS) | self._sequence
+
+def id_timestamp(record_id):
+    """Creation time (Unix seconds) encoded in a snowflake ID"""
+    return ((record_id >> (NODE_BITS + SEQUENCE_BITS)) + ID_EPOCH_MS) / 1000.0
@@ -0,0 +1,249 @@
+# 1-10: Import modules
+import os
+from tempfile import SpooledTemporaryFile
+from dotenv import load_dotenv
+from flask import Request
+from app.extraction import extraction_engine
+from app.cache import get_cached_extraction, store_cached_extraction
+from app.ocr import EXTRACTION_MODE
+from app.mongo import store_card_with_image, find_duplicates, merge_duplicate_card
+from app.contacts import contact_keys, duplicate_clauses, names_compatible
+from app.countries import resolve_card_country
+from app.utils import allowed_file, MAX_FILE_SIZE
+
+# 11-20: Load ingestion settings
+load_dotenv()
+INGEST_SPOOL_THRESHOLD = int(os.getenv('INGEST_SPOOL_THRESHOLD', 4 * 1024 * 1024))
+INGEST_CHUNK_SIZE = 64 * 1024
+REQUIRED_FIELDS = ['name', 'email', 'phone', 'company']
+EVENT_FIELDS = ['event_name', 'event_description', 'event_host', 'event_date', 'event_location']
+# What to do with a card whose email or phone is already stored: merge, reject or off
+DEDUP_MODE = os.getenv('DEDUP_MODE', 'merge').lower()
+
+class UploadRejected(Exception):
+    """Raised when an uploaded file fails validation"""
+
+# 21-40: Request class that keeps uploaded files in memory
+class IngestRequest(Request):
+    """
+    Werkzeug writes every file of a multipart body larger than 500KB to a temporary file.
+    Spool each file part in memory instead, only going to disk for files above
+    INGEST_SPOOL_THRESHOLD, so a bulk upload of card photos never touches the disk.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return SpooledTemporaryFile(max_size=INGEST_SPOOL_THRESHOLD)
+
+# 41-100: Reading and validating uploads
+def _image_signature_ok(head):
+    """Check the leading bytes of an upload for a PNG, JPEG or WEBP signature"""
+    return (head.startswith(b'\x89PNG\r\n\x1a\n')
+            or head.startswith(b'\xff\xd8\xff')
+            or (head[:4] == b'RIFF' and head[8:12] == b'WEBP'))
+
+def read_upload(file, max_bytes=MAX_FILE_SIZE):
+    """
+    Stream a FileStorage into memory in chunks, validating type and size as it goes
+    Returns the file bytes; raises UploadRejected for invalid files
+    """
+    if not file or not file.filename:
+        raise UploadRejected('No file provided')
+    if not allowed_file(file.filename):
+        raise UploadRejected('File type not allowed. Only PNG, JPG, JPEG, and WEBP files are supported.')
+
+    chunks = []
+    size = 0
+    while True:
+        chunk = file.stream.read(INGEST_CHUNK_SIZE)
+        if not chunk:
+            break
+        if not chunks and not _image_signature_ok(chunk[:12]):
+            raise UploadRejected('File content is not a PNG, JPEG or WEBP image')
+        size += len(chunk)
+        if size > max_bytes:
+            raise UploadRejected(f"File size too large. Maximum size is {max_bytes // (1024 * 1024)}MB.")
+        chunks.append(chunk)
+
+    if not size:
+        raise UploadRejected('File is empty')
+    return b''.join(chunks)
+
+def collect_uploads(files):
+    """
+    Read every uploaded FileStorage into a {'filename', 'image_bytes'} item
+    Returns (items, skipped) where skipped lists "filename (reason)" strings
+    """
+    items, skipped = [], []
+    for idx, file in enumerate(files):
+        if not file or file.filename == '':
+            continue
+
+        print(f"📄 Reading file {idx + 1}/{len(files)}: {file.filename}")
+        try:
+            items.append({'filename': file.filename, 'image_bytes': read_upload(file)})
+        except UploadRejected as e:
+            print(f"❌ {str(e)}: {file.filename}")
+            skipped.append(f"{file.filename} ({str(e)})")
+        except Exception as e:
+            print(f"❌ Error reading {file.filename}: {str(e)}")
+            skipped.append(f"{file.filename} (unreadable)")
+        finally:
+            file.close()
+
+    return items, skipped
+
+def parse_event_info(form):
+    """Optional event details submitted with an upload"""
+    return {field: form.get(field, '').strip() for field in EVENT_FIELDS}
+
+# 101-160: Extract and store one card
+def extract_item(item, engine, notify):
+    """
+    Extract structured data for one item, served from the extraction cache when possible
+    notify(state) is called as the item enters 'preprocessing' and 'extracting'
+    """
+    cache_key = engine.cache_key(item['image_bytes'])
+    structured_data = get_cached_extraction(cache_key) if cache_key else None
+    if structured_data is not None:
+        return structured_data
+
+    notify('preprocessing')
+    preprocessed = engine.preprocess(item['image_bytes'])
+
+    notify('extracting')
+    with engine.slot(extraction_engine):
+        structured_data = engine.extract_preprocessed(preprocessed)
+    if cache_key:
+        store_cached_extraction(cache_key, structured_data)
+    return structured_data
+
+def prepare_card(item, structured_data, event_info):
+    """
+    Validate one extracted card and add its country, management and event fields
+    Returns the card fields ready to store
+    """
+    # Only store cards where we got valid results
+    if not structured_data or not any(structured_data.get(field, '').strip() for field in REQUIRED_FIELDS):
+        raise ValueError('No valid data extracted')
+
+    # Detect country and add management fields
+    card = dict(structured_data)
+    resolved = resolve_card_country(card)
+    card['country'] = resolved['country']
+    card['flag'] = resolved['flag']
+    card['country_source'] = resolved['source']
+    card['is_sorted'] = False  # New cards start as unsorted
+    card.update(event_info)
+    card.update(item.get('source', {}))  # Link crops back to their scanned page
+    return card
+
+def store_card(item, card):
+    """
+    Store one prepared card with its image
+    Returns the stored card fields (JSON-serializable, including 'id')
+    """
+    record_id = store_card_with_image(card, item['image_bytes'], item['filename'])
+    if not record_id:
+        raise RuntimeError('Failed to store card in MongoDB')
+    card['id'] = record_id
+    card['filename'] = item['filename']
+
+    print(f"✅ Data extracted for: {item['filename']} - {card}")
+    return card
+
+# 161-200: Duplicate detection for a whole upload
+def find_upload_duplicates(cards):
+    """
+    Match every prepared card of an upload against stored cards (one query) and earlier cards of the same upload
+    Returns a list aligned with cards: the stored card dict, the index of an earlier card, or None
+    Like find_duplicates, a shared email or phone only matches when the names are compatible
+    """
+    matches = find_duplicates(cards)
+
+    seen, keys = {}, {}
+    for index, card in enumerate(cards):
+        if card is None or matches[index] is not None:
+            continue
+        keys[index] = contact_keys(card)
+        clauses = [next(iter(clause.items())) for clause in duplicate_clauses(keys[index])]
+        earlier = next((other for clause in clauses for other in seen.get(clause, [])
+                        if names_compatible(keys[index], keys[other])), None)
+        if earlier is not None:
+            matches[index] = earlier
+            continue
+        for clause in clauses:
+            seen.setdefault(clause, []).append(index)
+
+    return matches
+
+# 201-280: Ingestion pipeline shared by every upload endpoint
+def ingest_items(items, event_info, engine, on_state=None):
+    """
+    Extract and store a list of {'filename', 'image_bytes'} items on the extraction worker pool
+    on_state(index, state, error=None, record_id=None) is called on every per-file state change
+    Returns the in-order {'index', 'filename', 'data', 'error'} list, data being the stored card
+    """
+    notify = on_state or (lambda index, state, error=None, record_id=None: None)
+
+    # 1. Extract every card
+    if EXTRACTION_MODE == 'batch' and engine.name == 'gemini':
+        # Multi-image Gemini requests for the whole upload
+        extracted = extraction_engine.run_batched(items, on_state=notify)
+    else:
+        extracted = extraction_engine.map(
+            lambda index, item: extract_item(item, engine, lambda state: notify(index, state)), items)
+
+    # 2. Validate, then check the whole upload for duplicates at once
+    cards, errors = [None] * len(items), [None] * len(items)
+    for index, (item, result) in enumerate(zip(items, extracted)):
+        try:
+            if result['error']:
+                raise RuntimeError(result['error'])
+            cards[index] = prepare_card(item, result['data'], event_info)
+        except Exception as e:
+            errors[index] = str(e)
+    matches = find_upload_duplicates(cards) if DEDUP_MODE in ('merge', 'reject') else [None] * len(items)
+
+    # A card repeated within the upload is folded into its first copy before that is stored
+    repeats = {}
+    for index, match in enumerate(matches):
+        if isinstance(match, int):
+            repeats.setdefault(match, []).append(index)
+            if DEDUP_MODE == 'merge':
+                first = cards[match]
+                first.update({field: value for field, value in cards[index].items() if value and not first.get(field)})
+
+    # 3. Store new cards and merge duplicates on the worker pool
+    def task(index, item):
+        try:
+            if errors[index]:
+                raise RuntimeError(errors[index])
+            match = matches[index]
+            if isinstance(match, int):
+                return None  # Settled with its first copy below
+            if match is not None:
+                if DEDUP_MODE == 'reject':
+                    raise ValueError(f"Duplicate of card {match['id']}")
+                card = merge_duplicate_card(match, cards[index])
+                notify(index, 'duplicate', record_id=card['id'])
+                return card
+            card = store_card(item, cards[index])
+        except Exception as e:
+            notify(index, 'failed', error=str(e))
+            raise
+        notify(index, 'stored', record_id=card['id'])
+        return card
+
+    results = extraction_engine.map(task, items)
+
+    for first, indices in repeats.items():
+        for index in indices:
+            if DEDUP_MODE == 'reject' or results[first]['error']:
+                error = f"Duplicate of {items[first]['filename']}"
+                results[index].update(data=None, error=error)
+                notify(index, 'failed', error=error)
+            else:
+                results[index]['data'] = dict(results[first]['data'], duplicate=True)
+                notify(index, 'duplicate', record_id=results[first]['data']['id'])
+
+    return results
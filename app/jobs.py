@@ -0,0 +1,304 @@
+# 1-10: Import modules
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from dotenv import load_dotenv
+from app.engines import get_engine
+from app.ingest import ingest_items
+from app.segment import expand_card_sheets
+from app.mongo import (create_job, update_job_status, update_job_file_state, get_job, update_job_fields, claim_job,
+                       reset_job_files, touch_jobs, fail_stale_job,
+                       iter_dedup_cards, get_cards_by_ids, save_dedup_clusters, get_dedup_clusters,
+                       mark_dedup_clusters, apply_card_merges)
+from app.dedup import find_clusters, plan_merge
+
+# 11-20: Load background worker settings
+load_dotenv()
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+DEDUP_MERGE_BATCH = int(os.getenv('DEDUP_MERGE_BATCH', 100))
+# A running dedup job without a heartbeat for this long is assumed dead and may be resumed
+DEDUP_STALE_SECONDS = int(os.getenv('DEDUP_STALE_SECONDS', 600))
+# Jobs held by this process are touched every JOB_HEARTBEAT_SECONDS; an upload job silent for
+# JOB_STALE_SECONDS lost its worker (recycled or killed) and is reported failed
+JOB_HEARTBEAT_SECONDS = int(os.getenv('JOB_HEARTBEAT_SECONDS', 30))
+JOB_STALE_SECONDS = int(os.getenv('JOB_STALE_SECONDS', 180))
+
+# 21-40: Process-wide background job pool
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    """
+    Get the background job pool, recreating it after a fork (gunicorn --preload)
+    """
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=max(1, JOB_WORKERS), thread_name_prefix='upload-job')
+            _executor_pid = os.getpid()
+    return _executor
+
+# Heartbeat for every job queued or running in this process
+_active_jobs = set()
+_heartbeat_pid = None
+
+def _heartbeat_loop():
+    while True:
+        time.sleep(JOB_HEARTBEAT_SECONDS)
+        with _executor_lock:
+            job_ids = list(_active_jobs)
+        if job_ids:
+            touch_jobs(job_ids)
+
+def _track_job(job_id):
+    """Keep a job's heartbeat fresh until _untrack_job; the thread is started again after a fork"""
+    global _heartbeat_pid
+    with _executor_lock:
+        if _heartbeat_pid != os.getpid():
+            _active_jobs.clear()  # Jobs of the parent process are not ours
+            threading.Thread(target=_heartbeat_loop, name='job-heartbeat', daemon=True).start()
+            _heartbeat_pid = os.getpid()
+        _active_jobs.add(job_id)
+
+def _untrack_job(job_id):
+    with _executor_lock:
+        _active_jobs.discard(job_id)
+
+# 41-60: Job submission
+def submit_upload_job(items, event_info=None, engine=None, segment=False):
+    """
+    Queue a list of {'filename', 'image_bytes'} items for background extraction
+    engine is an OCR engine from app.engines, defaulting to the configured one
+    segment=True splits multi-card sheets into one item per card in the job, before extraction
+    Returns the job ID, or None if the job could not be created
+    """
+    engine = engine or get_engine()
+    job_id = uuid.uuid4().hex
+    if not create_job(job_id, [item['filename'] for item in items], engine=engine.name):
+        return None
+
+    _track_job(job_id)
+    _get_executor().submit(_run_upload_job, job_id, items, event_info or {}, engine, segment)
+    print(f"📥 Job {job_id} queued with {len(items)} files ({engine.name} engine)")
+    return job_id
+
+# 61-100: Job processing
+def _run_upload_job(job_id, items, event_info, engine, segment=False):
+    """
+    Process every file of an upload job, recording per-file state in the job store
+    Sheet segmentation is CPU-bound, so it runs here rather than in the upload request
+    """
+    states = ['queued'] * len(items)
+    states_lock = threading.Lock()
+
+    def on_state(index, new_state, error=None, record_id=None):
+        with states_lock:
+            old_state, states[index] = states[index], new_state
+        update_job_file_state(job_id, index, old_state, new_state, error=error, record_id=record_id)
+
+    try:
+        update_job_status(job_id, 'running')
+        if segment:
+            update_job_fields(job_id, {'phase': 'segmenting'})
+            expanded = expand_card_sheets(items)
+            if len(expanded) != len(items):
+                reset_job_files(job_id, [item['filename'] for item in expanded])
+            items = expanded
+            states = ['queued'] * len(items)
+            update_job_fields(job_id, {'phase': 'extracting'})
+
+        results = ingest_items(items, event_info, engine, on_state=on_state)
+
+        stored = sum(1 for result in results if not result['error'])
+        duplicates = sum(1 for result in results if result['data'] and result['data'].get('duplicate'))
+        update_job_status(job_id, 'completed')
+        print(f"📊 Job {job_id} finished: {stored - duplicates} stored, {duplicates} duplicates, "
+              f"{len(results) - stored} failed, {len(results)} total")
+
+    except Exception as e:
+        print(f"❌ Job {job_id} failed: {str(e)}")
+        update_job_status(job_id, 'failed')
+    finally:
+        _untrack_job(job_id)
+
+# 121-160: Progress reporting
+def get_job_progress(job_id):
+    """
+    Summarize a job's per-file state, counts and estimated time remaining
+    Returns a progress dict, or None if the job does not exist
+    """
+    job = get_job(job_id)
+    if not job:
+        return None
+    if job.get('type', 'upload') == 'upload' and job.get('status') in ('queued', 'running'):
+        job = fail_stale_job(job_id, JOB_STALE_SECONDS) or job
+
+    total = job.get('total', 0)
+    counts = job.get('counts', {})
+    done = counts.get('stored', 0) + counts.get('duplicate', 0) + counts.get('failed', 0)
+    progress = int(done * 100 / total) if total else 100
+
+    # Estimate remaining time from the average time per finished file
+    eta_seconds = None
+    started_at = job.get('started_at')
+    if job.get('status') == 'running' and started_at and done:
+        elapsed = (datetime.now() - started_at).total_seconds()
+        eta_seconds = round(elapsed / done * (total - done), 1)
+    elif job.get('status') in ('completed', 'failed'):
+        eta_seconds = 0
+
+    if job.get('status') == 'queued':
+        message = f"Queued {total} files..."
+    elif job.get('status') == 'running' and job.get('phase') == 'segmenting':
+        message = f"Splitting {total} scanned sheets into cards..."
+    elif job.get('status') == 'running':
+        message = f"Processed {done} of {total} files..."
+    elif job.get('interrupted'):
+        message = (f"Interrupted: the worker processing this job stopped after {done} of {total} files; "
+                   f"upload the remaining files again")
+    else:
+        message = (f"Finished: {counts.get('stored', 0)} stored, {counts.get('duplicate', 0)} duplicates, "
+                   f"{counts.get('failed', 0)} failed")
+
+    return {
+        'success': True,
+        'job_id': job_id,
+        'session_id': job_id,
+        'status': job.get('status'),
+        'interrupted': bool(job.get('interrupted')),
+        'engine': job.get('engine'),
+        'phase': job.get('phase'),
+        'progress': progress,
+        'total_files': total,
+        'processed_files': done,
+        'counts': counts,
+        'eta_seconds': eta_seconds,
+        'message': message,
+        'files': [
+            {
+                'filename': entry.get('filename'),
+                'state': entry.get('state'),
+                'error': entry.get('error'),
+                'record_id': entry.get('record_id')
+            }
+            for entry in job.get('files', [])
+        ]
+    }
+
+# 161-260: Collection-wide fuzzy dedup jobs
+def submit_dedup_job(apply=True):
+    """
+    Queue a fuzzy duplicate scan of the whole collection; with apply=False the clusters
+    are only recorded for review and can be merged later with resume_dedup_job
+    Returns the job ID, or None if the job could not be created
+    """
+    job_id = uuid.uuid4().hex
+    if not create_job(job_id, [], job_type='dedup'):
+        return None
+    update_job_fields(job_id, {'phase': 'queued', 'apply': apply,
+                               'counts': {'scanned': 0, 'candidates': 0, 'clusters': 0,
+                                          'merged_clusters': 0, 'removed_cards': 0}})
+
+    _track_job(job_id)
+    _get_executor().submit(_run_dedup_job, job_id, apply)
+    print(f"🧹 Dedup job {job_id} queued ({'merge' if apply else 'review only'})")
+    return job_id
+
+def resume_dedup_job(job_id, apply=True):
+    """
+    Continue a dedup job that failed, was interrupted or was only reviewed
+    Returns True if the job was queued again, False if it is unknown, finished or still running
+    """
+    job = get_job(job_id)
+    if not job or job.get('type') != 'dedup' or job.get('phase') == 'merged':
+        return False
+    if job.get('status') == 'running' and (datetime.now() - job['updated_at']).total_seconds() < DEDUP_STALE_SECONDS:
+        return False
+
+    update_job_fields(job_id, {'apply': apply})
+    _track_job(job_id)
+    _get_executor().submit(_run_dedup_job, job_id, apply)
+    print(f"🧹 Dedup job {job_id} resumed")
+    return True
+
+def _run_dedup_job(job_id, apply):
+    """
+    Scan for duplicate clusters (skipped when a previous run already stored them),
+    then merge the pending clusters in batches so an interrupted job resumes where it stopped
+    """
+    job = claim_job(job_id, DEDUP_STALE_SECONDS)
+    if not job:
+        print(f"⚠️ Dedup job {job_id} is already running")
+        _untrack_job(job_id)
+        return
+
+    try:
+        if job.get('phase') not in ('clustered', 'merging'):
+            update_job_fields(job_id, {'phase': 'scanning'})
+            clusters, stats = find_clusters(
+                iter_dedup_cards(),
+                on_progress=lambda scanned: update_job_fields(job_id, {'counts.scanned': scanned})
+            )
+            save_dedup_clusters(job_id, clusters)
+            update_job_fields(job_id, {'phase': 'clustered', 'counts.scanned': stats['scanned'],
+                                       'counts.candidates': stats['candidates'], 'counts.clusters': len(clusters)})
+            print(f"🧹 Dedup job {job_id}: {stats['scanned']} cards, {stats['candidates']} candidate pairs, "
+                  f"{len(clusters)} clusters")
+
+        if not apply:
+            update_job_status(job_id, 'completed')
+            return
+
+        update_job_fields(job_id, {'phase': 'merging'})
+        while True:
+            pending = get_dedup_clusters(job_id, status='pending', limit=DEDUP_MERGE_BATCH)
+            if not pending:
+                break
+
+            cards = get_cards_by_ids(card_id for cluster in pending for card_id in cluster['ids'])
+            plans = [plan_merge([cards[card_id] for card_id in cluster['ids'] if card_id in cards]) for cluster in pending]
+            removed = apply_card_merges([plan for plan in plans if plan])
+            mark_dedup_clusters(job_id, [cluster['cluster'] for cluster in pending], 'merged')
+            update_job_fields(job_id, increments={'counts.merged_clusters': len(pending), 'counts.removed_cards': removed})
+
+        update_job_fields(job_id, {'phase': 'merged'})
+        update_job_status(job_id, 'completed')
+        print(f"🧹 Dedup job {job_id} finished")
+
+    except Exception as e:
+        print(f"❌ Dedup job {job_id} failed: {str(e)}")
+        update_job_status(job_id, 'failed')
+    finally:
+        _untrack_job(job_id)
+
+def get_dedup_progress(job_id):
+    """
+    Summarize a dedup job's phase and counts
+    Returns a progress dict, or None if the job does not exist
+    """
+    job = get_job(job_id)
+    if not job or job.get('type') != 'dedup':
+        return None
+
+    counts = job.get('counts', {})
+    clusters = counts.get('clusters', 0)
+    if job.get('phase') in ('merging', 'merged') and clusters:
+        progress = int(counts.get('merged_clusters', 0) * 100 / clusters)
+    else:
+        progress = 100 if job.get('status') == 'completed' else 0
+
+    return {
+        'success': True,
+        'job_id': job_id,
+        'status': job.get('status'),
+        'phase': job.get('phase'),
+        'apply': job.get('apply'),
+        'progress': progress,
+        'counts': counts,
+        'started_at': job['started_at'].isoformat() if job.get('started_at') else None,
+        'finished_at': job['finished_at'].isoformat() if job.get('finished_at') else None
+    }
@@ -1,17 +1,27 @@
 # 1-10: Importing modules
 import os
-import time
+import re
 import logging
-from datetime import datetime
-from pymongo import MongoClient, ASCENDING
+from datetime import datetime, timedelta
+from pymongo import MongoClient, ASCENDING, DESCENDING, HASHED, UpdateOne, DeleteMany
 from pymongo.errors import ConnectionFailure
 from dotenv import load_dotenv
 import base64
 import io
 from PIL import Image
+from app.countries import resolve_card_country
+from app.ids import SnowflakeIds, lease_node_id, renew_node_lease
+from app.blobs import get_image_store, image_mime_type
+from app.preprocess import RENDITION_SIZES, THUMBNAIL_SIZE, PREVIEW_SIZE, render_rendition
+from app.contacts import CONTACT_KEY_FIELDS, contact_keys, duplicate_clauses, names_compatible
+from app.queries import find_view, find_one_view, find_page, iter_view, explain_view, PAGE_SORT, InvalidCursor
 
 # Load environment variables
 load_dotenv()
+COUNTRY_BACKFILL_BATCH = int(os.getenv('COUNTRY_BACKFILL_BATCH', 500))
+# Cards marked with an older version are reconsidered by backfill_card_countries; bump it when
+# the country resolver learns something new
+COUNTRY_CHECK_VERSION = 2
 
 # 11-20: Production MongoDB connection with pooling
 class MongoDBConnection:
@@ -52,6 +62,7 @@ class MongoDBConnection:
         # Create indexes for better performance
         try:
             create_indexes(collection)
+            backfill_contact_keys(collection)
         except Exception as e:
             logging.warning(f"Could not create indexes: {e}")
         
@@ -92,11 +103,74 @@ def create_indexes(collection):
         # Create unique index on id field
         collection.create_index([("id", ASCENDING)], unique=True, name="id_idx")
         
+        # Create compound indexes for keyset pagination, newest first (see app.queries.PAGE_SORT)
+        collection.create_index([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id_idx")
+        collection.create_index([("label_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+                                name="label_created_at_id_idx")
+        collection.create_index([("is_sorted", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+                                name="sorted_created_at_id_idx")
+        collection.create_index([("country", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+                                name="country_created_at_id_idx")
+        collection.create_index([("event_name", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+                                name="event_created_at_id_idx")
+        
+        # Create index on the country backfill marker so the job only reads unchecked cards
+        collection.create_index([("country_checked", ASCENDING), ("id", ASCENDING)], name="country_checked_idx")
+        
+        # Create hashed indexes on the normalized contact keys for equality duplicate lookups
+        for field in CONTACT_KEY_FIELDS:
+            collection.create_index([(field, HASHED)], name=f"{field}_idx")
+        
+        # Create sparse index to find the cards sharing a stored image
+        collection.create_index([("image_ref", ASCENDING)], sparse=True, name="image_ref_idx")
+        for size in RENDITION_SIZES:
+            collection.create_index([(f"renditions.{size}", ASCENDING)], sparse=True, name=f"rendition_{size}_idx")
+        
+        # Create sparse index to list the cards cropped from one scanned page
+        collection.create_index([("source_page_id", ASCENDING)], sparse=True, name="source_page_idx")
+        
+        # Create job indexes; finished jobs expire after a week
+        jobs_collection = collection.database['jobs']
+        jobs_collection.create_index([("job_id", ASCENDING)], unique=True, name="job_id_idx")
+        jobs_collection.create_index([("created_at", ASCENDING)], expireAfterSeconds=7 * 24 * 3600, name="job_ttl_idx")
+        
+        # Create fuzzy dedup cluster indexes; clusters expire with their job
+        clusters_collection = collection.database['dedup_clusters']
+        clusters_collection.create_index([("job_id", ASCENDING), ("cluster", ASCENDING)], unique=True, name="dedup_cluster_idx")
+        clusters_collection.create_index([("job_id", ASCENDING), ("status", ASCENDING)], name="dedup_status_idx")
+        clusters_collection.create_index([("created_at", ASCENDING)], expireAfterSeconds=7 * 24 * 3600, name="dedup_ttl_idx")
+        
         print("✅ MongoDB indexes created successfully")
         
     except Exception as e:
         print(f"⚠️ Index creation warning: {str(e)}")
 
+def backfill_contact_keys(collection, batch_size=500):
+    """
+    Compute normalized contact keys for records stored before they existed
+    Returns the number of records updated
+    """
+    try:
+        updated = 0
+        operations = []
+        cursor = collection.find({'email_norm': {'$exists': False}},
+                                 {'_id': 1, 'name': 1, 'email': 1, 'phone': 1, 'country': 1})
+        for record in cursor:
+            operations.append(UpdateOne({'_id': record['_id']}, {'$set': contact_keys(record)}))
+            if len(operations) >= batch_size:
+                updated += collection.bulk_write(operations, ordered=False).modified_count
+                operations = []
+        if operations:
+            updated += collection.bulk_write(operations, ordered=False).modified_count
+        
+        if updated:
+            print(f"✅ Backfilled contact keys for {updated} records")
+        return updated
+        
+    except Exception as e:
+        print(f"⚠️ Contact key backfill warning: {str(e)}")
+        return 0
+
 # 31-40: Initialize collection object for export
 try:
     collection = get_mongo_connection()
@@ -104,6 +178,9 @@ except Exception as e:
     print(f"❌ Failed to initialize MongoDB collection: {str(e)}")
     collection = None
 
+# Collision-free record and label IDs shared by every insert path
+record_ids = SnowflakeIds(lambda: lease_node_id(collection), renew=lambda node: renew_node_lease(collection, node))
+
 # 41-50: CRUD operations for extraction records
 def add_extraction_record(record_data):
     """
@@ -112,10 +189,11 @@ def add_extraction_record(record_data):
     """
     try:
         # Add unique ID and timestamp
-        record_id = int(time.time() * 1000)  # Unique timestamp ID
+        record_id = record_ids.next_id()
         record_data['id'] = record_id
         record_data['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         record_data['created_at'] = datetime.now()
+        record_data.update(contact_keys(record_data))
         
         # Insert into MongoDB
         result = collection.insert_one(record_data)
@@ -132,14 +210,14 @@ def add_extraction_record(record_data):
         return None
 
 # 51-60: Load all extraction data from MongoDB
-def load_extraction_data():
+def load_extraction_data(view='full'):
     """
-    Load all extraction records from MongoDB
+    Load all extraction records from MongoDB with the fields of a named view (see app.queries)
     Returns list of records sorted by timestamp (newest first)
     """
     try:
         # Query all records and sort by created_at (newest first)
-        records = list(collection.find({}, {'_id': 0}).sort('created_at', -1))
+        records = find_view(collection, view, sort=[('created_at', -1)])
         
         print(f"📊 Loaded {len(records)} records from MongoDB")
         return records
@@ -148,6 +226,19 @@ def load_extraction_data():
         print(f"❌ Error loading data from MongoDB: {str(e)}")
         return []
 
+def iter_extraction_data(query=None, view='export_row', batch_size=1000):
+    """
+    Stream the extraction records matching a filter, newest first, batch_size per round trip
+    Yields records with the fields of a named view (see app.queries)
+    """
+    return iter_view(collection, view, query, sort=PAGE_SORT, batch_size=batch_size)
+
+def explain_extraction_query(query=None, view='export_row'):
+    """
+    Winning plan and execution counts of an iter_extraction_data query (runs the query once)
+    """
+    return explain_view(collection, view, query, sort=PAGE_SORT)
+
 # 61-70: Update an existing extraction record
 def update_extraction_record(record_id, updated_data):
     """
@@ -182,10 +273,11 @@ def delete_extraction_record(record_id):
     Returns True if successful, False otherwise
     """
     try:
-        # Delete the record
-        result = collection.delete_one({'id': record_id})
+        # Delete the record, then its image unless another card shares it
+        record = collection.find_one_and_delete({'id': record_id}, {'_id': 0, 'image_ref': 1, 'renditions': 1})
         
-        if result.deleted_count > 0:
+        if record is not None:
+            release_images(card_image_refs(record))
             print(f"✅ Record {record_id} deleted from MongoDB")
             return True
         else:
@@ -197,17 +289,14 @@ def delete_extraction_record(record_id):
         return False
 
 # 81-90: Get recent extractions
-def get_recent_extractions(limit=5, skip=0):
+def get_recent_extractions(limit=5, skip=0, view='list_row'):
     """
     Get recent extraction records from MongoDB with pagination
     Returns list of most recent records
     """
     try:
         # Query recent records with pagination
-        records = list(collection.find({}, {'_id': 0})
-                      .sort('created_at', -1)
-                      .skip(skip)
-                      .limit(limit))
+        records = find_view(collection, view, sort=PAGE_SORT, skip=skip, limit=limit)
         
         print(f"📊 Retrieved {len(records)} recent records from MongoDB (skip: {skip}, limit: {limit})")
         return records
@@ -217,33 +306,64 @@ def get_recent_extractions(limit=5, skip=0):
         return []
 
 # 91-100: Check for duplicate records
-def is_duplicate_record(name, email, phone):
+# Card fields a duplicate upload may fill in when the stored card left them empty
+MERGE_FIELDS = ['name', 'company', 'email', 'phone', 'website', 'designation', 'address', 'country',
+                'event_name', 'event_description', 'event_host', 'event_date', 'event_location']
+
+def find_duplicates(cards):
     """
-    Check if a record with similar data already exists in MongoDB
-    Returns True if duplicate found, False otherwise
+    Check a whole batch of card dicts against MongoDB in one query
+    Returns a list aligned with cards holding the matching stored card (without image) or None;
+    None entries in cards are skipped. A shared email or phone under a different name is not a match
     """
+    matches = [None] * len(cards)
     try:
-        # Search for potential duplicates
-        query = {
-            '$or': [
-                {'name': {'$regex': f'^{name}$', '$options': 'i'}},  # Case insensitive name match
-                {'email': email.lower()},  # Exact email match
-                {'phone': phone}  # Exact phone match
-            ]
-        }
+        keys = [contact_keys(card) if card else {} for card in cards]
+        values = {field: sorted({key[field] for key in keys if key.get(field)}) for field in CONTACT_KEY_FIELDS}
+        clauses = [{field: {'$in': values[field]}} for field in CONTACT_KEY_FIELDS if values[field]]
+        if not clauses:
+            return matches
         
-        # Check if any matching record exists
-        existing_record = collection.find_one(query)
+        # Index the candidates by key so each card is matched without another round trip
+        by_key = {}
+        for record in find_view(collection, 'full', {'$or': clauses}, sort=[('id', ASCENDING)]):
+            for field in CONTACT_KEY_FIELDS:
+                if record.get(field):
+                    by_key.setdefault((field, record[field]), []).append(record)
         
-        if existing_record:
-            print(f"⚠️ Duplicate record found: {existing_record.get('name', 'Unknown')}")
-            return True
+        for position, key in enumerate(keys):
+            candidates = (record for clause in duplicate_clauses(key)
+                          for record in by_key.get(next(iter(clause.items())), []))
+            matches[position] = next((record for record in candidates if names_compatible(key, record)), None)
         
-        return False
+        found = sum(1 for match in matches if match)
+        if found:
+            print(f"⚠️ {found} of {len(cards)} cards already exist in MongoDB")
+        return matches
         
     except Exception as e:
-        print(f"❌ Error checking for duplicates: {str(e)}")
-        return False
+        print(f"❌ Error checking batch for duplicates: {str(e)}")
+        return matches
+
+def merge_duplicate_card(existing, card):
+    """
+    Fill the empty fields of a stored card from a newly extracted duplicate
+    Returns the merged card fields (JSON-serializable, including 'id')
+    """
+    fill = {field: value for field, value in card.items()
+            if field in MERGE_FIELDS and value and not existing.get(field)}
+    if fill:
+        fill.update(contact_keys({**existing, **fill}))
+        if 'country' in fill:
+            fill['flag'] = card.get('flag', '🌍')
+            fill['country_source'] = card.get('country_source', 'none')
+        fill['updated_at'] = datetime.now()
+        collection.update_one({'id': existing['id']}, {'$set': fill})
+        print(f"🔁 Merged {len(fill)} fields into card {existing['id']}")
+    
+    merged = {field: value for field, value in {**existing, **fill}.items() if not isinstance(value, datetime)}
+    merged['duplicate'] = True
+    return merged
 
 # 101-120: Label management functions
 def create_label(label_name, color="#0891b2"):
@@ -253,7 +373,7 @@ def create_label(label_name, color="#0891b2"):
     """
     try:
         label_data = {
-            "id": int(time.time() * 1000),
+            "id": record_ids.next_id(),
             "name": label_name,
             "color": color,
             "created_at": datetime.now(),
@@ -433,7 +553,7 @@ def remove_label_from_card(record_id):
         return False
 
 # 121-140: Card filtering and grouping functions
-def get_cards_by_status(is_sorted=None):
+def get_cards_by_status(is_sorted=None, view='list_row'):
     """
     Get cards by sorted status
     Returns list of cards
@@ -443,96 +563,225 @@ def get_cards_by_status(is_sorted=None):
         if is_sorted is not None:
             query['is_sorted'] = is_sorted
         
-        cards = list(collection.find(query, {'_id': 0}).sort('created_at', -1))
+        cards = find_view(collection, view, query, sort=[('created_at', -1)])
         return cards
         
     except Exception as e:
         print(f"❌ Error getting cards by status: {str(e)}")
         return []
 
-def get_cards_by_label(label_id):
+def get_cards_page(query=None, limit=None, cursor=None, view='list_row'):
     """
-    Get all cards with a specific label
-    Returns list of cards
+    Get one page of cards, newest first, continuing after an opaque cursor
+    Returns (cards, next_cursor); raises app.queries.InvalidCursor for a bad cursor
     """
     try:
-        cards = list(collection.find(
-            {'label_id': label_id}, 
-            {'_id': 0}
-        ).sort('created_at', -1))
-        
-        return cards
+        return find_page(collection, view, query, limit=limit, cursor=cursor)
         
+    except InvalidCursor:
+        raise
     except Exception as e:
-        print(f"❌ Error getting cards by label: {str(e)}")
-        return []
+        print(f"❌ Error getting page of cards: {str(e)}")
+        return [], None
+
+def get_cards_by_label(label_id, limit=None, cursor=None, view='list_row'):
+    """
+    Get a page of the cards with a specific label
+    Returns (cards, next_cursor)
+    """
+    return get_cards_page({'label_id': label_id}, limit=limit, cursor=cursor, view=view)
 
-def search_cards(query_text):
+def search_cards(query_text, limit=None, cursor=None, view='list_row'):
     """
     Search cards by name, company, email, or phone
-    Returns list of matching cards
+    Returns a page of matching cards as (cards, next_cursor)
+    """
+    search_query = {
+        '$or': [
+            {'name': {'$regex': query_text, '$options': 'i'}},
+            {'company': {'$regex': query_text, '$options': 'i'}},
+            {'email': {'$regex': query_text, '$options': 'i'}},
+            {'phone': {'$regex': query_text, '$options': 'i'}},
+            {'country': {'$regex': query_text, '$options': 'i'}}
+        ]
+    }
+    return get_cards_page(search_query, limit=limit, cursor=cursor, view=view)
+
+# Fields the /manage search box looks in
+CARD_SEARCH_FIELDS = ['name', 'company', 'email', 'phone', 'country', 'designation',
+                      'event_name', 'event_host', 'event_location']
+
+def _filter_date(value, end=False):
+    """A datetime, or an ISO date string; a date-only end of range includes that whole day"""
+    if isinstance(value, datetime) or not value:
+        return value
+    parsed = datetime.fromisoformat(str(value))
+    if end and len(str(value)) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+def compile_card_filter(spec):
+    """
+    Compile a card filter spec into one MongoDB query; every clause is an equality, $in or
+    range on an indexed field (label_id, country, event_name, is_sorted, created_at)
+    spec keys, all optional:
+        labels      label IDs
+        unlabeled   True to include cards without a label (alone: only those cards)
+        countries   country codes; 'UNKNOWN' also matches cards without a country
+        event       event name
+        date_from   first created_at day or datetime
+        date_to     last created_at day (inclusive) or datetime (exclusive)
+        sorted      True for sorted cards, False for unsorted ones
+    Raises ValueError for a malformed date
+    """
+    clauses = []
+    if spec.get('labels') is not None or spec.get('unlabeled'):
+        labels = list(spec.get('labels') or []) + ([None, ''] if spec.get('unlabeled') else [])
+        clauses.append({'label_id': labels[0]} if len(labels) == 1 else {'label_id': {'$in': labels}})
+    
+    countries = list(spec.get('countries') or [])
+    if 'UNKNOWN' in countries:
+        countries += [None, '']
+    if countries:
+        clauses.append({'country': countries[0]} if len(countries) == 1 else {'country': {'$in': countries}})
+    
+    if spec.get('event'):
+        clauses.append({'event_name': spec['event']})
+    
+    created_at = {}
+    if spec.get('date_from'):
+        created_at['$gte'] = _filter_date(spec['date_from'])
+    if spec.get('date_to'):
+        created_at['$lt'] = _filter_date(spec['date_to'], end=True)
+    if created_at:
+        clauses.append({'created_at': created_at})
+    
+    if spec.get('sorted') is True:
+        clauses.append({'is_sorted': True})
+    elif spec.get('sorted') is False:
+        clauses.append({'is_sorted': {'$in': [False, None]}})
+    
+    if not clauses:
+        return {}
+    return clauses[0] if len(clauses) == 1 else {'$and': clauses}
+
+def card_list_query(section=None, label_id=None, text=None, country=None):
+    """
+    Build the filter of a card list on /manage or /results
+    section: 'unsorted', 'sorted' or None for all cards; text is matched literally
+    """
+    query = compile_card_filter({
+        'sorted': {'unsorted': False, 'sorted': True}.get(section),
+        'labels': [label_id] if label_id is not None else None,
+        'countries': [country] if country else None
+    })
+    if not text:
+        return query
+    
+    pattern = re.escape(text)
+    search = {'$or': [{field: {'$regex': pattern, '$options': 'i'}} for field in CARD_SEARCH_FIELDS]}
+    return {'$and': [query, search]} if query else search
+
+def count_cards(query=None):
+    """
+    Count the cards matching a filter
     """
     try:
-        search_query = {
-            '$or': [
-                {'name': {'$regex': query_text, '$options': 'i'}},
-                {'company': {'$regex': query_text, '$options': 'i'}},
-                {'email': {'$regex': query_text, '$options': 'i'}},
-                {'phone': {'$regex': query_text, '$options': 'i'}},
-                {'country': {'$regex': query_text, '$options': 'i'}}
-            ]
-        }
+        if not query:
+            return collection.estimated_document_count()
+        return collection.count_documents(query)
         
-        cards = list(collection.find(search_query, {'_id': 0}).sort('created_at', -1))
-        return cards
+    except Exception as e:
+        print(f"❌ Error counting cards: {str(e)}")
+        return 0
+
+def get_country_counts():
+    """
+    Number of cards per stored country, most common first
+    Returns a list of {'country', 'flag', 'count'}
+    """
+    try:
+        pipeline = [
+            {'$group': {'_id': '$country', 'flag': {'$first': '$flag'}, 'count': {'$sum': 1}}},
+            {'$sort': {'count': -1, '_id': 1}}
+        ]
+        counts = {}
+        for group in collection.aggregate(pipeline):
+            country = group['_id'] or 'UNKNOWN'  # Missing, empty and UNKNOWN are one filter option
+            entry = counts.setdefault(country, {'country': country, 'flag': '🌍' if country == 'UNKNOWN' else group.get('flag') or '🌍',
+                                                'count': 0})
+            entry['count'] += group['count']
+        return sorted(counts.values(), key=lambda entry: (-entry['count'], entry['country']))
         
     except Exception as e:
-        print(f"❌ Error searching cards: {str(e)}")
+        print(f"❌ Error counting cards per country: {str(e)}")
         return []
 
-# 141-160: Country detection function
-def detect_country_from_company(company_name):
-    """
-    Simple country detection based on company name patterns
-    Returns country code and flag emoji
-    """
-    country_mapping = {
-        # Common patterns for country detection
-        'pvt ltd': ('IN', '🇮🇳'),
-        'private limited': ('IN', '🇮🇳'), 
-        'ltd': ('GB', '🇬🇧'),
-        'limited': ('GB', '🇬🇧'),
-        'inc': ('US', '🇺🇸'),
-        'incorporated': ('US', '🇺🇸'),
-        'llc': ('US', '🇺🇸'),
-        'corp': ('US', '🇺🇸'),
-        'gmbh': ('DE', '🇩🇪'),
-        'sarl': ('FR', '🇫🇷'),
-        'spa': ('IT', '🇮🇹'),
-        'bv': ('NL', '🇳🇱'),
-        'ab': ('SE', '🇸🇪'),
-        'pty': ('AU', '🇦🇺'),
-        'technologies': ('IN', '🇮🇳'),
-        'tech': ('US', '🇺🇸'),
-        'solutions': ('IN', '🇮🇳'),
-        'consulting': ('US', '🇺🇸'),
-        'systems': ('US', '🇺🇸'),
-        'company name': ('IN', '🇮🇳'),  # For test data
-        'your company': ('IN', '🇮🇳'),  # For test data
-        'company': ('IN', '🇮🇳')  # Generic fallback for company
-    }
-    
-    if not company_name:
-        return 'UNKNOWN', '🌍'
-    
-    company_lower = company_name.lower()
-    
-    for pattern, (country_code, flag) in country_mapping.items():
-        if pattern in company_lower:
-            return country_code, flag
-    
-    # Default fallback
-    return 'UNKNOWN', '🌍'
+# Analytics report statistics, computed by MongoDB so only the aggregates reach Python
+ANALYTICS_TOP_COMPANIES = 20
+
+def _trimmed(field):
+    """Aggregation expression for a text field with surrounding whitespace removed; '' when missing"""
+    return {'$trim': {'input': {'$ifNull': [f'${field}', '']}}}
+
+def _count_if(condition):
+    return {'$sum': {'$cond': [condition, 1, 0]}}
+
+def get_card_analytics(query=None):
+    """
+    Statistics of the analytics report in one $facet aggregation: field coverage, contact
+    method buckets, top companies and cards per country
+    Returns {'total', 'with_email', 'with_phone', 'with_company', 'email_only', 'phone_only',
+    'both_contacts', 'no_contact', 'companies', 'countries'} with companies and countries as
+    (name, count) lists, most common first; None on error
+    """
+    try:
+        pipeline = [{'$match': query}] if query else []
+        pipeline += [
+            {'$project': {
+                '_id': 0,
+                'company': _trimmed('company'),
+                'country': _trimmed('country'),
+                'has_email': {'$ne': [_trimmed('email'), '']},
+                'has_phone': {'$ne': [_trimmed('phone'), '']}
+            }},
+            {'$facet': {
+                'summary': [{'$group': {
+                    '_id': None,
+                    'total': {'$sum': 1},
+                    'with_email': _count_if('$has_email'),
+                    'with_phone': _count_if('$has_phone'),
+                    'with_company': _count_if({'$ne': ['$company', '']}),
+                    'email_only': _count_if({'$and': ['$has_email', {'$eq': ['$has_phone', False]}]}),
+                    'phone_only': _count_if({'$and': ['$has_phone', {'$eq': ['$has_email', False]}]}),
+                    'both_contacts': _count_if({'$and': ['$has_email', '$has_phone']}),
+                    'no_contact': _count_if({'$and': [{'$eq': ['$has_email', False]}, {'$eq': ['$has_phone', False]}]})
+                }}],
+                'companies': [
+                    {'$match': {'company': {'$ne': ''}}},
+                    {'$group': {'_id': '$company', 'count': {'$sum': 1}}},
+                    {'$sort': {'count': -1, '_id': 1}},
+                    {'$limit': ANALYTICS_TOP_COMPANIES}
+                ],
+                'countries': [
+                    {'$match': {'country': {'$ne': ''}}},
+                    {'$group': {'_id': '$country', 'count': {'$sum': 1}}},
+                    {'$sort': {'count': -1, '_id': 1}}
+                ]
+            }}
+        ]
+        result = next(collection.aggregate(pipeline, allowDiskUse=True), {})
+        
+        summary = (result.get('summary') or [{}])[0]
+        analytics = {key: summary.get(key, 0) for key in ('total', 'with_email', 'with_phone', 'with_company',
+                                                          'email_only', 'phone_only', 'both_contacts', 'no_contact')}
+        analytics['companies'] = [(group['_id'], group['count']) for group in result.get('companies', [])]
+        analytics['countries'] = [(group['_id'], group['count']) for group in result.get('countries', [])]
+        return analytics
+        
+    except Exception as e:
+        print(f"❌ Error computing card analytics: {str(e)}")
+        return None
 
 # 161-200: Image storage and card preview functions
 def store_card_with_image(extracted_data, image_bytes, filename):
@@ -541,17 +790,20 @@ def store_card_with_image(extracted_data, image_bytes, filename):
     Returns the record ID if successful
     """
     try:
-        # Convert image to base64
-        image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-        image_data_uri = f"data:image/jpeg;base64,{image_base64}"
+        # Store the image in the content-addressed image store; the card keeps a reference
+        image_ref = get_image_store().put(image_bytes)
+        renditions = put_renditions(image_bytes)
         
-        # Create record with image
-        record_id = int(time.time() * 1000)
+        # Create record with image reference
+        record_id = record_ids.next_id()
         record_data = {
             'id': record_id,
             'card_id': str(record_id),  # String version for easier lookup
             'filename': filename,
-            'image_base64': image_data_uri,
+            'image_ref': image_ref,
+            'image_type': image_mime_type(image_bytes),
+            'image_size': len(image_bytes),
+            'renditions': renditions,
             'name': extracted_data.get('name', ''),
             'company': extracted_data.get('company', ''),
             'email': extracted_data.get('email', ''),
@@ -560,6 +812,8 @@ def store_card_with_image(extracted_data, image_bytes, filename):
             'designation': extracted_data.get('designation', ''),
             'country': extracted_data.get('country', 'UNKNOWN'),
             'flag': extracted_data.get('flag', '🌍'),
+            'country_source': extracted_data.get('country_source', 'none'),
+            'country_checked': COUNTRY_CHECK_VERSION,  # Resolved during extraction
             'is_sorted': extracted_data.get('is_sorted', False),
             'label_id': extracted_data.get('label_id'),
             'label_name': extracted_data.get('label_name'),
@@ -574,6 +828,13 @@ def store_card_with_image(extracted_data, image_bytes, filename):
             'updated_at': datetime.now()
         }
         
+        record_data.update(contact_keys(record_data))
+        
+        # Cards cropped from a multi-card scan keep a link to their source page
+        for field in ('source_page_id', 'source_filename', 'source_position', 'source_box'):
+            if extracted_data.get(field) is not None:
+                record_data[field] = extracted_data[field]
+        
         # Insert into MongoDB
         result = collection.insert_one(record_data)
         
@@ -588,18 +849,54 @@ def store_card_with_image(extracted_data, image_bytes, filename):
         print(f"❌ Error storing card with image: {str(e)}")
         return None
 
-def get_card_with_image(card_id):
+def put_renditions(image_bytes):
     """
-    Retrieve card data including image by card_id
+    Render the thumbnail and preview renditions of an image into the image store
+    Returns {size: image_ref} for the sizes that could be rendered
+    """
+    store = get_image_store()
+    renditions = {}
+    for size in RENDITION_SIZES:
+        try:
+            renditions[str(size)] = store.put(render_rendition(image_bytes, size))
+        except Exception as e:
+            print(f"⚠️ Could not render {size}px rendition: {str(e)}")
+    return renditions
+
+def add_image_urls(card, force=False):
+    """
+    Add 'image_url', 'thumbnail_url' and 'preview_url' to a card that has a stored image
+    force=True adds them for cards whose image may still be embedded (not projected)
+    """
+    if force or card.get('image_ref'):
+        card['image_url'] = f"/api/cards/{card['id']}/image"
+        card['thumbnail_url'] = f"/api/cards/{card['id']}/image/{THUMBNAIL_SIZE}"
+        card['preview_url'] = f"/api/cards/{card['id']}/image/{PREVIEW_SIZE}"
+    return card
+
+def card_image_refs(card):
+    """All image store references held by a card: the original and its renditions"""
+    return [card.get('image_ref')] + list((card.get('renditions') or {}).values())
+
+def get_card_with_image(card_id, inline_image=False):
+    """
+    Retrieve card data by card_id with 'image_url', 'thumbnail_url' and 'preview_url' pointing at its images
+    inline_image=True also embeds the image as an 'image_base64' data URI (API compatibility)
     Returns complete card document
     """
     try:
         # Try to find by id field first, then by card_id field
-        card = collection.find_one({'id': card_id}, {'_id': 0})
+        view = 'full' if inline_image else 'preview'
+        card = find_one_view(collection, view, {'id': card_id})
         if not card:
-            card = collection.find_one({'card_id': str(card_id)}, {'_id': 0})
+            card = find_one_view(collection, view, {'card_id': str(card_id)})
         
         if card:
+            add_image_urls(card, force=True)
+            if inline_image:
+                image = load_card_image(card['id'])
+                if image:
+                    card['image_base64'] = f"data:{image[1]};base64,{base64.b64encode(image[0]).decode('utf-8')}"
             print(f"✅ Retrieved card with image: {card_id}")
             return card
         else:
@@ -610,6 +907,173 @@ def get_card_with_image(card_id):
         print(f"❌ Error retrieving card: {str(e)}")
         return None
 
+def load_card_image(card_id):
+    """
+    Load the original image of a card from the image store (or a legacy embedded data URI)
+    Returns (image_bytes, mime_type, image_ref) or None
+    """
+    try:
+        card = collection.find_one({'id': card_id}, {'_id': 0, 'image_ref': 1, 'image_type': 1})
+        if card is None:
+            return None
+        
+        if card.get('image_ref'):
+            image_bytes = get_image_store().get(card['image_ref'])
+            return (image_bytes, card.get('image_type', 'image/jpeg'), card['image_ref']) if image_bytes else None
+        
+        # Not migrated yet
+        legacy = collection.find_one({'id': card_id}, {'_id': 0, 'image_base64': 1})
+        if not legacy or not legacy.get('image_base64'):
+            return None
+        header, _, data = legacy['image_base64'].partition(',')
+        image_bytes = base64.b64decode(data)
+        return image_bytes, image_mime_type(image_bytes), None
+        
+    except Exception as e:
+        print(f"❌ Error loading card image: {str(e)}")
+        return None
+
+def load_card_rendition(card_id, size):
+    """
+    Load a display rendition of a card image; cards stored before renditions existed
+    (or whose rendition went missing) get it rendered now and saved for next time
+    Returns (image_bytes, image_ref) or None
+    """
+    try:
+        key = str(size)
+        card = collection.find_one({'id': card_id}, {'_id': 0, f'renditions.{key}': 1})
+        if card is None:
+            return None
+        
+        store = get_image_store()
+        image_ref = (card.get('renditions') or {}).get(key)
+        if image_ref:
+            image_bytes = store.get(image_ref)
+            if image_bytes:
+                return image_bytes, image_ref
+        
+        # Lazy backfill from the original
+        original = load_card_image(card_id)
+        if not original:
+            return None
+        image_bytes = render_rendition(original[0], size)
+        image_ref = store.put(image_bytes)
+        collection.update_one({'id': card_id}, {'$set': {f'renditions.{key}': image_ref}})
+        print(f"🖼️ Rendered {size}px rendition of card {card_id}")
+        return image_bytes, image_ref
+        
+    except Exception as e:
+        print(f"❌ Error loading card rendition: {str(e)}")
+        return None
+
+def release_images(image_refs):
+    """
+    Delete images (originals or renditions) from the image store once no card references them any more
+    """
+    store = get_image_store()
+    for image_ref in set(filter(None, image_refs)):
+        try:
+            holders = [{'image_ref': image_ref}] + [{f'renditions.{size}': image_ref} for size in RENDITION_SIZES]
+            if not collection.find_one({'$or': holders}, {'_id': 1}):
+                store.delete(image_ref)
+        except Exception as e:
+            print(f"⚠️ Could not release image {image_ref}: {str(e)}")
+
+def migrate_card_images(batch_size=50, on_progress=None):
+    """
+    Move images embedded as base64 data URIs into the image store, a batch at a time,
+    leaving only the reference on each card. Safe to interrupt and run again.
+    on_progress(stats) is called after every batch
+    Returns {'migrated', 'failed', 'embedded_bytes', 'image_bytes'}
+    """
+    stats = {'migrated': 0, 'failed': 0, 'embedded_bytes': 0, 'image_bytes': 0}
+    store = get_image_store()
+    failed_ids = []
+    
+    while True:
+        # Re-query each batch so the cursor never outlives a long migration
+        batch = list(collection.find({'image_base64': {'$exists': True}, '_id': {'$nin': failed_ids}},
+                                     {'_id': 1, 'image_base64': 1}).limit(batch_size))
+        if not batch:
+            break
+        
+        operations = []
+        for record in batch:
+            try:
+                _, _, data = (record.get('image_base64') or '').partition(',')
+                image_bytes = base64.b64decode(data)
+                if not image_bytes:
+                    raise ValueError('empty image')
+                operations.append(UpdateOne(
+                    {'_id': record['_id']},
+                    {'$set': {'image_ref': store.put(image_bytes), 'image_type': image_mime_type(image_bytes),
+                              'image_size': len(image_bytes)},
+                     '$unset': {'image_base64': ''}}
+                ))
+                stats['embedded_bytes'] += len(record['image_base64'])
+                stats['image_bytes'] += len(image_bytes)
+            except Exception as e:
+                print(f"⚠️ Could not migrate image of {record['_id']}: {str(e)}")
+                failed_ids.append(record['_id'])
+                stats['failed'] += 1
+        
+        if operations:
+            collection.bulk_write(operations, ordered=False)
+            stats['migrated'] += len(operations)
+        if on_progress:
+            on_progress(dict(stats))
+    
+    print(f"✅ Migrated {stats['migrated']} card images ({stats['embedded_bytes'] / 1048576:.1f} MB embedded), "
+          f"{stats['failed']} failed")
+    return stats
+
+def backfill_card_countries(batch_size=None, on_progress=None):
+    """
+    Resolve the country and flag of cards stored without them, a batch at a time.
+    Every card read is marked with COUNTRY_CHECK_VERSION, so cards whose country cannot be
+    resolved are not read again. Safe to interrupt and run again.
+    on_progress(stats) is called after every batch
+    Returns {'checked', 'resolved', 'unresolved', 'failed'}
+    """
+    batch_size = batch_size or COUNTRY_BACKFILL_BATCH
+    stats = {'checked': 0, 'resolved': 0, 'unresolved': 0, 'failed': 0}
+    fields = {'_id': 1, 'id': 1, 'country': 1, 'flag': 1, 'phone': 1, 'address': 1, 'company': 1, 'email': 1,
+              'website': 1}
+    failed_ids = []
+    
+    while True:
+        # Re-query each batch; marked cards drop out of country_checked_idx's range
+        batch = list(collection.find({'country_checked': {'$ne': COUNTRY_CHECK_VERSION}, '_id': {'$nin': failed_ids}},
+                                     fields).limit(batch_size))
+        if not batch:
+            break
+        
+        operations = []
+        for card in batch:
+            try:
+                update = {'country_checked': COUNTRY_CHECK_VERSION}
+                if not card.get('country') or card.get('country') == 'UNKNOWN' or not card.get('flag'):
+                    resolved = resolve_card_country(card)
+                    if resolved['country'] != 'UNKNOWN' or not card.get('flag'):
+                        update.update({'country': resolved['country'], 'flag': resolved['flag'],
+                                       'country_source': resolved['source']})
+                    stats['resolved' if resolved['country'] != 'UNKNOWN' else 'unresolved'] += 1
+                operations.append(UpdateOne({'_id': card['_id']}, {'$set': update}))
+            except Exception as e:
+                print(f"⚠️ Could not resolve the country of card {card.get('id')}: {str(e)}")
+                failed_ids.append(card['_id'])
+                stats['failed'] += 1
+        
+        if operations:
+            collection.bulk_write(operations, ordered=False)
+            stats['checked'] += len(operations)
+        if on_progress:
+            on_progress(dict(stats))
+    
+    print(f"🌍 Checked {stats['checked']} cards: {stats['resolved']} countries resolved, "
+          f"{stats['unresolved']} unresolved, {stats['failed']} failed")
+    return stats
+
 def update_card_data(card_id, updated_fields):
     """
     Update card data while preserving image
@@ -619,18 +1083,27 @@ def update_card_data(card_id, updated_fields):
         # Add updated timestamp
         updated_fields['updated_at'] = datetime.now()
         
-        # If country is updated, detect flag
-        if 'country' in updated_fields or 'company' in updated_fields:
-            company = updated_fields.get('company', '')
-            if not company:
-                # Get existing company if not provided
-                existing_card = get_card_with_image(card_id)
-                if existing_card:
-                    company = existing_card.get('company', '')
+        country_evidence = any(field in updated_fields for field in ('country', 'company', 'phone', 'address', 'email',
+                                                                      'website'))
+        if country_evidence or any(field in updated_fields for field in ('name', 'email')):
+            existing_card = collection.find_one({'id': card_id}, {'_id': 0, 'name': 1, 'email': 1, 'country': 1,
+                                                                'country_source': 1, 'phone': 1, 'address': 1,
+                                                                'company': 1, 'website': 1}) or {}
+            merged = {**existing_card, **updated_fields}
             
-            country_code, flag = detect_country_from_company(company)
-            updated_fields['country'] = country_code
-            updated_fields['flag'] = flag
+            # Re-resolve country and flag when any of their evidence changes;
+            # an explicitly entered country always wins over phone or company inference
+            if country_evidence:
+                if existing_card.get('country_source') != 'country_field' and merged.get('country') == existing_card.get('country'):
+                    merged.pop('country', None)  # Inferred before (edit forms echo it back); infer again
+                resolved = resolve_card_country(merged)
+                updated_fields['country'] = merged['country'] = resolved['country']
+                updated_fields['flag'] = resolved['flag']
+                updated_fields['country_source'] = resolved['source']
+                updated_fields['country_checked'] = COUNTRY_CHECK_VERSION
+            
+            # Keep the normalized contact keys in step with the edited fields
+            updated_fields.update(contact_keys(merged))
         
         # Update the record
         result = collection.update_one(
@@ -681,3 +1154,304 @@ def get_all_country_flags():
     except Exception as e:
         print(f"❌ Error getting country flags: {str(e)}")
         return [('UNKNOWN', '🌍')]
+
+# 201-260: Background job store for upload progress tracking
+def _jobs_collection():
+    """Get the jobs collection used to share progress across all workers"""
+    return collection.database['jobs']
+
+def _job_files(filenames):
+    """Per-file entries and state counts of a job whose files are all queued"""
+    return {
+        'total': len(filenames),
+        'files': [{'index': idx, 'filename': name, 'state': 'queued', 'error': None, 'record_id': None}
+                  for idx, name in enumerate(filenames)],
+        'counts': {'queued': len(filenames), 'preprocessing': 0, 'extracting': 0, 'stored': 0, 'duplicate': 0,
+                   'failed': 0}
+    }
+
+def create_job(job_id, filenames, job_type='upload', engine=None):
+    """
+    Create a job document with one queued entry per file
+    Returns the job ID if successful
+    """
+    try:
+        now = datetime.now()
+        job_data = {
+            'job_id': job_id,
+            'type': job_type,
+            'engine': engine,
+            'status': 'queued',
+            **_job_files(filenames),
+            'created_at': now,
+            'started_at': None,
+            'finished_at': None,
+            'updated_at': now
+        }
+
+        _jobs_collection().insert_one(job_data)
+        print(f"✅ Job {job_id} created with {len(filenames)} files")
+        return job_id
+
+    except Exception as e:
+        print(f"❌ Error creating job: {str(e)}")
+        return None
+
+def reset_job_files(job_id, filenames):
+    """
+    Replace the file list of a job that has not started extracting (e.g. once scanned sheets
+    are split into cards) with one queued entry per file
+    """
+    update_job_fields(job_id, _job_files(filenames))
+
+def update_job_status(job_id, status):
+    """
+    Update the overall status of a job (queued, running, completed, failed)
+    """
+    try:
+        now = datetime.now()
+        update_fields = {'status': status, 'updated_at': now}
+        if status == 'running':
+            update_fields['started_at'] = now
+        elif status in ('completed', 'failed'):
+            update_fields['finished_at'] = now
+
+        _jobs_collection().update_one({'job_id': job_id}, {'$set': update_fields})
+
+    except Exception as e:
+        print(f"❌ Error updating job status: {str(e)}")
+
+def update_job_file_state(job_id, index, old_state, new_state, error=None, record_id=None):
+    """
+    Move one file of a job from old_state to new_state and adjust the state counts atomically
+    """
+    try:
+        update_fields = {
+            f'files.{index}.state': new_state,
+            'updated_at': datetime.now()
+        }
+        if error is not None:
+            update_fields[f'files.{index}.error'] = error
+        if record_id is not None:
+            update_fields[f'files.{index}.record_id'] = record_id
+
+        _jobs_collection().update_one(
+            {'job_id': job_id},
+            {
+                '$set': update_fields,
+                '$inc': {f'counts.{old_state}': -1, f'counts.{new_state}': 1}
+            }
+        )
+
+    except Exception as e:
+        print(f"❌ Error updating job file state: {str(e)}")
+
+def update_job_fields(job_id, fields=None, increments=None):
+    """
+    Set and/or increment arbitrary job fields (dotted paths allowed), refreshing the job heartbeat
+    """
+    try:
+        update = {'$set': dict(fields or {}, updated_at=datetime.now())}
+        if increments:
+            update['$inc'] = increments
+        _jobs_collection().update_one({'job_id': job_id}, update)
+
+    except Exception as e:
+        print(f"❌ Error updating job fields: {str(e)}")
+
+def touch_jobs(job_ids):
+    """
+    Refresh the heartbeat of jobs this process is queueing or running
+    """
+    try:
+        _jobs_collection().update_many({'job_id': {'$in': list(job_ids)}, 'status': {'$in': ['queued', 'running']}},
+                                       {'$set': {'updated_at': datetime.now()}})
+
+    except Exception as e:
+        print(f"❌ Error refreshing job heartbeats: {str(e)}")
+
+def fail_stale_job(job_id, stale_seconds):
+    """
+    Mark a queued or running job failed when its heartbeat is older than stale_seconds,
+    i.e. the worker process holding it was recycled or killed
+    Returns the updated job document, or None if the job is not stale
+    """
+    try:
+        now = datetime.now()
+        failed = {'status': 'failed', 'interrupted': True, 'finished_at': now}
+        job = _jobs_collection().find_one_and_update(
+            {
+                'job_id': job_id,
+                'status': {'$in': ['queued', 'running']},
+                'updated_at': {'$lt': datetime.fromtimestamp(now.timestamp() - stale_seconds)}
+            },
+            {'$set': failed},
+            projection={'_id': 0}
+        )
+        return dict(job, **failed) if job else None
+
+    except Exception as e:
+        print(f"❌ Error failing stale job: {str(e)}")
+        return None
+
+def claim_job(job_id, stale_seconds):
+    """
+    Atomically mark a job as running unless another worker is already running it
+    (a running job whose heartbeat is older than stale_seconds is taken over)
+    Returns the job document if claimed, None otherwise
+    """
+    try:
+        now = datetime.now()
+        return _jobs_collection().find_one_and_update(
+            {
+                'job_id': job_id,
+                '$or': [
+                    {'status': {'$ne': 'running'}},
+                    {'updated_at': {'$lt': datetime.fromtimestamp(now.timestamp() - stale_seconds)}}
+                ]
+            },
+            {'$set': {'status': 'running', 'started_at': now, 'finished_at': None, 'updated_at': now}},
+            projection={'_id': 0}
+        )
+
+    except Exception as e:
+        print(f"❌ Error claiming job: {str(e)}")
+        return None
+
+def get_job(job_id):
+    """
+    Get a job document by job ID
+    Returns the job document or None
+    """
+    try:
+        return _jobs_collection().find_one({'job_id': job_id}, {'_id': 0})
+
+    except Exception as e:
+        print(f"❌ Error getting job: {str(e)}")
+        return None
+
+# 261-290: Shared counters for monitoring across all workers
+def increment_counters(counter_name, increments):
+    """
+    Atomically increment named counter fields shared by every worker process
+    """
+    try:
+        collection.database['stats'].update_one(
+            {'_id': counter_name},
+            {'$inc': increments, '$set': {'updated_at': datetime.now()}},
+            upsert=True
+        )
+
+    except Exception as e:
+        print(f"❌ Error incrementing counters: {str(e)}")
+
+def get_counters(counter_name):
+    """
+    Get the current values of a named counter document
+    Returns a dict of counter values
+    """
+    try:
+        counters = collection.database['stats'].find_one({'_id': counter_name}, {'_id': 0, 'updated_at': 0})
+        return counters or {}
+
+    except Exception as e:
+        print(f"❌ Error getting counters: {str(e)}")
+        return {}
+
+# 291-380: Fuzzy dedup support
+def iter_dedup_cards(batch_size=1000):
+    """
+    Stream every card's matching fields (no images) for the fuzzy duplicate finder
+    """
+    projection = {'_id': 0, 'id': 1, 'name': 1, 'company': 1, 'email': 1, 'phone': 1, 'country': 1,
+                  'email_norm': 1, 'phone_norm': 1, 'name_norm': 1}
+    return collection.find({}, projection).batch_size(batch_size)
+
+def get_cards_by_ids(card_ids):
+    """
+    Get cards (without images) for a list of IDs
+    Returns a dict of card ID -> card
+    """
+    try:
+        cards = find_view(collection, 'full', {'id': {'$in': list(card_ids)}})
+        return {card['id']: card for card in cards}
+
+    except Exception as e:
+        print(f"❌ Error getting cards by ID: {str(e)}")
+        return {}
+
+def _dedup_clusters_collection():
+    """Get the collection holding the clusters found by each fuzzy dedup job"""
+    return collection.database['dedup_clusters']
+
+def save_dedup_clusters(job_id, clusters, batch_size=1000):
+    """
+    Replace the stored clusters of a job with a list of card ID lists, all pending
+    """
+    clusters_collection = _dedup_clusters_collection()
+    clusters_collection.delete_many({'job_id': job_id})
+    now = datetime.now()
+    documents = [{'job_id': job_id, 'cluster': number, 'ids': ids, 'status': 'pending', 'created_at': now}
+                 for number, ids in enumerate(clusters)]
+    for start in range(0, len(documents), batch_size):
+        clusters_collection.insert_many(documents[start:start + batch_size], ordered=False)
+
+def get_dedup_clusters(job_id, status=None, limit=100, skip=0):
+    """
+    Get a job's clusters in order, optionally only those with one status
+    Returns a list of {'cluster', 'ids', 'status'} dicts
+    """
+    try:
+        query = {'job_id': job_id}
+        if status:
+            query['status'] = status
+        cursor = _dedup_clusters_collection().find(query, {'_id': 0, 'cluster': 1, 'ids': 1, 'status': 1})
+        return list(cursor.sort('cluster', ASCENDING).skip(skip).limit(limit))
+
+    except Exception as e:
+        print(f"❌ Error getting dedup clusters: {str(e)}")
+        return []
+
+def mark_dedup_clusters(job_id, cluster_numbers, status):
+    """
+    Set the status of several clusters of a job
+    """
+    _dedup_clusters_collection().update_many(
+        {'job_id': job_id, 'cluster': {'$in': list(cluster_numbers)}},
+        {'$set': {'status': status}}
+    )
+
+def apply_card_merges(plans):
+    """
+    Apply merge plans from app.dedup.plan_merge: update each survivor and delete the merged cards
+    in one bulk write, then adjust label card counts
+    Returns the number of cards removed
+    """
+    if not plans:
+        return 0
+
+    now = datetime.now()
+    operations = []
+    label_changes = {}
+    for plan in plans:
+        update = dict(plan['update'])
+        update['$set'] = dict(update['$set'], updated_at=now)
+        operations.append(UpdateOne({'id': plan['survivor']}, update))
+        operations.append(DeleteMany({'id': {'$in': plan['removed']}}))
+        for label_id, change in plan['label_changes'].items():
+            label_changes[label_id] = label_changes.get(label_id, 0) + change
+
+    removed_images = [image_ref for card in
+                      collection.find({'id': {'$in': [card_id for plan in plans for card_id in plan['removed']]}},
+                                      {'_id': 0, 'image_ref': 1, 'renditions': 1})
+                      for image_ref in card_image_refs(card)]
+    result = collection.bulk_write(operations, ordered=True)
+    release_images(removed_images)
+
+    label_operations = [UpdateOne({'id': label_id}, {'$inc': {'card_count': change}})
+                        for label_id, change in label_changes.items() if change]
+    if label_operations:
+        collection.database['labels'].bulk_write(label_operations, ordered=False)
+
+    print(f"🔁 Merged {len(plans)} duplicate clusters, removed {result.deleted_count} cards")
+    return result.deleted_count
@@ -1,126 +1,179 @@
 # 1-10: Import modules
 import os
 import base64
-import requests
 import json
 from dotenv import load_dotenv
-from PIL import Image, ImageOps
-from io import BytesIO
+from app.preprocess import preprocess_image_bytes, PREPROCESS_MIME_TYPE
 from app.mongo import add_extraction_record, load_extraction_data, update_extraction_record, delete_extraction_record
+from app.gemini_client import gemini_client, GeminiAPIError
+from app.cache import make_cache_key
+from app.countries import resolve_country
 
-# 11-20: Load environment variables and country mapping
+# 11-20: Load environment variables
 load_dotenv()
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-GEMINI_API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={GEMINI_API_KEY}"
+GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')
+# GEMINI_API_URL may point at a local stand-in (see benchmarks/gemini_stub.py) for load testing
+GEMINI_API_URL = os.getenv('GEMINI_API_URL') or f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent?key={GEMINI_API_KEY}"
 
-# Country to flag mapping
-COUNTRY_FLAGS = {
-    'afghanistan': '🇦🇫', 'albania': '🇦🇱', 'algeria': '🇩🇿', 'argentina': '🇦🇷', 'armenia': '🇦🇲',
-    'australia': '🇦🇺', 'austria': '🇦🇹', 'azerbaijan': '🇦🇿', 'bangladesh': '🇧🇩', 'belgium': '🇧🇪',
-    'brazil': '🇧🇷', 'bulgaria': '🇧🇬', 'canada': '🇨🇦', 'chile': '🇨🇱', 'china': '🇨🇳',
-    'colombia': '🇨🇴', 'croatia': '🇭🇷', 'czech republic': '🇨🇿', 'denmark': '🇩🇰', 'egypt': '🇪🇬',
-    'finland': '🇫🇮', 'france': '🇫🇷', 'germany': '🇩🇪', 'greece': '🇬🇷', 'india': '🇮🇳',
-    'indonesia': '🇮🇩', 'iran': '🇮🇷', 'ireland': '🇮🇪', 'israel': '🇮🇱', 'italy': '🇮🇹',
-    'japan': '🇯🇵', 'kazakhstan': '🇰🇿', 'malaysia': '🇲🇾', 'mexico': '🇲🇽', 'netherlands': '🇳🇱',
-    'nigeria': '🇳🇬', 'norway': '🇳🇴', 'pakistan': '🇵🇰', 'poland': '🇵🇱', 'portugal': '🇵🇹',
-    'romania': '🇷🇴', 'russia': '🇷🇺', 'singapore': '🇸🇬', 'south korea': '🇰🇷', 'spain': '🇪🇸',
-    'sweden': '🇸🇪', 'switzerland': '🇨🇭', 'turkey': '🇹🇷', 'ukraine': '🇺🇦', 
-    'united kingdom': '🇬🇧', 'uk': '🇬🇧', 'britain': '🇬🇧', 'england': '🇬🇧',
-    'united states': '🇺🇸', 'usa': '🇺🇸', 'us': '🇺🇸', 'america': '🇺🇸'
-}
+# Prompt sent with every card; changing it (or the model) invalidates cached extractions
+EXTRACTION_PROMPT = "Extract information from this visiting card and return only JSON with these fields: name, phone, email, company, country. For country, detect from address, phone number format, or any country indicators in the text. If no country is detectable, leave it empty."
+BATCH_EXTRACTION_PROMPT = "You will receive {count} visiting card images, each preceded by a label 'Image N' where N runs from 0 to {last}. Extract information from every card and return only a JSON array with one object per image, each with these fields: index (the N of its label), name, phone, email, company, country. For country, detect from address, phone number format, or any country indicators in the text. If no country is detectable, leave it empty."
+EMPTY_RESULT = {"name": "", "phone": "", "email": "", "company": "", "country": "", "flag": "🌍"}
+
+# Batch extraction mode packs several cards into one request, bounded by total base64 payload bytes
+EXTRACTION_MODE = os.getenv('EXTRACTION_MODE', 'single').lower()
+GEMINI_BATCH_MAX_BYTES = int(os.getenv('GEMINI_BATCH_MAX_BYTES', 4 * 1024 * 1024))
+GEMINI_BATCH_MAX_IMAGES = int(os.getenv('GEMINI_BATCH_MAX_IMAGES', 8))
 
 def get_country_flag(country_name):
     """Get flag emoji for a country name"""
-    if not country_name:
-        return '🌍'
-    
-    # Try exact match first
-    country_lower = country_name.lower().strip()
-    if country_lower in COUNTRY_FLAGS:
-        return COUNTRY_FLAGS[country_lower]
-    
-    # Try partial matches
-    for country, flag in COUNTRY_FLAGS.items():
-        if country in country_lower or country_lower in country:
-            return COUNTRY_FLAGS[country]
-    
-    return '🌍'  # Default flag
+    return resolve_country(country=country_name)['flag']
 
-# 21-60: Gemini image extraction function
-def extract_data_from_image_gemini(image_bytes):
+# 21-60: Gemini image extraction functions
+def preprocess_image(image_bytes):
     """
-    21-60: Accepts image bytes, preprocesses, sends to Gemini API, returns structured data dict.
+    Preprocess raw image bytes (scaled decode, aspect-preserving resize, grayscale, contrast enhance)
+    and return the size-bounded encoded image as base64
     """
-    # 21-30: Preprocess image (resize, grayscale, contrast enhance)
-    pil_img = Image.open(BytesIO(image_bytes)).convert('RGB')
-    pil_img = ImageOps.exif_transpose(pil_img)  # Handle orientation
-    pil_img = pil_img.resize((min(1200, pil_img.width), min(800, pil_img.height)), Image.LANCZOS)
-    pil_img = ImageOps.grayscale(pil_img)
-    pil_img = ImageOps.autocontrast(pil_img)
-    
-    # 31-40: Convert to base64
-    buffered = BytesIO()
-    pil_img.save(buffered, format="JPEG")
-    img_b64 = base64.b64encode(buffered.getvalue()).decode()
+    return base64.b64encode(preprocess_image_bytes(image_bytes)).decode()
+
+def extraction_cache_key(image_bytes):
+    """Cache key for an image under the current prompt and model"""
+    return make_cache_key(image_bytes, EXTRACTION_PROMPT, GEMINI_MODEL)
 
+def extract_data_from_preprocessed(img_b64):
+    """
+    Send an already preprocessed base64 image to Gemini API and return structured data dict
+    """
     # 41-50: Prepare Gemini API request
     payload = {
         "contents": [
             {
                 "parts": [
-                    {"text": "Extract information from this visiting card and return only JSON with these fields: name, phone, email, company, country. For country, detect from address, phone number format, or any country indicators in the text. If no country is detectable, leave it empty."},
-                    {"inline_data": {"mime_type": "image/jpeg", "data": img_b64}}
+                    {"text": EXTRACTION_PROMPT},
+                    {"inline_data": {"mime_type": PREPROCESS_MIME_TYPE, "data": img_b64}}
                 ]
             }
         ]
     }
-    headers = {"Content-Type": "application/json"}
 
     # 51-60: Send request and parse response
+    text = ''
     try:
         print(f"🔥 Sending request to Gemini API...")
-        resp = requests.post(GEMINI_API_URL, headers=headers, data=json.dumps(payload), timeout=30)
-        resp.raise_for_status()
-        result = resp.json()
+        result = gemini_client.post_json(GEMINI_API_URL, payload, timeout=30)
         print(f"📋 Raw Gemini response: {result}")
         
         # Parse Gemini's response for JSON content
-        text = result['candidates'][0]['content']['parts'][0]['text']
+        text = _response_json_text(result)
         print(f"📝 Gemini text response: {text}")
         
-        # Clean the text to extract JSON (remove markdown formatting if present)
-        if '```json' in text:
-            text = text.split('```json')[1].split('```')[0].strip()
-        elif '```' in text:
-            text = text.split('```')[1].split('```')[0].strip()
-        
         # Try to parse JSON
         data = json.loads(text)
         print(f"✅ Parsed data: {data}")
         
-        # Ensure all required fields are present
-        extracted_country = data.get("country", "").strip()
+        return _structured_result(data)
+    except GeminiAPIError:
+        # API failures surface to the caller instead of coming back as a blank card
+        raise
+    except json.JSONDecodeError as e:
+        print(f"❌ JSON Parse Error: {e}")
+        print(f"Raw text was: {text}")
+        return dict(EMPTY_RESULT)
+    except Exception as e:
+        print(f"❌ Gemini API Error: {e}")
+        return dict(EMPTY_RESULT)
+
+def _response_json_text(result):
+    """Get the text of Gemini's first candidate with any markdown code fence removed"""
+    text = result['candidates'][0]['content']['parts'][0]['text']
+    
+    # Clean the text to extract JSON (remove markdown formatting if present)
+    if '```json' in text:
+        text = text.split('```json')[1].split('```')[0].strip()
+    elif '```' in text:
+        text = text.split('```')[1].split('```')[0].strip()
+    return text
+
+def _structured_result(data):
+    """Build the structured result dict (with flag) from one parsed Gemini JSON object"""
+    extracted_country = str(data.get("country") or "").strip()
+    
+    return {
+        "name": str(data.get("name") or "").strip(),
+        "phone": str(data.get("phone") or "").strip(), 
+        "email": str(data.get("email") or "").strip(),
+        "company": str(data.get("company") or "").strip(),
+        "country": extracted_country,
+        "flag": get_country_flag(extracted_country)
+    }
+
+# 61-120: Multi-image batch extraction
+def plan_batches(payload_sizes, max_bytes=GEMINI_BATCH_MAX_BYTES, max_images=GEMINI_BATCH_MAX_IMAGES):
+    """
+    Group images (by their base64 payload size) into batches bounded by total bytes and count
+    Returns a list of batches, each a list of positions into payload_sizes
+    """
+    batches = []
+    current, current_bytes = [], 0
+    for position, size in enumerate(payload_sizes):
+        if current and (current_bytes + size > max_bytes or len(current) >= max_images):
+            batches.append(current)
+            current, current_bytes = [], 0
+        current.append(position)
+        current_bytes += size
+    if current:
+        batches.append(current)
+    return batches
+
+def extract_batch_from_preprocessed(img_b64_list):
+    """
+    Send several preprocessed base64 images in one Gemini request
+    Returns {position: structured data dict} for the cards the response covered
+    """
+    parts = [{"text": BATCH_EXTRACTION_PROMPT.format(count=len(img_b64_list), last=len(img_b64_list) - 1)}]
+    for position, img_b64 in enumerate(img_b64_list):
+        parts.append({"text": f"Image {position}:"})
+        parts.append({"inline_data": {"mime_type": PREPROCESS_MIME_TYPE, "data": img_b64}})
+    
+    payload = {"contents": [{"parts": parts}]}
+    
+    text = ''
+    try:
+        print(f"🔥 Sending batch of {len(img_b64_list)} images to Gemini API...")
+        text = _response_json_text(gemini_client.post_json(GEMINI_API_URL, payload, timeout=60))
+        print(f"📝 Gemini batch response: {text}")
         
-        # Get flag for the country
-        flag = get_country_flag(extracted_country)
+        entries = json.loads(text)
+        if isinstance(entries, dict):
+            entries = entries.get('results') or entries.get('cards') or []
         
-        result_data = {
-            "name": data.get("name", "").strip(),
-            "phone": data.get("phone", "").strip(), 
-            "email": data.get("email", "").strip(),
-            "company": data.get("company", "").strip(),
-            "country": extracted_country,
-            "flag": flag
-        }
+        covered = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            try:
+                position = int(entry.get('index'))
+            except (TypeError, ValueError):
+                continue
+            if position < 0 or position >= len(img_b64_list) or position in covered:
+                continue
+            structured = _structured_result(entry)
+            # An entry with every field blank is treated as not covered
+            if any(structured[field] for field in ['name', 'email', 'phone', 'company']):
+                covered[position] = structured
         
-        return result_data
+        print(f"✅ Batch covered {len(covered)}/{len(img_b64_list)} images")
+        return covered
     except json.JSONDecodeError as e:
-        print(f"❌ JSON Parse Error: {e}")
+        print(f"❌ Batch JSON Parse Error: {e}")
         print(f"Raw text was: {text}")
-        return {"name": "", "phone": "", "email": "", "company": "", "country": "", "flag": "🌍"}
+        return {}
     except Exception as e:
-        print(f"❌ Gemini API Error: {e}")
-        return {"name": "", "phone": "", "email": "", "company": "", "country": "", "flag": "🌍"}
+        # Uncovered cards fall back to single-image calls, which report API errors
+        print(f"❌ Gemini API Batch Error: {e}")
+        return {}
 
 # 61-100: MongoDB data persistence functions (imported from mongo.py)
 # All data persistence functions are now imported from app.mongo module:
@@ -0,0 +1,126 @@
+# 1-10: Import modules
+import os
+import math
+import numpy as np
+from io import BytesIO
+from PIL import Image, ImageOps
+from dotenv import load_dotenv
+
+# 11-20: Load preprocessing settings
+load_dotenv()
+PREPROCESS_LONG_EDGE = int(os.getenv('PREPROCESS_LONG_EDGE', 1200))
+PREPROCESS_FORMAT = os.getenv('PREPROCESS_FORMAT', 'JPEG').upper()
+PREPROCESS_QUALITY = int(os.getenv('PREPROCESS_QUALITY', 85))
+PREPROCESS_MIN_QUALITY = int(os.getenv('PREPROCESS_MIN_QUALITY', 50))
+PREPROCESS_MAX_BYTES = int(os.getenv('PREPROCESS_MAX_BYTES', 300 * 1024))
+
+MIME_TYPES = {'JPEG': 'image/jpeg', 'WEBP': 'image/webp'}
+PREPROCESS_MIME_TYPE = MIME_TYPES.get(PREPROCESS_FORMAT, 'image/jpeg')
+
+# 21-50: Decode at reduced scale
+def _open_scaled(image_bytes, long_edge):
+    """
+    Open an image, letting the JPEG decoder scale it down (1/2, 1/4, 1/8) and decode
+    straight to grayscale so full-resolution RGB pixels are never materialized
+    """
+    img = Image.open(BytesIO(image_bytes))
+
+    if img.format == 'JPEG':
+        scale = min(1.0, long_edge / max(img.width, img.height))
+        requested_size = (math.ceil(img.width * scale), math.ceil(img.height * scale))
+        img.draft('L', requested_size)
+
+    return img
+
+# 51-90: Vectorized grayscale and autocontrast
+def _to_grayscale_array(img):
+    """Convert any PIL mode to an 8-bit grayscale NumPy array"""
+    if img.mode == 'L':
+        return np.asarray(img)
+
+    if img.mode in ('RGBA', 'LA', 'P'):
+        # Flatten transparency onto white like a printed card
+        img = img.convert('RGBA')
+        background = Image.new('RGBA', img.size, (255, 255, 255, 255))
+        img = Image.alpha_composite(background, img)
+
+    rgb = np.asarray(img.convert('RGB'), dtype=np.uint16)
+    # ITU-R 601-2 luma, same weights as PIL's convert('L')
+    gray = (rgb[..., 0] * 299 + rgb[..., 1] * 587 + rgb[..., 2] * 114 + 500) // 1000
+    return gray.astype(np.uint8)
+
+def _autocontrast(gray):
+    """Stretch the histogram to the full 0-255 range with a single lookup table"""
+    low, high = int(gray.min()), int(gray.max())
+    if high <= low:
+        return gray
+
+    lut = np.clip((np.arange(256, dtype=np.float32) - low) * (255.0 / (high - low)), 0, 255).round().astype(np.uint8)
+    return lut[gray]
+
+# 91-130: Size-bounded encoding
+def _encode_bounded(img, fmt, quality, min_quality, max_bytes):
+    """Encode, lowering quality until the output fits within max_bytes"""
+    while True:
+        buffered = BytesIO()
+        img.save(buffered, format=fmt, quality=quality, optimize=(fmt == 'JPEG'))
+        data = buffered.getvalue()
+        if len(data) <= max_bytes or quality <= min_quality:
+            return data
+        quality = max(min_quality, quality - 10)
+
+def preprocess_image_array(image_bytes, long_edge=PREPROCESS_LONG_EDGE):
+    """
+    Decode an uploaded card image at reduced scale, fix orientation, resize once to the
+    target long edge (aspect ratio preserved) and apply grayscale + autocontrast.
+    Returns the 8-bit grayscale NumPy array.
+    """
+    img = _open_scaled(image_bytes, long_edge)
+    img = ImageOps.exif_transpose(img)  # Handle orientation
+
+    # Grayscale first so the resize only touches one channel
+    img = Image.fromarray(_to_grayscale_array(img))
+
+    # Resize once, preserving aspect ratio
+    scale = long_edge / max(img.width, img.height)
+    if scale < 1.0:
+        new_size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+        img = img.resize(new_size, Image.LANCZOS, reducing_gap=2.0)
+
+    return _autocontrast(np.asarray(img))
+
+def preprocess_image_bytes(image_bytes, long_edge=PREPROCESS_LONG_EDGE, fmt=PREPROCESS_FORMAT,
+                           quality=PREPROCESS_QUALITY, max_bytes=PREPROCESS_MAX_BYTES):
+    """
+    Prepare an uploaded card image for OCR with preprocess_image_array, then encode it size-bounded.
+    Returns the encoded image bytes.
+    """
+    gray = preprocess_image_array(image_bytes, long_edge)
+    return _encode_bounded(Image.fromarray(gray), fmt, quality, PREPROCESS_MIN_QUALITY, max_bytes)
+
+# 131-160: Display renditions
+RENDITION_FORMAT = 'WEBP'
+RENDITION_QUALITY = int(os.getenv('RENDITION_QUALITY', 80))
+THUMBNAIL_SIZE = int(os.getenv('THUMBNAIL_SIZE', 160))
+PREVIEW_SIZE = int(os.getenv('PREVIEW_SIZE', 800))
+RENDITION_SIZES = (THUMBNAIL_SIZE, PREVIEW_SIZE)
+
+def render_rendition(image_bytes, long_edge, quality=RENDITION_QUALITY):
+    """
+    Downscale a card image for display: colour kept, orientation fixed, long edge at most
+    long_edge pixels (never enlarged), encoded as WebP.
+    Returns the encoded image bytes.
+    """
+    img = Image.open(BytesIO(image_bytes))
+    if img.format == 'JPEG':
+        scale = min(1.0, long_edge / max(img.width, img.height))
+        img.draft('RGB', (math.ceil(img.width * scale), math.ceil(img.height * scale)))
+    img = ImageOps.exif_transpose(img)
+
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA' if 'A' in img.getbands() or img.mode == 'P' else 'RGB')
+    img.thumbnail((long_edge, long_edge), Image.LANCZOS, reducing_gap=2.0)
+
+    buffered = BytesIO()
+    img.save(buffered, format=RENDITION_FORMAT, quality=quality, method=4)
+    return buffered.getvalue()
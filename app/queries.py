@@ -0,0 +1,294 @@
+# 1-10: Import modules
+import os
+import json
+import time
+import base64
+import threading
+import bson
+from datetime import datetime, timedelta, timezone
+from dotenv import load_dotenv
+
+# 11-20: Load query statistics settings
+load_dotenv()
+QUERY_STATS_ENABLED = os.getenv('QUERY_STATS_ENABLED', 'True').lower() == 'true'
+QUERY_STATS_FLUSH_SECONDS = int(os.getenv('QUERY_STATS_FLUSH_SECONDS', 30))
+QUERY_STATS_SAMPLE = 20  # Documents per query encoded to estimate the bytes fetched
+QUERY_STATS_COUNTER_NAME = 'query_views'
+PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', 50))
+PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 200))
+LIST_PAGE_SIZE = int(os.getenv('LIST_PAGE_SIZE', 50))  # Cards per page on /manage and /results
+
+# 21-60: Named card views; each read path fetches only the fields it renders
+EVENT_FIELDS = ('event_name', 'event_description', 'event_host', 'event_date', 'event_location')
+
+VIEW_FIELDS = {
+    # Rows of /manage, /results, the home page and the card list APIs
+    'list_row': ('id', 'card_id', 'name', 'company', 'email', 'phone', 'website', 'designation', 'address',
+                 'country', 'flag', 'is_sorted', 'label_id', 'label_name', 'approval_status', 'image_ref', 'filename',
+                 'timestamp') + EVENT_FIELDS,
+    # Rows of the Excel exports and analytics sheets
+    'export_row': ('id', 'name', 'phone', 'email', 'company', 'website', 'address', 'designation', 'country',
+                   'flag', 'label_id', 'label_name', 'filename', 'timestamp') + EVENT_FIELDS,
+    # One card in the preview panels
+    'preview': ('id', 'card_id', 'name', 'company', 'email', 'phone', 'website', 'designation', 'address',
+                'country', 'flag', 'country_source', 'is_sorted', 'label_id', 'label_name', 'approval_status',
+                'image_ref', 'image_type', 'image_size', 'filename', 'timestamp', 'created_at', 'updated_at',
+                'source_page_id', 'source_filename', 'source_position') + EVENT_FIELDS,
+}
+
+# Everything except the legacy embedded image
+FULL_PROJECTION = {'_id': 0, 'image_base64': 0}
+
+VIEWS = tuple(VIEW_FIELDS) + ('full',)
+
+def view_projection(view):
+    """
+    MongoDB projection for a named view ('list_row', 'export_row', 'preview' or 'full')
+    """
+    if view == 'full':
+        return dict(FULL_PROJECTION)
+    if view not in VIEW_FIELDS:
+        raise ValueError(f"Unknown card view: {view}")
+    projection = {field: 1 for field in VIEW_FIELDS[view]}
+    projection['_id'] = 0
+    return projection
+
+# 61-110: Per-view statistics, kept per process and flushed to the shared stats counters
+_pending = {}
+_last_flush = time.monotonic()
+_stats_lock = threading.Lock()
+
+def _estimate_bytes(rows, count=None):
+    """Average encoded size of the first QUERY_STATS_SAMPLE rows times the row count"""
+    sample = rows[:QUERY_STATS_SAMPLE]
+    if not sample:
+        return 0
+    try:
+        sample_bytes = sum(len(bson.encode(row)) for row in sample)
+    except Exception:
+        return 0
+    return sample_bytes * (len(rows) if count is None else count) // len(sample)
+
+def record_view_query(collection, view, rows, seconds, count=None):
+    """
+    Count one query of a view: documents returned, estimated bytes fetched and time spent
+    count overrides len(rows) when rows is only a sample of a streamed query
+    """
+    global _last_flush
+    if not QUERY_STATS_ENABLED:
+        return
+
+    count = len(rows) if count is None else count
+    estimated_bytes = _estimate_bytes(rows, count)
+    with _stats_lock:
+        totals = _pending.setdefault(view, {'queries': 0, 'documents': 0, 'bytes': 0, 'milliseconds': 0.0})
+        totals['queries'] += 1
+        totals['documents'] += count
+        totals['bytes'] += estimated_bytes
+        totals['milliseconds'] += seconds * 1000
+        if time.monotonic() - _last_flush < QUERY_STATS_FLUSH_SECONDS:
+            return
+        pending = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+
+    flush_view_stats(collection, pending)
+
+def flush_view_stats(collection, pending=None):
+    """
+    Add per-process view totals to the shared stats document
+    """
+    if pending is None:
+        with _stats_lock:
+            pending = dict(_pending)
+            _pending.clear()
+    increments = {f'{view}.{field}': round(value, 1) if isinstance(value, float) else value
+                  for view, totals in pending.items() for field, value in totals.items()}
+    if not increments:
+        return
+    try:
+        collection.database['stats'].update_one(
+            {'_id': QUERY_STATS_COUNTER_NAME},
+            {'$inc': increments, '$set': {'updated_at': datetime.now()}},
+            upsert=True
+        )
+    except Exception as e:
+        print(f"❌ Error saving query view stats: {str(e)}")
+
+def get_query_stats():
+    """
+    Per-view query statistics shared by all workers: queries, documents, average document
+    size and average query time
+    """
+    from app.mongo import collection, get_counters
+
+    flush_view_stats(collection)
+    stats = {}
+    for view, totals in get_counters(QUERY_STATS_COUNTER_NAME).items():
+        queries = totals.get('queries', 0)
+        documents = totals.get('documents', 0)
+        stats[view] = {
+            'queries': queries,
+            'documents': documents,
+            'avg_document_bytes': round(totals.get('bytes', 0) / documents) if documents else None,
+            'avg_query_ms': round(totals.get('milliseconds', 0) / queries, 2) if queries else None
+        }
+    return stats
+
+# 111-140: Running view queries
+def find_view(collection, view, query=None, sort=None, skip=0, limit=0):
+    """
+    Run a card query that fetches only the fields of the named view
+    sort is a list of (field, direction) pairs
+    Returns a list of row dicts
+    """
+    started = time.perf_counter()
+    cursor = collection.find(query or {}, view_projection(view))
+    if sort:
+        cursor = cursor.sort(sort)
+    if skip:
+        cursor = cursor.skip(skip)
+    if limit:
+        cursor = cursor.limit(limit)
+    rows = list(cursor)
+    record_view_query(collection, view, rows, time.perf_counter() - started)
+    return rows
+
+def find_one_view(collection, view, query):
+    """
+    Fetch one card with the fields of the named view
+    Returns the row dict or None
+    """
+    started = time.perf_counter()
+    row = collection.find_one(query, view_projection(view))
+    record_view_query(collection, view, [row] if row is not None else [], time.perf_counter() - started)
+    return row
+
+def iter_view(collection, view, query=None, sort=None, batch_size=1000):
+    """
+    Stream a card query with the fields of the named view, batch_size documents per round trip,
+    so callers can process any number of rows in constant memory
+    Yields row dicts
+    """
+    started = time.perf_counter()
+    cursor = collection.find(query or {}, view_projection(view), batch_size=batch_size)
+    if sort:
+        cursor = cursor.sort(sort)
+    sample = []
+    count = 0
+    try:
+        for row in cursor:
+            if len(sample) < QUERY_STATS_SAMPLE:
+                sample.append(row)
+            count += 1
+            yield row
+    finally:
+        cursor.close()
+        record_view_query(collection, view, sample, time.perf_counter() - started, count=count)
+
+def _plan_stages(stage):
+    """'IXSCAN country_created_at_id_idx <- FETCH <- PROJECTION_SIMPLE' from the innermost stage out"""
+    children = stage.get('inputStages') or ([stage['inputStage']] if 'inputStage' in stage else [])
+    inner = ' + '.join(_plan_stages(child) for child in children)
+    name = stage.get('stage', '?') + (f" {stage['indexName']}" if stage.get('indexName') else '')
+    if not inner:
+        return name
+    return f"{inner} <- {name}" if len(children) == 1 else f"({inner}) <- {name}"
+
+def explain_view(collection, view, query=None, sort=None):
+    """
+    Summarize the plan MongoDB picks for a view query, with its execution counts
+    Returns {'plan', 'keys_examined', 'docs_examined', 'returned', 'milliseconds'} or None
+    """
+    try:
+        cursor = collection.find(query or {}, view_projection(view))
+        if sort:
+            cursor = cursor.sort(sort)
+        explained = cursor.explain()
+        winning = explained.get('queryPlanner', {}).get('winningPlan', {})
+        execution = explained.get('executionStats', {})
+        return {
+            'plan': _plan_stages(winning.get('queryPlan', winning)),  # SBE plans nest the classic tree
+            'keys_examined': execution.get('totalKeysExamined'),
+            'docs_examined': execution.get('totalDocsExamined'),
+            'returned': execution.get('nReturned'),
+            'milliseconds': execution.get('executionTimeMillis')
+        }
+    except Exception as e:
+        print(f"⚠️ Could not explain {view} query: {str(e)}")
+        return None
+
+# 141-220: Keyset pagination on (created_at, id), newest first; backed by created_at_id_idx
+PAGE_SORT = [('created_at', -1), ('id', -1)]
+_EPOCH = datetime(1970, 1, 1)
+
+class InvalidCursor(ValueError):
+    """A page cursor that was not issued by encode_cursor"""
+
+def page_size(requested=None):
+    """Clamp a requested page size to 1..PAGE_SIZE_MAX (PAGE_SIZE_DEFAULT when not given)"""
+    if not requested:
+        return PAGE_SIZE_DEFAULT
+    return max(1, min(int(requested), PAGE_SIZE_MAX))
+
+def encode_cursor(row):
+    """
+    Opaque token for the position right after a row: its created_at (milliseconds,
+    as MongoDB stores it) and id
+    """
+    created_at = row.get('created_at')
+    if isinstance(created_at, datetime):
+        if created_at.tzinfo is not None:
+            created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+        created_at = (created_at - _EPOCH) // timedelta(milliseconds=1)
+    else:
+        created_at = None  # Legacy cards without created_at sort last
+    payload = json.dumps({'t': created_at, 'i': row['id']}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(token):
+    """
+    Decode a cursor from encode_cursor
+    Returns (created_at or None, id); raises InvalidCursor
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        created_at, record_id = payload['t'], payload['i']
+        if not isinstance(record_id, int) or not (created_at is None or isinstance(created_at, int)):
+            raise ValueError('bad cursor fields')
+    except Exception:
+        raise InvalidCursor(f"Invalid page cursor: {token}")
+    return (_EPOCH + timedelta(milliseconds=created_at) if created_at is not None else None), record_id
+
+def after_cursor(cursor):
+    """Filter for the rows that come after a cursor in PAGE_SORT order"""
+    created_at, record_id = decode_cursor(cursor)
+    if created_at is None:
+        return {'created_at': None, 'id': {'$lt': record_id}}
+    return {'$or': [
+        {'created_at': {'$lt': created_at}},
+        {'created_at': created_at, 'id': {'$lt': record_id}},
+        {'created_at': None}
+    ]}
+
+def find_page(collection, view, query=None, limit=None, cursor=None):
+    """
+    Fetch one page of cards in PAGE_SORT order with the fields of the named view
+    Returns (rows, next_cursor); next_cursor is None on the last page
+    """
+    limit = page_size(limit)
+    if cursor:
+        query = {'$and': [query, after_cursor(cursor)]} if query else after_cursor(cursor)
+
+    projection = view_projection(view)
+    if view != 'full':
+        projection['created_at'] = 1  # Needed for the next cursor
+
+    started = time.perf_counter()
+    rows = list(collection.find(query or {}, projection).sort(PAGE_SORT).limit(limit + 1))
+    record_view_query(collection, view, rows, time.perf_counter() - started)
+
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1])
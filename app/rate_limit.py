@@ -0,0 +1,186 @@
+# 1-10: Import modules
+import os
+import time
+import uuid
+import random
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+from dotenv import load_dotenv
+
+# 11-20: Load rate limit settings
+load_dotenv()
+GEMINI_RATE_LIMIT_ENABLED = os.getenv('GEMINI_RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+GEMINI_RATE_LIMIT_DB = os.getenv('GEMINI_RATE_LIMIT_DB', os.path.join(tempfile.gettempdir(), 'ocr_scanner_gemini_rate_limit.sqlite3'))
+GEMINI_RPM = float(os.getenv('GEMINI_RPM', 60))
+GEMINI_BURST = float(os.getenv('GEMINI_BURST', 10))
+GEMINI_MAX_CONCURRENT = int(os.getenv('GEMINI_MAX_CONCURRENT', 8))
+GEMINI_RATE_LIMIT_TIMEOUT = float(os.getenv('GEMINI_RATE_LIMIT_TIMEOUT', 120))
+
+# Leases and waiters of crashed processes are reclaimed after this many seconds
+_LEASE_TTL_SECONDS = 120
+_MAX_POLL_SECONDS = 0.5
+
+class RateLimitTimeout(Exception):
+    """Raised when no request slot became available within the timeout"""
+
+# 21-200: Cross-process token bucket backed by SQLite
+class TokenBucketRateLimiter:
+    """
+    Token bucket shared by every worker process on a node through a SQLite file.
+    A request needs one token (refilled at rpm/60 per second up to burst) and one of
+    max_concurrent leases. Waiting processes register themselves so the queue depth
+    and expected wait can be reported.
+    """
+
+    def __init__(self, db_path=GEMINI_RATE_LIMIT_DB, rpm=GEMINI_RPM, burst=GEMINI_BURST,
+                 max_concurrent=GEMINI_MAX_CONCURRENT, timeout=GEMINI_RATE_LIMIT_TIMEOUT,
+                 enabled=GEMINI_RATE_LIMIT_ENABLED):
+        self.db_path = db_path
+        self.rpm = max(rpm, 0.001)
+        self.burst = max(burst, 1.0)
+        self.max_concurrent = max(1, max_concurrent)
+        self.timeout = timeout
+        self.enabled = enabled
+        self._local = threading.local()
+
+    def _connect(self):
+        """Get this thread's SQLite connection, reopening it after a fork"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS bucket (id INTEGER PRIMARY KEY, tokens REAL, updated_at REAL)')
+        conn.execute('CREATE TABLE IF NOT EXISTS leases (lease_id TEXT PRIMARY KEY, pid INTEGER, expires_at REAL)')
+        conn.execute('CREATE TABLE IF NOT EXISTS waiters (waiter_id TEXT PRIMARY KEY, pid INTEGER, expires_at REAL)')
+        conn.execute('INSERT OR IGNORE INTO bucket (id, tokens, updated_at) VALUES (1, ?, ?)', (self.burst, time.time()))
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Exclusive write transaction across all processes"""
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _refill(self, conn, now):
+        """Purge stale leases/waiters, add tokens earned since the last update and return the token count"""
+        conn.execute('DELETE FROM leases WHERE expires_at < ?', (now,))
+        conn.execute('DELETE FROM waiters WHERE expires_at < ?', (now,))
+        tokens, updated_at = conn.execute('SELECT tokens, updated_at FROM bucket WHERE id = 1').fetchone()
+        tokens = min(self.burst, tokens + max(0.0, now - updated_at) * self.rpm / 60.0)
+        conn.execute('UPDATE bucket SET tokens = ?, updated_at = ? WHERE id = 1', (tokens, now))
+        return tokens
+
+    def acquire(self, timeout=None):
+        """
+        Block until a token and a concurrency lease are available
+        Returns a lease ID to pass to release(), or None when rate limiting is disabled
+        """
+        if not self.enabled:
+            return None
+
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+        waiter_id = uuid.uuid4().hex
+        lease_id = uuid.uuid4().hex
+        registered = False
+
+        try:
+            while True:
+                now = time.time()
+                with self._transaction() as conn:
+                    tokens = self._refill(conn, now)
+                    active = conn.execute('SELECT COUNT(*) FROM leases').fetchone()[0]
+
+                    if tokens >= 1 and active < self.max_concurrent:
+                        conn.execute('UPDATE bucket SET tokens = ? WHERE id = 1', (tokens - 1, ))
+                        conn.execute('INSERT INTO leases (lease_id, pid, expires_at) VALUES (?, ?, ?)',
+                                     (lease_id, os.getpid(), now + _LEASE_TTL_SECONDS))
+                        conn.execute('DELETE FROM waiters WHERE waiter_id = ?', (waiter_id,))
+                        registered = False
+                        return lease_id
+
+                    conn.execute('INSERT OR REPLACE INTO waiters (waiter_id, pid, expires_at) VALUES (?, ?, ?)',
+                                 (waiter_id, os.getpid(), min(deadline, now + _LEASE_TTL_SECONDS)))
+                    registered = True
+
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise RateLimitTimeout(f"No Gemini request slot available within {timeout:.0f}s")
+
+                # Sleep until the next token is due (or poll for a freed lease), with jitter
+                token_wait = (1 - tokens) * 60.0 / self.rpm if tokens < 1 else 0.05
+                time.sleep(min(remaining, max(0.01, min(token_wait, _MAX_POLL_SECONDS)) * random.uniform(1.0, 1.2)))
+        finally:
+            if registered:
+                try:
+                    with self._transaction() as conn:
+                        conn.execute('DELETE FROM waiters WHERE waiter_id = ?', (waiter_id,))
+                except sqlite3.Error:
+                    pass
+
+    def release(self, lease_id):
+        """Return a concurrency lease"""
+        if lease_id is None:
+            return
+        try:
+            with self._transaction() as conn:
+                conn.execute('DELETE FROM leases WHERE lease_id = ?', (lease_id,))
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not release rate limit lease: {str(e)}")
+
+    @contextmanager
+    def slot(self, timeout=None):
+        """Context manager holding one rate-limited request slot"""
+        try:
+            lease_id = self.acquire(timeout)
+        except sqlite3.Error as e:
+            # Fail open: a broken limiter file must not stop extraction
+            print(f"⚠️ Rate limiter unavailable, continuing without it: {str(e)}")
+            lease_id = None
+        try:
+            yield
+        finally:
+            self.release(lease_id)
+
+    def get_stats(self):
+        """Get current tokens, active requests, queue depth and expected wait across all workers"""
+        if not self.enabled:
+            return {'enabled': False}
+
+        try:
+            with self._transaction() as conn:
+                tokens = self._refill(conn, time.time())
+                active = conn.execute('SELECT COUNT(*) FROM leases').fetchone()[0]
+                queue_depth = conn.execute('SELECT COUNT(*) FROM waiters').fetchone()[0]
+        except sqlite3.Error as e:
+            return {'enabled': True, 'error': str(e)}
+
+        # Every queued request needs a token ahead of a new one
+        token_deficit = max(0.0, queue_depth + 1 - tokens)
+        wait_seconds = token_deficit * 60.0 / self.rpm
+
+        return {
+            'enabled': True,
+            'rpm': self.rpm,
+            'burst': self.burst,
+            'max_concurrent': self.max_concurrent,
+            'tokens': round(tokens, 2),
+            'active_requests': active,
+            'queue_depth': queue_depth,
+            'wait_seconds': round(wait_seconds, 2)
+        }
+
+# Node-wide limiter shared by every Gemini request
+gemini_rate_limiter = TokenBucketRateLimiter()
@@ -1,10 +1,14 @@
 # 1-10: Import modules
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, send_file
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, send_file, Response
 import os
 import time
-from app.ocr import extract_data_from_image_gemini
-from app.mongo import load_extraction_data, add_extraction_record, update_extraction_record, delete_extraction_record, get_recent_extractions
-from app.utils import save_uploaded_file, generate_excel_from_mongo, cleanup_temp_files, allowed_file, generate_advanced_analytics_report, generate_filtered_excel_by_labels, generate_filtered_excel_by_countries
+from io import BytesIO
+from app.jobs import submit_upload_job, get_job_progress
+from app.engines import get_engine, EngineUnavailableError
+from app.segment import expand_card_sheets
+from app.ingest import collect_uploads, parse_event_info, ingest_items
+from app.mongo import load_extraction_data, update_extraction_record, delete_extraction_record, get_recent_extractions, compile_card_filter
+from app.utils import generate_excel_from_mongo, generate_advanced_analytics_report, generate_filtered_excel, generate_filtered_excel_by_labels, generate_filtered_excel_by_countries
 from datetime import datetime, timedelta
 from functools import wraps
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -12,6 +16,19 @@ from werkzeug.security import generate_password_hash, check_password_hash
 # 11-20: Blueprint creation
 main_bp = Blueprint('main', __name__)
 
+def requested_engine():
+    """
+    OCR engine for this request: the 'engine' form or query field, else the configured default
+    Raises EngineUnavailableError for unknown or unavailable engines
+    """
+    return get_engine(request.form.get('engine') or request.args.get('engine'))
+
+def segment_requested():
+    """
+    Whether the upload sets segment=true to split multi-card flatbed scans into one item per card
+    """
+    return (request.form.get('segment') or request.args.get('segment') or '').lower() == 'true'
+
 @main_bp.route('/')
 def index():
     """
@@ -41,103 +58,43 @@ def upload_files():
         return redirect(url_for('main.index'))
     
     # Extract event information from form (optional)
-    event_info = {
-        'event_name': request.form.get('event_name', '').strip(),
-        'event_description': request.form.get('event_description', '').strip(),
-        'event_host': request.form.get('event_host', '').strip(),
-        'event_date': request.form.get('event_date', '').strip(),
-        'event_location': request.form.get('event_location', '').strip()
-    }
+    event_info = parse_event_info(request.form)
     
-    # Initialize processing variables
-    processed_data = []
-    saved_file_paths = []
-    upload_folder = current_app.config['UPLOAD_FOLDER']
-    skipped_files = []
-    total_files = len(uploaded_files)
-    processed_count = 0
+    # Choose the OCR engine (optional per-request override)
+    try:
+        engine = requested_engine()
+    except EngineUnavailableError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('main.index'))
     
-    os.makedirs(upload_folder, exist_ok=True)
-    print(f"📁 Upload folder: {upload_folder}")
+    total_files = len(uploaded_files)
     print(f"📊 Total files to process: {total_files}")
     
-    # Process each uploaded file
-    for idx, file in enumerate(uploaded_files):
-        if file and file.filename != '':
-            print(f"\n📄 Processing file {idx + 1}/{total_files}: {file.filename}")
-            
-            # Use enhanced validation for production
-            from app.utils import validate_image_file
-            
-            is_valid, error_message = validate_image_file(file)
-            if not is_valid:
-                print(f"❌ {error_message}: {file.filename}")
-                skipped_files.append(f"{file.filename} ({error_message})")
-                continue
-            
-            try:
-                # Save uploaded file temporarily
-                file_path = save_uploaded_file(file, upload_folder)
-                
-                if file_path:
-                    saved_file_paths.append(file_path)
-                    print(f"💾 File saved: {file_path}")
-                    
-                    # Read image as bytes for Gemini API
-                    with open(file_path, 'rb') as img_file:
-                        image_bytes = img_file.read()
-                    
-                    # Extract structured data using Gemini Vision API
-                    structured_data = extract_data_from_image_gemini(image_bytes)
-                    
-                    # Only add to processed data if we got valid results
-                    if any(structured_data.get(field, '').strip() for field in ['name', 'email', 'phone', 'company']):
-                        # Detect country and add management fields
-                        from app.mongo import detect_country_from_company, store_card_with_image
-                        country_code, flag = detect_country_from_company(structured_data.get('company', ''))
-                        structured_data['country'] = country_code
-                        structured_data['flag'] = flag
-                        structured_data['is_sorted'] = False  # New cards start as unsorted
-                        
-                        # Add event information to extracted data
-                        structured_data.update(event_info)
-                        
-                        # Store card with image in MongoDB
-                        record_id = store_card_with_image(structured_data, image_bytes, file.filename)
-                        structured_data['id'] = record_id
-                        
-                        processed_data.append(structured_data)
-                        processed_count += 1
-                        print(f"✅ Data extracted for: {file.filename} - {structured_data}")
-                    else:
-                        print(f"⚠️ No valid data extracted from {file.filename}")
-                else:
-                    print(f"❌ Failed to save {file.filename}")
-                    
-            except Exception as e:
-                print(f"❌ Error processing {file.filename}: {str(e)}")
-                continue
-    
+    # Read each valid uploaded file straight from the request into memory
+    extraction_items, skipped_files = collect_uploads(uploaded_files)
+
     # Handle results and messages
     if skipped_files:
-        flash(f'Skipped {len(skipped_files)} unsupported files: {", ".join(skipped_files[:5])}{"..." if len(skipped_files) > 5 else ""}. Please upload PNG, JPG, JPEG, or WEBP only.', 'warning')
+        flash(f'Skipped {len(skipped_files)} files: {", ".join(skipped_files[:5])}{"..." if len(skipped_files) > 5 else ""}. Please upload PNG, JPG, JPEG, or WEBP only.', 'warning')
     
-    # Display success message if we have processed data
-    if processed_data:
-        success_msg = f'Successfully processed {len(processed_data)} visiting cards using Gemini AI and saved to MongoDB'
+    if not extraction_items:
+        if not skipped_files:
+            flash('No valid files could be read from the upload', 'error')
+        else:
+            flash('All uploaded files were skipped due to unsupported formats', 'warning')
+        return redirect(url_for('main.index'))
+
+    # Queue the batch for background segmentation and extraction
+    job_id = submit_upload_job(extraction_items, event_info, engine, segment=segment_requested())
+    if job_id:
+        success_msg = f'Upload accepted: processing {len(extraction_items)} files in the background (job {job_id})'
         if skipped_files:
             success_msg += f' ({len(skipped_files)} files skipped)'
         flash(success_msg, 'success')
     else:
-        if not skipped_files:
-            flash('No valid data extracted from any uploaded files', 'error')
-        else:
-            flash('All uploaded files were skipped due to unsupported formats', 'warning')
-    
-    # Clean up temporary files
-    cleanup_temp_files(saved_file_paths)
-    print("🧹 Cleanup completed")
-    print(f"📊 Final stats: {processed_count} processed, {len(skipped_files)} skipped, {total_files} total")
+        flash('Failed to queue upload for processing', 'error')
+
+    print(f"📊 Queued {len(extraction_items)} files, {len(skipped_files)} skipped, {total_files} total")
     
     return redirect(url_for('main.index'))
 
@@ -147,12 +104,14 @@ def view_results():
     121-140: View all extracted results from MongoDB
     """
     try:
-        # Load all data from MongoDB
-        results = load_extraction_data()
+        # Load the first page; the page fetches the rest from /api/cards/list as it scrolls
+        from app.mongo import get_cards_page, count_cards
+        from app.queries import LIST_PAGE_SIZE
+        results, next_cursor = get_cards_page(limit=LIST_PAGE_SIZE)
         print(f"📊 Loaded {len(results)} records from MongoDB")
         
         # Render results page with data
-        return render_template('results.html', results=results)
+        return render_template('results.html', results=results, next_cursor=next_cursor, total=count_cards())
         
     except Exception as e:
         print(f"❌ Error in view_results: {str(e)}")
@@ -225,6 +184,16 @@ def delete_record(record_id):
     
     return redirect(url_for('main.view_results'))
 
+def _xlsx_response(excel_stream, filename):
+    """
+    Chunked download of a streamed Excel file; nothing is buffered, so there is no Content-Length
+    """
+    from app.xlsx import XLSX_MIMETYPE
+    response = Response(excel_stream, mimetype=XLSX_MIMETYPE)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 @main_bp.route('/download')
 def download_excel():
     """
@@ -233,17 +202,12 @@ def download_excel():
     try:
         print("📥 Download request for Excel file from MongoDB")
         
-        # Generate Excel file in memory from MongoDB data
-        excel_buffer = generate_excel_from_mongo()
+        # Stream the Excel file from a MongoDB cursor as it is generated
+        excel_stream = generate_excel_from_mongo()
         
-        if excel_buffer:
+        if excel_stream:
             print("✅ Sending Excel file to user")
-            return send_file(
-                excel_buffer, 
-                as_attachment=True, 
-                download_name='visiting_cards_data.xlsx',
-                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
+            return _xlsx_response(excel_stream, 'visiting_cards_data.xlsx')
         else:
             print("❌ No data available for download")
             flash('No data available for download. Please process some cards first.', 'warning')
@@ -283,15 +247,36 @@ def download_advanced_report():
         flash(f'Error generating advanced report: {str(e)}', 'error')
         return redirect(url_for('main.index'))
 
+def _export_filters(args):
+    """
+    Filter spec keys shared by every filtered export: event, date_from, date_to (YYYY-MM-DD)
+    and sorted ('true' or 'false')
+    Raises ValueError for a malformed date
+    """
+    filters = {
+        'event': args.get('event', '').strip() or None,
+        'date_from': args.get('date_from') or None,
+        'date_to': args.get('date_to') or None,
+        'sorted': {'true': True, 'false': False}.get(args.get('sorted', ''))
+    }
+    compile_card_filter(filters)  # Reject bad dates before the export starts streaming
+    return filters
+
 @main_bp.route('/download/filtered')
 def download_filtered_export():
     """
-    Route to generate and download filtered Excel export based on labels or countries
+    Route to generate and download filtered Excel export based on labels, countries or
+    only the shared filters (type=cards); the filters are compiled into one MongoDB query
     """
     try:
         print("🏷️ Download request for filtered export")
         
         export_type = request.args.get('type', '')
+        try:
+            filters = _export_filters(request.args)
+        except ValueError as e:
+            flash(f'Invalid export filter: {str(e)}', 'error')
+            return redirect(url_for('main.index'))
         
         if export_type == 'labels':
             # Get selected label IDs and unlabeled option
@@ -302,7 +287,7 @@ def download_filtered_export():
             label_ids = [int(id) for id in label_ids if id.isdigit()]
             
             print(f"📋 Filtering by labels: {label_ids}, include unlabeled: {include_unlabeled}")
-            excel_buffer = generate_filtered_excel_by_labels(label_ids, include_unlabeled)
+            excel_stream = generate_filtered_excel_by_labels(label_ids, include_unlabeled, filters)
             filename = 'visiting_cards_filtered_by_labels.xlsx'
             
         elif export_type == 'countries':
@@ -310,21 +295,21 @@ def download_filtered_export():
             countries = request.args.getlist('countries')
             
             print(f"🌍 Filtering by countries: {countries}")
-            excel_buffer = generate_filtered_excel_by_countries(countries)
+            excel_stream = generate_filtered_excel_by_countries(countries, filters)
             filename = 'visiting_cards_filtered_by_countries.xlsx'
             
+        elif export_type == 'cards':
+            print(f"🔎 Filtering cards by: {filters}")
+            excel_stream = generate_filtered_excel(filters)
+            filename = 'visiting_cards_filtered.xlsx'
+            
         else:
             flash('Invalid export type specified', 'error')
             return redirect(url_for('main.index'))
         
-        if excel_buffer:
+        if excel_stream:
             print("✅ Sending filtered export to user")
-            return send_file(
-                excel_buffer, 
-                as_attachment=True, 
-                download_name=filename,
-                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-            )
+            return _xlsx_response(excel_stream, filename)
         else:
             print("❌ No data available for filtered export")
             flash('No data matches the selected filters.', 'warning')
@@ -338,10 +323,13 @@ def download_filtered_export():
 @main_bp.route('/api/progress/<session_id>')
 def get_progress(session_id):
     """
-    221-240: Track progress count and send to frontend
+    221-240: Report real per-file progress, counts and ETA for a background upload job
     """
-    # This can be enhanced with real-time progress tracking using sessions
-    return jsonify({'progress': 100, 'status': 'completed'})
+    progress = get_job_progress(session_id)
+    if not progress:
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
+    
+    return jsonify(progress)
 
 @main_bp.route('/api/upload', methods=['POST'])
 def api_upload():
@@ -357,40 +345,34 @@ def api_upload():
         if not uploaded_files or all(file.filename == '' for file in uploaded_files):
             return jsonify({'error': 'No valid files provided'}), 400
         
-        processed_data = []
-        upload_folder = current_app.config['UPLOAD_FOLDER']
-        os.makedirs(upload_folder, exist_ok=True)
-        
-        for file in uploaded_files:
-            if file and file.filename != '':
-                if allowed_file(file.filename):
-                    file_path = save_uploaded_file(file, upload_folder)
-                    if file_path:
-                        # Read image as bytes
-                        with open(file_path, 'rb') as img_file:
-                            image_bytes = img_file.read()
-                        
-                        # Extract using Gemini
-                        structured_data = extract_data_from_image_gemini(image_bytes)
-                        structured_data['filename'] = file.filename
-                        
-                        # Add to JSON data store
-                        record_id = add_extraction_record(structured_data)
-                        structured_data['id'] = record_id
-                        
-                        processed_data.append(structured_data)
-                        
-                        # Clean up individual file
-                        cleanup_temp_files([file_path])
+        try:
+            engine = requested_engine()
+        except EngineUnavailableError as e:
+            return jsonify({'error': str(e)}), 400
         
-        if processed_data:
-            return jsonify({
-                'success': True,
-                'message': f'Processed {len(processed_data)} files using Gemini AI and saved to MongoDB',
-                'data': processed_data
-            })
-        else:
-            return jsonify({'error': 'No valid data extracted'}), 400
+        # Extract event information from form (optional)
+        event_info = parse_event_info(request.form)
+        
+        extraction_items, skipped_files = collect_uploads(uploaded_files)
+
+        if not extraction_items:
+            return jsonify({'error': 'No valid files provided', 'skipped_files': skipped_files}), 400
+
+        # Queue for background segmentation and extraction and return immediately
+        job_id = submit_upload_job(extraction_items, event_info, engine, segment=segment_requested())
+        if not job_id:
+            return jsonify({'error': 'Failed to queue upload for processing'}), 500
+
+        return jsonify({
+            'success': True,
+            'message': f'Accepted {len(extraction_items)} files for processing',
+            'job_id': job_id,
+            'session_id': job_id,
+            'total_files': len(extraction_items),
+            'engine': engine.name,
+            'skipped_files': skipped_files,
+            'progress_url': url_for('main.get_progress', session_id=job_id)
+        }), 202
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -512,50 +494,54 @@ def api_ocr_extract():
             return jsonify({'success': False, 'message': 'No files selected'}), 400
         
         # Extract event information from form (optional)
-        event_info = {
-            'event_name': request.form.get('event_name', '').strip(),
-            'event_description': request.form.get('event_description', '').strip(),
-            'event_host': request.form.get('event_host', '').strip(),
-            'event_date': request.form.get('event_date', '').strip(),
-            'event_location': request.form.get('event_location', '').strip()
-        }
+        event_info = parse_event_info(request.form)
         
-        processed_data = []
-        
-        for i, file in enumerate(uploaded_files):
-            if file and allowed_file(file.filename):
-                try:
-                    # Save uploaded file
-                    file_path = save_uploaded_file(file)
-                    
-                    if file_path:
-                        # Extract data using Gemini Vision API
-                        print(f"🔍 Processing file {i+1}/{len(uploaded_files)}: {file.filename}")
-                        
-                        extracted_data = extract_data_from_image_gemini(file_path)
-                        
-                        if extracted_data:
-                            # Add event information to extracted data
-                            extracted_data.update(event_info)
-                            extracted_data['filename'] = file.filename
-                            processed_data.append(extracted_data)
-                            
-                            # Save to MongoDB
-                            add_extraction_record(extracted_data)
-                        
-                        # Clean up uploaded file
-                        cleanup_temp_files([file_path])
-                        
-                except Exception as file_error:
-                    print(f"❌ Error processing file {file.filename}: {str(file_error)}")
-                    continue
+        try:
+            engine = requested_engine()
+        except EngineUnavailableError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
         
+        extraction_items, skipped_files = collect_uploads(uploaded_files)
+
+        # Optionally queue for background extraction and return a job ID immediately
+        if request.form.get('async', '').lower() == 'true':
+            if not extraction_items:
+                return jsonify({'success': False, 'message': 'No files could be processed successfully'}), 400
+
+            job_id = submit_upload_job(extraction_items, event_info, engine, segment=segment_requested())
+            if not job_id:
+                return jsonify({'success': False, 'message': 'Failed to queue files for processing'}), 500
+
+            return jsonify({
+                'success': True,
+                'message': f'Accepted {len(extraction_items)} files for processing',
+                'job_id': job_id,
+                'session_id': job_id,
+                'total_files': len(extraction_items),
+                'engine': engine.name,
+                'skipped_files': skipped_files,
+                'progress_url': url_for('main.get_progress', session_id=job_id)
+            }), 202
+
+        # Synchronous requests wait for segmentation along with extraction
+        if segment_requested():
+            extraction_items = expand_card_sheets(extraction_items)
+
+        # Extract and store with the selected OCR engine concurrently
+        processed_data = []
+        for result in ingest_items(extraction_items, event_info, engine):
+            if result['error']:
+                print(f"❌ Error processing file {result['filename']}: {result['error']}")
+                continue
+            processed_data.append(result['data'])
+
         if processed_data:
             return jsonify({
                 'success': True,
                 'message': f'Successfully processed {len(processed_data)} files',
                 'data': processed_data,
-                'total_processed': len(processed_data)
+                'total_processed': len(processed_data),
+                'skipped_files': skipped_files
             })
         else:
             return jsonify({
@@ -571,24 +557,35 @@ def api_ocr_extract():
 @token_required
 def api_get_cards():
     """
-    Get all extracted card data via API
+    Get extracted card data via API, newest first, a page at a time
+    Pass the returned next_cursor as ?cursor= for the next page (offset still works but is deprecated)
     """
+    from app.mongo import get_cards_page
+    from app.queries import InvalidCursor, page_size
+    
     try:
         # Get query parameters
-        limit = request.args.get('limit', 50, type=int)
-        offset = request.args.get('offset', 0, type=int)
+        limit = page_size(request.args.get('limit', type=int))
+        offset = request.args.get('offset', type=int)
+        cursor = request.args.get('cursor')
         
-        # Get recent extractions from MongoDB
-        cards = get_recent_extractions(limit=limit, skip=offset)
+        if offset and not cursor:
+            cards = get_recent_extractions(limit=limit, skip=offset, view='full')
+            next_cursor = None
+        else:
+            cards, next_cursor = get_cards_page(limit=limit, cursor=cursor, view='full')
         
         return jsonify({
             'success': True,
             'data': cards,
             'count': len(cards),
             'limit': limit,
-            'offset': offset
+            'offset': offset or 0,
+            'next_cursor': next_cursor
         })
         
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         print(f"Error in API get cards: {str(e)}")
         return jsonify({'success': False, 'message': 'Internal server error'}), 500
@@ -602,7 +599,7 @@ def api_get_card(card_id):
     try:
         from app.mongo import get_card_with_image
         
-        card = get_card_with_image(card_id)
+        card = get_card_with_image(card_id, inline_image=True)
         
         if card:
             return jsonify({
@@ -672,38 +669,142 @@ def api_delete_card(card_id):
         print(f"Error in API delete card: {str(e)}")
         return jsonify({'success': False, 'message': 'Internal server error'}), 500
 
+@main_bp.route('/api/dedup/jobs', methods=['POST'])
+@token_required
+def api_start_dedup():
+    """
+    Start a collection-wide fuzzy duplicate scan; "apply": false only records the clusters for review
+    """
+    from app.jobs import submit_dedup_job
+    data = request.get_json(silent=True) or {}
+
+    job_id = submit_dedup_job(apply=bool(data.get('apply', True)))
+    if not job_id:
+        return jsonify({'success': False, 'message': 'Failed to create dedup job'}), 500
+    return jsonify({'success': True, 'job_id': job_id}), 202
+
+@main_bp.route('/api/dedup/jobs/<job_id>')
+@token_required
+def api_dedup_progress(job_id):
+    """
+    Phase and counts of a fuzzy dedup job
+    """
+    from app.jobs import get_dedup_progress
+    progress = get_dedup_progress(job_id)
+    if not progress:
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
+    return jsonify(progress)
+
+@main_bp.route('/api/dedup/jobs/<job_id>/clusters')
+@token_required
+def api_dedup_clusters(job_id):
+    """
+    Duplicate clusters found by a dedup job, with a summary of each card
+    """
+    from app.mongo import get_dedup_clusters, get_cards_by_ids
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    skip = request.args.get('skip', 0, type=int)
+
+    clusters = get_dedup_clusters(job_id, status=request.args.get('status'), limit=limit, skip=skip)
+    cards = get_cards_by_ids(card_id for cluster in clusters for card_id in cluster['ids'])
+    for cluster in clusters:
+        cluster['cards'] = [{field: cards[card_id].get(field) for field in ('id', 'name', 'company', 'email', 'phone')}
+                            for card_id in cluster['ids'] if card_id in cards]
+    return jsonify({'success': True, 'clusters': clusters})
+
+@main_bp.route('/api/dedup/jobs/<job_id>/resume', methods=['POST'])
+@token_required
+def api_resume_dedup(job_id):
+    """
+    Resume a failed or interrupted dedup job, or merge the clusters of a review-only job
+    """
+    from app.jobs import resume_dedup_job
+    data = request.get_json(silent=True) or {}
+
+    if not resume_dedup_job(job_id, apply=bool(data.get('apply', True))):
+        return jsonify({'success': False, 'message': 'Job not found, finished or still running'}), 409
+    return jsonify({'success': True, 'job_id': job_id}), 202
+
 # 121-160: Data management interface routes
 @main_bp.route('/manage')
 def manage_data():
     """
-    Render the data management interface
+    Render the data management interface with the first page of every list;
+    manage.js fetches further pages from /api/cards/list as the lists scroll
     """
-    from app.mongo import get_all_labels, get_cards_by_status, update_extraction_record, detect_country_from_company
+    from app.mongo import (get_all_labels, get_cards_page, card_list_query, count_cards, get_country_counts,
+                           add_image_urls)
+    from app.queries import LIST_PAGE_SIZE
     
-    # Get unsorted and sorted cards
-    unsorted_cards = get_cards_by_status(is_sorted=False)
-    sorted_cards = get_cards_by_status(is_sorted=True)
+    # First page of unsorted cards, of each label and of the gallery
+    unsorted_cards, unsorted_cursor = get_cards_page(card_list_query(section='unsorted'), limit=LIST_PAGE_SIZE)
     labels = get_all_labels()
+    label_pages = {}
+    for label in labels:
+        cards, next_cursor = get_cards_page(card_list_query(label_id=label['id']), limit=LIST_PAGE_SIZE)
+        label_pages[label['id']] = {'cards': cards, 'next_cursor': next_cursor}
+    gallery_cards, gallery_cursor = get_cards_page(limit=LIST_PAGE_SIZE)
     
-    # Backfill country data for cards that don't have it
-    all_cards = unsorted_cards + sorted_cards
-    for card in all_cards:
-        if not card.get('country') or card.get('country') == 'UNKNOWN' or not card.get('flag'):
-            if card.get('company'):
-                country_code, flag = detect_country_from_company(card['company'])
-                # Update the card with country information
-                update_data = {'country': country_code, 'flag': flag}
-                update_extraction_record(card['id'], update_data)
-                # Update the card object for immediate display
-                card['country'] = country_code
-                card['flag'] = flag
-                print(f"🌍 Updated card {card['id']} with country: {country_code} {flag}")
+    # Countries are filled in by `flask backfill-countries`; the page only reads
+    listed_cards = unsorted_cards + gallery_cards + [card for page in label_pages.values() for card in page['cards']]
+    for card in listed_cards:
+        add_image_urls(card)
     
     return render_template('manage.html', 
                          unsorted_cards=unsorted_cards,
-                         sorted_cards=sorted_cards,
+                         unsorted_cursor=unsorted_cursor,
+                         unsorted_total=count_cards(card_list_query(section='unsorted')),
+                         sorted_total=count_cards(card_list_query(section='sorted')),
+                         label_pages=label_pages,
+                         gallery_cards=gallery_cards,
+                         gallery_cursor=gallery_cursor,
+                         gallery_total=count_cards(),
+                         country_counts=get_country_counts(),
                          labels=labels)
 
+@main_bp.route('/api/cards/list')
+def card_list_page():
+    """
+    Next page of a /manage or /results list, rendered with the same markup as the first page
+    list: unsorted, label (with label_id), all or results; filters: q, country, label_id
+    Returns {'items': [html], 'next_cursor', 'total' (first page only)}
+    """
+    from flask import get_template_attribute
+    from app.mongo import get_cards_page, card_list_query, count_cards, add_image_urls
+    from app.queries import InvalidCursor, LIST_PAGE_SIZE
+    
+    list_name = request.args.get('list', 'all')
+    if list_name not in ('unsorted', 'label', 'all', 'results'):
+        return jsonify({'success': False, 'message': f'Unknown list: {list_name}'}), 400
+    label_id = request.args.get('label_id', type=int)
+    if list_name == 'label' and label_id is None:
+        return jsonify({'success': False, 'message': 'label_id is required'}), 400
+    
+    query = card_list_query(section='unsorted' if list_name == 'unsorted' else None, label_id=label_id,
+                            text=request.args.get('q', '').strip(), country=request.args.get('country', '').strip())
+    cursor = request.args.get('cursor')
+    try:
+        cards, next_cursor = get_cards_page(query, limit=request.args.get('limit', LIST_PAGE_SIZE, type=int),
+                                            cursor=cursor)
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    if list_name == 'results':
+        result_row = get_template_attribute('_cards.html', 'result_row')
+        start = request.args.get('start', 0, type=int)
+        items = [str(result_row(card, start + number)) for number, card in enumerate(cards)]
+    elif list_name == 'all':
+        gallery_item = get_template_attribute('_cards.html', 'gallery_item')
+        items = [str(gallery_item(add_image_urls(card))) for card in cards]
+    else:
+        card_item = get_template_attribute('_cards.html', 'card_item')
+        items = [str(card_item(add_image_urls(card), labeled=list_name == 'label')) for card in cards]
+    
+    response = {'success': True, 'items': items, 'ids': [card['id'] for card in cards], 'next_cursor': next_cursor}
+    if not cursor:
+        response['total'] = count_cards(query)
+    return jsonify(response)
+
 @main_bp.route('/api/labels', methods=['GET', 'POST'])
 def handle_labels():
     """
@@ -781,16 +882,21 @@ def handle_card_label(card_id):
 @main_bp.route('/api/cards/search')
 def search_cards():
     """
-    Search cards by query
+    Search cards by query, a page at a time (?limit=, ?cursor=)
     """
     from app.mongo import search_cards
+    from app.queries import InvalidCursor
     query = request.args.get('q', '').strip()
     
     if not query:
         return jsonify({'success': False, 'message': 'Search query is required'})
     
-    cards = search_cards(query)
-    return jsonify({'success': True, 'cards': cards})
+    try:
+        cards, next_cursor = search_cards(query, limit=request.args.get('limit', type=int),
+                                          cursor=request.args.get('cursor'))
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return jsonify({'success': True, 'cards': cards, 'next_cursor': next_cursor})
 
 @main_bp.route('/api/cards/<int:card_id>', methods=['PUT', 'DELETE'])
 def handle_card(card_id):
@@ -798,16 +904,14 @@ def handle_card(card_id):
     Update or delete a card
     """
     if request.method == 'PUT':
-        from app.mongo import update_extraction_record, detect_country_from_company
+        from app.mongo import update_card_data
         data = request.get_json()
         
-        # Detect country if company is updated but no country is explicitly provided
-        if 'company' in data and ('country' not in data or not data.get('country') or data.get('country').strip() == ''):
-            country_code, flag = detect_country_from_company(data['company'])
-            data['country'] = country_code
-            data['flag'] = flag
+        # Country and flag are re-resolved from the updated country, phone and company
+        if isinstance(data.get('country'), str):
+            data['country'] = data['country'].strip()
         
-        if update_extraction_record(card_id, data):
+        if update_card_data(card_id, data):
             return jsonify({'success': True})
         else:
             return jsonify({'success': False, 'message': 'Failed to update card'})
@@ -822,11 +926,17 @@ def handle_card(card_id):
 @main_bp.route('/api/cards/by-label/<int:label_id>')
 def get_cards_by_label_api(label_id):
     """
-    Get all cards with a specific label
+    Get the cards with a specific label, a page at a time (?limit=, ?cursor=)
     """
     from app.mongo import get_cards_by_label
-    cards = get_cards_by_label(label_id)
-    return jsonify({'success': True, 'cards': cards})
+    from app.queries import InvalidCursor
+    
+    try:
+        cards, next_cursor = get_cards_by_label(label_id, limit=request.args.get('limit', type=int),
+                                                cursor=request.args.get('cursor'))
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return jsonify({'success': True, 'cards': cards, 'next_cursor': next_cursor})
 
 @main_bp.route('/api/cards/<int:card_id>/preview')
 def get_card_preview(card_id):
@@ -841,6 +951,41 @@ def get_card_preview(card_id):
     else:
         return jsonify({'success': False, 'message': 'Card not found'})
 
+@main_bp.route('/api/cards/<int:card_id>/image')
+def card_image(card_id):
+    """
+    Serve the original image of a card from the image store
+    """
+    from app.mongo import load_card_image
+    
+    image = load_card_image(card_id)
+    if not image:
+        return jsonify({'success': False, 'message': 'Image not found'}), 404
+    
+    image_bytes, mime_type, image_ref = image
+    return send_file(BytesIO(image_bytes), mimetype=mime_type, etag=image_ref or False, max_age=3600, conditional=True)
+
+@main_bp.route('/api/cards/<int:card_id>/image/<int:size>')
+def card_image_rendition(card_id, size):
+    """
+    Serve a WebP thumbnail or preview rendition of a card image
+    A card's image never changes, so browsers and proxies may cache it for a year without revalidating
+    """
+    from app.mongo import load_card_rendition
+    from app.preprocess import RENDITION_SIZES
+    
+    if size not in RENDITION_SIZES:
+        return jsonify({'success': False, 'message': f'Size must be one of {list(RENDITION_SIZES)}'}), 404
+    
+    rendition = load_card_rendition(card_id, size)
+    if not rendition:
+        return jsonify({'success': False, 'message': 'Image not found'}), 404
+    
+    image_bytes, image_ref = rendition
+    response = send_file(BytesIO(image_bytes), mimetype='image/webp', etag=image_ref, max_age=31536000, conditional=True)
+    response.cache_control.immutable = True
+    return response
+
 @main_bp.route('/api/cards/<int:card_id>/edit', methods=['PUT'])
 def update_card_preview(card_id):
     """
@@ -913,6 +1058,11 @@ def metrics():
     try:
         import psutil
         from datetime import datetime
+        from app.cache import get_cache_stats
+        from app.gemini_client import gemini_client
+        from app.rate_limit import gemini_rate_limiter
+        from app.engines import get_engine_stats, get_tier_stats
+        from app.queries import get_query_stats
         
         return jsonify({
             'system': {
@@ -923,7 +1073,13 @@ def metrics():
             'application': {
                 'timestamp': datetime.utcnow().isoformat(),
                 'status': 'running'
-            }
+            },
+            'extraction_cache': get_cache_stats(),
+            'gemini_client': gemini_client.get_stats(),
+            'gemini_rate_limit': gemini_rate_limiter.get_stats(),
+            'ocr_engines': get_engine_stats(),
+            'extraction_tiers': get_tier_stats(),
+            'query_views': get_query_stats()
         })
     except ImportError:
         return jsonify({
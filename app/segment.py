@@ -0,0 +1,158 @@
+# 1-10: Import modules
+import os
+import uuid
+import numpy as np
+from dotenv import load_dotenv
+from app.extraction import extraction_engine
+
+# OpenCV is optional; without it sheets are extracted as a single card
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+# 11-20: Load segmentation settings
+load_dotenv()
+SEGMENT_WORK_EDGE = int(os.getenv('SEGMENT_WORK_EDGE', 1600))
+SEGMENT_MAX_CARDS = int(os.getenv('SEGMENT_MAX_CARDS', 20))
+SEGMENT_MIN_AREA_RATIO = float(os.getenv('SEGMENT_MIN_AREA_RATIO', 0.01))
+SEGMENT_JPEG_QUALITY = int(os.getenv('SEGMENT_JPEG_QUALITY', 92))
+
+# A card's long/short side ratio (ISO 85x55mm is ~1.55, US 3.5x2in is 1.75)
+CARD_ASPECT_RANGE = (1.2, 2.2)
+# Contour area relative to its minimum bounding rectangle; rounded corners stay above this
+MIN_RECTANGULARITY = 0.8
+
+def segmentation_available():
+    """OpenCV is installed"""
+    return cv2 is not None
+
+# 21-80: Card rectangle detection
+def _order_corners(points):
+    """Order four corner points as top-left, top-right, bottom-right, bottom-left"""
+    points = np.asarray(points, dtype=np.float32)
+    sums = points.sum(axis=1)
+    diffs = np.diff(points, axis=1).ravel()
+    return np.array([points[np.argmin(sums)], points[np.argmin(diffs)],
+                     points[np.argmax(sums)], points[np.argmax(diffs)]], dtype=np.float32)
+
+def detect_card_quads(gray):
+    """
+    Find card-shaped quadrilaterals in a grayscale page image
+    Returns a list of ordered 4x2 corner arrays in the image's coordinates
+    """
+    page_area = gray.shape[0] * gray.shape[1]
+
+    # Card edges against the scanner lid: blur out print detail, find edges, close gaps
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    edges = cv2.Canny(blurred, 30, 100)
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
+    edges = cv2.morphologyEx(cv2.dilate(edges, kernel, iterations=2), cv2.MORPH_CLOSE, kernel, iterations=2)
+
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    quads = []
+    for contour in contours:
+        area = cv2.contourArea(contour)
+        if area < page_area * SEGMENT_MIN_AREA_RATIO or area > page_area * 0.9:
+            continue
+
+        rect = cv2.minAreaRect(contour)
+        width, height = rect[1]
+        if min(width, height) <= 0:
+            continue
+
+        aspect = max(width, height) / min(width, height)
+        if not CARD_ASPECT_RANGE[0] <= aspect <= CARD_ASPECT_RANGE[1]:
+            continue
+        if area / (width * height) < MIN_RECTANGULARITY:
+            continue
+
+        quads.append(_order_corners(cv2.boxPoints(rect)))
+
+    # Reading order: rows top to bottom, then left to right within a row
+    quads.sort(key=lambda quad: (quad[:, 1].min(), quad[:, 0].min()))
+    if quads:
+        row_height = np.median([quad[:, 1].max() - quad[:, 1].min() for quad in quads]) / 2
+        quads.sort(key=lambda quad: (int(quad[:, 1].min() // row_height), quad[:, 0].min()))
+
+    return quads[:SEGMENT_MAX_CARDS]
+
+# 81-140: Perspective correction and cropping
+def _warp_card(image, quad):
+    """Perspective-correct one card into an upright rectangle"""
+    top_left, top_right, bottom_right, bottom_left = quad
+    width = int(round(max(np.linalg.norm(top_right - top_left), np.linalg.norm(bottom_right - bottom_left))))
+    height = int(round(max(np.linalg.norm(bottom_left - top_left), np.linalg.norm(bottom_right - top_right))))
+    target = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+
+    matrix = cv2.getPerspectiveTransform(quad, target)
+    return cv2.warpPerspective(image, matrix, (width, height), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+
+def segment_card_sheet(image_bytes):
+    """
+    Split a flatbed scan holding several cards into one JPEG crop per card
+    Returns a list of {'image_bytes', 'position', 'box'} dicts in reading order,
+    or an empty list when the image does not look like a multi-card sheet
+    """
+    if cv2 is None:
+        return []
+
+    image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        return []
+
+    # Detect on a downscaled copy, crop from the full-resolution page
+    scale = min(1.0, SEGMENT_WORK_EDGE / max(image.shape[:2]))
+    small = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else image
+    quads = detect_card_quads(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY))
+    if len(quads) < 2:
+        return []
+
+    crops = []
+    for position, quad in enumerate(quads):
+        quad = quad / scale
+        card = _warp_card(image, quad)
+        ok, encoded = cv2.imencode('.jpg', card, [cv2.IMWRITE_JPEG_QUALITY, SEGMENT_JPEG_QUALITY])
+        if not ok:
+            continue
+        x, y = quad.min(axis=0)
+        w, h = quad.max(axis=0) - quad.min(axis=0)
+        crops.append({'image_bytes': encoded.tobytes(), 'position': position,
+                      'box': [int(x), int(y), int(w), int(h)]})
+
+    return crops
+
+# 141-180: Expand uploaded sheets into card items
+def expand_card_sheets(items):
+    """
+    Replace every multi-card sheet in a list of {'filename', 'image_bytes'} items with its crops,
+    segmenting pages in parallel on the extraction worker pool.
+    Each crop keeps a link back to its page (source_page_id, source_filename, source_position);
+    images that are not sheets pass through unchanged.
+    """
+    results = extraction_engine.map(lambda index, item: segment_card_sheet(item['image_bytes']), items)
+
+    expanded = []
+    for item, result in zip(items, results):
+        crops = result['data'] or []
+        if not crops:
+            expanded.append(item)
+            continue
+
+        page_id = uuid.uuid4().hex
+        name = os.path.splitext(item['filename'])[0]
+        print(f"✂️ Segmented {item['filename']} into {len(crops)} cards")
+        for crop in crops:
+            expanded.append({
+                'filename': f"{name}_card{crop['position'] + 1}.jpg",
+                'image_bytes': crop['image_bytes'],
+                'source': {
+                    'source_page_id': page_id,
+                    'source_filename': item['filename'],
+                    'source_position': crop['position'],
+                    'source_box': crop['box']
+                }
+            })
+
+    return expanded
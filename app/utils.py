@@ -1,15 +1,16 @@
 # 1-10: Importing modules
-import os  # OS module for file operations
 from openpyxl import Workbook  # Excel file handling
-from openpyxl.chart import BarChart, PieChart, Reference, Series  # Excel charting
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side  # Excel styling
-from werkzeug.utils import secure_filename  # Secure filename utility
-import uuid  # UUID for generating unique filenames
+from openpyxl.cell import WriteOnlyCell  # Styled cells of write-only sheets
+from openpyxl.styles import Font, PatternFill, Alignment  # Excel styling
 from io import BytesIO  # For in-memory file handling
-from app.mongo import load_extraction_data, get_all_labels  # Import MongoDB data loading functions
-from collections import Counter  # For statistics
-from datetime import datetime  # For date handling
-import re  # For regex operations
+from app.mongo import (iter_extraction_data, explain_extraction_query, compile_card_filter,
+                       get_card_analytics)  # Import MongoDB data loading functions
+from app.xlsx import stream_xlsx  # Streaming write-only Excel writer
+from itertools import chain  # For putting a peeked row back in front of a stream
+import time  # For export timing
+import logging  # Export query plans go to the debug log
+
+logger = logging.getLogger(__name__)
 
 # 11-20: File validation configuration
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'webp'}  # Supported image formats only
@@ -22,152 +23,109 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def save_uploaded_file(file, upload_folder):
+# Columns of the Excel exports: (header, field); label and country columns are added per export
+EXPORT_CONTACT_COLUMNS = [('Name', 'name'), ('Phone', 'phone'), ('Email', 'email'), ('Company', 'company'),
+                          ('Website', 'website'), ('Address', 'address')]
+EXPORT_FILE_COLUMNS = [('Filename', 'filename'), ('Timestamp', 'timestamp')]
+EXPORT_EVENT_COLUMNS = [('Event Name', 'event_name'), ('Event Description', 'event_description'),
+                        ('Event Host', 'event_host'), ('Event Date', 'event_date'), ('Event Location', 'event_location')]
+
+def _stream_export(query, columns, sheet_title='Sheet'):
     """
-    31-50: Save uploaded file with secure filename
+    Stream the cards matching a MongoDB filter as an Excel file, one cursor batch at a time
+    Returns an iterator of .xlsx bytes, or None if no card matches
     """
-    if file and allowed_file(file.filename):
-        # Generate unique filename to avoid conflicts
-        file_extension = file.filename.rsplit('.', 1)[1].lower()
-        unique_filename = f"{uuid.uuid4().hex}.{file_extension}"
-        
-        # Create secure filename
-        filename = secure_filename(unique_filename)
-        
-        # Create full file path
-        file_path = os.path.join(upload_folder, filename)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Export '{sheet_title}' query {query}: {explain_extraction_query(query)}")
+    
+    started = time.perf_counter()
+    defaults = {'label_name': 'Unlabeled'}
+    rows = ([data.get(field, defaults.get(field, '')) for _, field in columns]
+            for data in iter_extraction_data(query))
+    
+    # Read the first row up front so an empty export can still be reported to the user
+    first = next(rows, None)
+    if first is None:
+        logger.debug(f"Export '{sheet_title}' matched no cards in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return None
+    
+    def generate():
+        written = 0
+        counted = [1]  # The peeked first row
         
-        # Save file to upload folder
-        file.save(file_path)
+        def count_rows():
+            for row in rows:
+                counted[0] += 1
+                yield row
         
-        return file_path  # Return saved file path
+        try:
+            for chunk in stream_xlsx([header for header, _ in columns], chain([first], count_rows()), sheet_title):
+                written += len(chunk)
+                yield chunk
+            print(f"💾 Streamed Excel export '{sheet_title}' ({written / 1048576:.1f} MB)")
+            logger.debug(f"Export '{sheet_title}': {counted[0]} rows, {written} bytes in "
+                         f"{(time.perf_counter() - started) * 1000:.0f} ms")
+        except Exception as e:
+            print(f"❌ Error streaming Excel export: {str(e)}")
+            raise
     
-    return None  # Return None if file is invalid
+    return generate()
 
 def generate_excel_from_mongo():
     """
-    51-80: Generate Excel file in memory from MongoDB data (no local file storage)
-    Returns BytesIO object containing Excel data for direct download
+    51-80: Generate an Excel file of all cards from MongoDB, streamed as it is downloaded
+    Returns an iterator of .xlsx bytes, or None if there is no data
     """
-    print("� Generating Excel file from MongoDB data...")
+    print("📥 Generating Excel file from MongoDB data...")
     
     try:
-        # Load all data from MongoDB
-        data_list = load_extraction_data()
-        
-        if not data_list:
+        stream = _stream_export(None, EXPORT_CONTACT_COLUMNS + EXPORT_FILE_COLUMNS + EXPORT_EVENT_COLUMNS)
+        if stream is None:
             print("⚠️ No data found in MongoDB")
-            return None
-        
-        # Create new workbook in memory
-        workbook = Workbook()
-        worksheet = workbook.active
-        
-        # Add comprehensive headers
-        headers = ['Name', 'Phone', 'Email', 'Company', 'Website', 'Address', 'Filename', 'Timestamp', 
-                  'Event Name', 'Event Description', 'Event Host', 'Event Date', 'Event Location']
-        worksheet.append(headers)
-        print("✅ Headers added to Excel file")
-        
-        # Add data rows
-        rows_added = 0
-        for data in data_list:
-            row_data = [
-                data.get('name', ''),
-                data.get('phone', ''),
-                data.get('email', ''),
-                data.get('company', ''),
-                data.get('website', ''),
-                data.get('address', ''),
-                data.get('filename', ''),
-                data.get('timestamp', ''),
-                # Event-related fields
-                data.get('event_name', ''),
-                data.get('event_description', ''),
-                data.get('event_host', ''),
-                data.get('event_date', ''),
-                data.get('event_location', '')
-            ]
-            worksheet.append(row_data)
-            rows_added += 1
-        
-        # Save to BytesIO object (in memory)
-        excel_buffer = BytesIO()
-        workbook.save(excel_buffer)
-        workbook.close()
-        
-        # Reset buffer position to beginning
-        excel_buffer.seek(0)
-        
-        print(f"💾 Successfully generated Excel with {rows_added} rows in memory")
-        return excel_buffer
+        return stream
         
     except Exception as e:
         print(f"❌ Error generating Excel: {str(e)}")
         return None
 
-def cleanup_temp_files(file_paths):
-    """
-    81-100: Clean up temporary uploaded files
-    """
-    for file_path in file_paths:
-        try:
-            # Remove file if it exists
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                print(f"🧹 Cleaned up temporary file: {file_path}")
-        except Exception as e:
-            print(f"❌ Error cleaning up file {file_path}: {str(e)}")
-
-def validate_extracted_data(data):
-    """
-    101-120: Validate extracted data before saving to MongoDB
-    """
-    # Check if at least name or email or phone is present
-    required_fields = ['name', 'email', 'phone']
-    has_required_data = any(data.get(field, '').strip() for field in required_fields)
-    
-    return has_required_data  # Return True if valid data found
-
 def generate_advanced_analytics_report():
     """
     Generate comprehensive analytics report with multiple sheets and charts
+    The statistics come from one MongoDB aggregation and the data sheet is written from a
+    cursor, so the cards are never all held in memory
     """
     print("📊 Generating advanced analytics report...")
     
     try:
-        # Load all data from MongoDB
-        data_list = load_extraction_data()
+        # Compute every statistic in MongoDB
+        analytics = get_card_analytics()
         
-        if not data_list:
+        if not analytics or not analytics['total']:
             print("⚠️ No data found in MongoDB")
             return None
         
-        # Create new workbook
-        workbook = Workbook()
-        
-        # Remove default sheet and create custom sheets
-        workbook.remove(workbook.active)
+        # Create new write-only workbook; rows are flushed to a temporary file as they are added
+        workbook = Workbook(write_only=True)
         
         # Sheet 1: Complete Data
         data_sheet = workbook.create_sheet("Complete Data")
-        _add_complete_data_sheet(data_sheet, data_list)
+        _add_complete_data_sheet(data_sheet, iter_extraction_data())
         
         # Sheet 2: Analytics Summary
         summary_sheet = workbook.create_sheet("Analytics Summary")
-        _add_analytics_summary_sheet(summary_sheet, data_list)
+        _add_analytics_summary_sheet(summary_sheet, analytics)
         
         # Sheet 3: Company Analysis
         company_sheet = workbook.create_sheet("Company Analysis")
-        _add_company_analysis_sheet(company_sheet, data_list)
+        _add_company_analysis_sheet(company_sheet, analytics)
         
         # Sheet 4: Geographic Analysis
         geo_sheet = workbook.create_sheet("Geographic Analysis")
-        _add_geographic_analysis_sheet(geo_sheet, data_list)
+        _add_geographic_analysis_sheet(geo_sheet, analytics)
         
         # Sheet 5: Contact Methods Analysis
         contact_sheet = workbook.create_sheet("Contact Analysis")
-        _add_contact_analysis_sheet(contact_sheet, data_list)
+        _add_contact_analysis_sheet(contact_sheet, analytics)
         
         # Save to BytesIO object
         excel_buffer = BytesIO()
@@ -182,173 +140,96 @@ def generate_advanced_analytics_report():
         print(f"❌ Error generating advanced analytics report: {str(e)}")
         return None
 
-def generate_filtered_excel_by_labels(label_ids, include_unlabeled=False):
+def generate_filtered_excel(filters, columns=None, sheet_title='Filtered Cards'):
+    """
+    Generate Excel file of the cards matching a filter spec (see compile_card_filter),
+    streamed as it is downloaded
+    Returns an iterator of .xlsx bytes, or None if no card matches
+    Raises ValueError for a malformed spec
+    """
+    columns = columns or (EXPORT_CONTACT_COLUMNS + [('Country', 'country'), ('Label', 'label_name')]
+                          + EXPORT_FILE_COLUMNS + EXPORT_EVENT_COLUMNS)
+    return _stream_export(compile_card_filter(filters), columns, sheet_title=sheet_title)
+
+def generate_filtered_excel_by_labels(label_ids, include_unlabeled=False, filters=None):
     """
-    Generate Excel file filtered by specific labels
+    Generate Excel file filtered by specific labels, streamed as it is downloaded
+    filters adds the other filter spec keys (event, dates, sorted status)
+    Returns an iterator of .xlsx bytes, or None if no card matches
     """
     print(f"🏷️ Generating Excel filtered by labels: {label_ids}")
     
     try:
-        # Load all data from MongoDB
-        data_list = load_extraction_data()
-        
-        if not data_list:
-            print("⚠️ No data found in MongoDB")
+        if not label_ids and not include_unlabeled:
+            print("⚠️ No labels selected")
             return None
         
-        # Filter data by labels
-        filtered_data = []
-        for data in data_list:
-            # Check current label assignment
-            data_label_id = data.get('label_id')
-            
-            # Check if data matches selected labels
-            has_selected_label = data_label_id in label_ids if data_label_id else False
-            
-            # Check if data is unlabeled and should be included
-            is_unlabeled = not data_label_id or data_label_id == ''
-            
-            if has_selected_label or (include_unlabeled and is_unlabeled):
-                filtered_data.append(data)
-        
-        if not filtered_data:
+        columns = EXPORT_CONTACT_COLUMNS + [('Label', 'label_name')] + EXPORT_FILE_COLUMNS + EXPORT_EVENT_COLUMNS
+        spec = dict(filters or {}, labels=label_ids, unlabeled=include_unlabeled)
+        stream = generate_filtered_excel(spec, columns, sheet_title='Filtered by Labels')
+        if stream is None:
             print("⚠️ No data matches the selected labels")
-            return None
-        
-        # Create workbook with filtered data
-        workbook = Workbook()
-        worksheet = workbook.active
-        worksheet.title = "Filtered by Labels"
-        
-        # Add headers with label information
-        headers = ['Name', 'Phone', 'Email', 'Company', 'Website', 'Address', 'Label', 
-                  'Filename', 'Timestamp', 'Event Name', 'Event Description', 'Event Host', 'Event Date', 'Event Location']
-        worksheet.append(headers)
-        
-        # Add filtered data rows
-        for data in filtered_data:
-            # Format labels for display
-            label_display = data.get('label_name', 'Unlabeled')
-            
-            row_data = [
-                data.get('name', ''),
-                data.get('phone', ''),
-                data.get('email', ''),
-                data.get('company', ''),
-                data.get('website', ''),
-                data.get('address', ''),
-                label_display,
-                data.get('filename', ''),
-                data.get('timestamp', ''),
-                data.get('event_name', ''),
-                data.get('event_description', ''),
-                data.get('event_host', ''),
-                data.get('event_date', ''),
-                data.get('event_location', '')
-            ]
-            worksheet.append(row_data)
-        
-        # Save to BytesIO object
-        excel_buffer = BytesIO()
-        workbook.save(excel_buffer)
-        workbook.close()
-        excel_buffer.seek(0)
-        
-        print(f"💾 Successfully generated filtered Excel with {len(filtered_data)} rows")
-        return excel_buffer
+        return stream
         
     except Exception as e:
         print(f"❌ Error generating filtered Excel by labels: {str(e)}")
         return None
 
-def generate_filtered_excel_by_countries(countries):
+def generate_filtered_excel_by_countries(countries, filters=None):
     """
-    Generate Excel file filtered by specific countries
+    Generate Excel file filtered by specific countries, streamed as it is downloaded
+    filters adds the other filter spec keys (event, dates, sorted status)
+    Returns an iterator of .xlsx bytes, or None if no card matches
     """
     print(f"🌍 Generating Excel filtered by countries: {countries}")
     
     try:
-        # Load all data from MongoDB
-        data_list = load_extraction_data()
-        
-        if not data_list:
-            print("⚠️ No data found in MongoDB")
+        if not countries:
+            print("⚠️ No countries selected")
             return None
         
-        # Filter data by countries
-        filtered_data = []
-        for data in data_list:
-            data_country = data.get('country', '')
-            if data_country in countries:
-                filtered_data.append(data)
-        
-        if not filtered_data:
+        columns = (EXPORT_CONTACT_COLUMNS + [('Country', 'country'), ('Flag', 'flag')] + EXPORT_FILE_COLUMNS
+                   + EXPORT_EVENT_COLUMNS)
+        spec = dict(filters or {}, countries=countries)
+        stream = generate_filtered_excel(spec, columns, sheet_title='Filtered by Countries')
+        if stream is None:
             print("⚠️ No data matches the selected countries")
-            return None
-        
-        # Create workbook with filtered data
-        workbook = Workbook()
-        worksheet = workbook.active
-        worksheet.title = "Filtered by Countries"
-        
-        # Add headers with country information
-        headers = ['Name', 'Phone', 'Email', 'Company', 'Website', 'Address', 'Country', 'Flag',
-                  'Filename', 'Timestamp', 'Event Name', 'Event Description', 'Event Host', 'Event Date', 'Event Location']
-        worksheet.append(headers)
-        
-        # Add filtered data rows
-        for data in filtered_data:
-            row_data = [
-                data.get('name', ''),
-                data.get('phone', ''),
-                data.get('email', ''),
-                data.get('company', ''),
-                data.get('website', ''),
-                data.get('address', ''),
-                data.get('country', ''),
-                data.get('flag', ''),
-                data.get('filename', ''),
-                data.get('timestamp', ''),
-                data.get('event_name', ''),
-                data.get('event_description', ''),
-                data.get('event_host', ''),
-                data.get('event_date', ''),
-                data.get('event_location', '')
-            ]
-            worksheet.append(row_data)
-        
-        # Save to BytesIO object
-        excel_buffer = BytesIO()
-        workbook.save(excel_buffer)
-        workbook.close()
-        excel_buffer.seek(0)
-        
-        print(f"💾 Successfully generated filtered Excel with {len(filtered_data)} rows")
-        return excel_buffer
+        return stream
         
     except Exception as e:
         print(f"❌ Error generating filtered Excel by countries: {str(e)}")
         return None
 
 # Helper functions for advanced analytics report
-def _add_complete_data_sheet(worksheet, data_list):
+# Write-only sheets are filled row by row with append(); styled cells are WriteOnlyCells
+def _styled_cell(worksheet, value, **style):
+    cell = WriteOnlyCell(worksheet, value=value)
+    for name, attribute in style.items():
+        setattr(cell, name, attribute)
+    return cell
+
+def _add_sheet_title(worksheet, title):
+    """Title in A1 and a blank row 2"""
+    worksheet.append([_styled_cell(worksheet, title, font=Font(size=16, bold=True))])
+    worksheet.append([])
+
+def _percentage(count, total):
+    return f"{(count/total)*100:.1f}%" if total > 0 else "0%"
+
+def _add_complete_data_sheet(worksheet, data_rows):
     """Add complete data to the first sheet with formatting"""
     # Add headers
     headers = ['Name', 'Phone', 'Email', 'Company', 'Website', 'Address', 'Country', 'Label',
               'Filename', 'Timestamp', 'Event Name', 'Event Description', 'Event Host', 'Event Date', 'Event Location']
-    worksheet.append(headers)
     
     # Style headers
     header_font = Font(bold=True, color="FFFFFF")
     header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    
-    for cell in worksheet[1]:
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal="center")
+    worksheet.append([_styled_cell(worksheet, header, font=header_font, fill=header_fill,
+                                   alignment=Alignment(horizontal="center")) for header in headers])
     
     # Add data rows
-    for data in data_list:
+    for data in data_rows:
         label_display = data.get('label_name', 'Unlabeled')
         
         row_data = [
@@ -370,127 +251,70 @@ def _add_complete_data_sheet(worksheet, data_list):
         ]
         worksheet.append(row_data)
 
-def _add_analytics_summary_sheet(worksheet, data_list):
+def _add_analytics_summary_sheet(worksheet, analytics):
     """Add analytics summary with key statistics"""
     # Title
-    worksheet['A1'] = "Analytics Summary"
-    worksheet['A1'].font = Font(size=16, bold=True)
+    _add_sheet_title(worksheet, "Analytics Summary")
     
     # Basic statistics
-    total_cards = len(data_list)
-    cards_with_email = sum(1 for data in data_list if data.get('email', '').strip())
-    cards_with_phone = sum(1 for data in data_list if data.get('phone', '').strip())
-    cards_with_company = sum(1 for data in data_list if data.get('company', '').strip())
+    total_cards = analytics['total']
+    cards_with_email = analytics['with_email']
+    cards_with_phone = analytics['with_phone']
+    cards_with_company = analytics['with_company']
     
+    bold = Font(bold=True)
+    worksheet.append([_styled_cell(worksheet, "Metric", font=bold), _styled_cell(worksheet, "Value", font=bold)])
     stats = [
-        ["Metric", "Value"],
         ["Total Cards Processed", total_cards],
         ["Cards with Email", cards_with_email],
         ["Cards with Phone", cards_with_phone],
         ["Cards with Company", cards_with_company],
-        ["Email Coverage", f"{(cards_with_email/total_cards)*100:.1f}%" if total_cards > 0 else "0%"],
-        ["Phone Coverage", f"{(cards_with_phone/total_cards)*100:.1f}%" if total_cards > 0 else "0%"],
-        ["Company Coverage", f"{(cards_with_company/total_cards)*100:.1f}%" if total_cards > 0 else "0%"]
+        ["Email Coverage", _percentage(cards_with_email, total_cards)],
+        ["Phone Coverage", _percentage(cards_with_phone, total_cards)],
+        ["Company Coverage", _percentage(cards_with_company, total_cards)]
     ]
-    
-    for i, row in enumerate(stats, start=3):
-        worksheet[f'A{i}'] = row[0]
-        worksheet[f'B{i}'] = row[1]
-        if i == 3:  # Header row
-            worksheet[f'A{i}'].font = Font(bold=True)
-            worksheet[f'B{i}'].font = Font(bold=True)
+    for row in stats:
+        worksheet.append(row)
 
-def _add_company_analysis_sheet(worksheet, data_list):
+def _add_company_analysis_sheet(worksheet, analytics):
     """Add company analysis with top companies"""
-    worksheet['A1'] = "Company Analysis"
-    worksheet['A1'].font = Font(size=16, bold=True)
+    _add_sheet_title(worksheet, "Company Analysis")
     
-    # Count companies
-    companies = [data.get('company', '').strip() for data in data_list if data.get('company', '').strip()]
-    company_counts = Counter(companies)
+    # Top companies, counted by MongoDB
+    worksheet.append([_styled_cell(worksheet, "Top Companies", font=Font(bold=True))])
+    worksheet.append(["Company", "Count"])
     
-    # Top companies
-    worksheet['A3'] = "Top Companies"
-    worksheet['A3'].font = Font(bold=True)
-    worksheet['A4'] = "Company"
-    worksheet['B4'] = "Count"
-    
-    for i, (company, count) in enumerate(company_counts.most_common(20), start=5):
-        worksheet[f'A{i}'] = company
-        worksheet[f'B{i}'] = count
+    for company, count in analytics['companies']:
+        worksheet.append([company, count])
 
-def _add_geographic_analysis_sheet(worksheet, data_list):
+def _add_geographic_analysis_sheet(worksheet, analytics):
     """Add geographic analysis by countries"""
-    worksheet['A1'] = "Geographic Analysis"
-    worksheet['A1'].font = Font(size=16, bold=True)
-    
-    # Count countries
-    countries = [data.get('country', '').strip() for data in data_list if data.get('country', '').strip()]
-    country_counts = Counter(countries)
+    _add_sheet_title(worksheet, "Geographic Analysis")
     
-    # Top countries
-    worksheet['A3'] = "Countries Distribution"
-    worksheet['A3'].font = Font(bold=True)
-    worksheet['A4'] = "Country"
-    worksheet['B4'] = "Count"
-    worksheet['C4'] = "Percentage"
+    # Countries, counted by MongoDB
+    worksheet.append([_styled_cell(worksheet, "Countries Distribution", font=Font(bold=True))])
+    worksheet.append(["Country", "Count", "Percentage"])
     
-    total_with_country = len(countries)
-    for i, (country, count) in enumerate(country_counts.most_common(), start=5):
-        worksheet[f'A{i}'] = country
-        worksheet[f'B{i}'] = count
-        worksheet[f'C{i}'] = f"{(count/total_with_country)*100:.1f}%" if total_with_country > 0 else "0%"
+    total_with_country = sum(count for _, count in analytics['countries'])
+    for country, count in analytics['countries']:
+        worksheet.append([country, count, _percentage(count, total_with_country)])
 
-def _add_contact_analysis_sheet(worksheet, data_list):
+def _add_contact_analysis_sheet(worksheet, analytics):
     """Add contact methods analysis"""
-    worksheet['A1'] = "Contact Methods Analysis"
-    worksheet['A1'].font = Font(size=16, bold=True)
-    
-    # Analyze contact methods
-    total_cards = len(data_list)
-    email_only = sum(1 for data in data_list if data.get('email', '').strip() and not data.get('phone', '').strip())
-    phone_only = sum(1 for data in data_list if data.get('phone', '').strip() and not data.get('email', '').strip())
-    both_contacts = sum(1 for data in data_list if data.get('email', '').strip() and data.get('phone', '').strip())
-    no_contact = sum(1 for data in data_list if not data.get('email', '').strip() and not data.get('phone', '').strip())
+    _add_sheet_title(worksheet, "Contact Methods Analysis")
     
+    # Contact method buckets
+    total_cards = analytics['total']
+    bold = Font(bold=True)
+    worksheet.append([_styled_cell(worksheet, header, font=bold) for header in ["Contact Method", "Count", "Percentage"]])
     contact_stats = [
-        ["Contact Method", "Count", "Percentage"],
-        ["Email Only", email_only, f"{(email_only/total_cards)*100:.1f}%" if total_cards > 0 else "0%"],
-        ["Phone Only", phone_only, f"{(phone_only/total_cards)*100:.1f}%" if total_cards > 0 else "0%"],
-        ["Both Email & Phone", both_contacts, f"{(both_contacts/total_cards)*100:.1f}%" if total_cards > 0 else "0%"],
-        ["No Contact Info", no_contact, f"{(no_contact/total_cards)*100:.1f}%" if total_cards > 0 else "0%"]
+        ["Email Only", analytics['email_only']],
+        ["Phone Only", analytics['phone_only']],
+        ["Both Email & Phone", analytics['both_contacts']],
+        ["No Contact Info", analytics['no_contact']]
     ]
-    
-    for i, row in enumerate(contact_stats, start=3):
-        worksheet[f'A{i}'] = row[0]
-        worksheet[f'B{i}'] = row[1]
-        worksheet[f'C{i}'] = row[2]
-        if i == 3:  # Header row
-            for col in ['A', 'B', 'C']:
-                worksheet[f'{col}{i}'].font = Font(bold=True)
+    for method, count in contact_stats:
+        worksheet.append([method, count, _percentage(count, total_cards)])
 
-# Production security validation functions
+# Production upload limit, enforced by app/ingest.py read_upload
 MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB
-
-def validate_file_size(file):
-    """Validate file size to prevent oversized uploads"""
-    if hasattr(file, 'content_length') and file.content_length:
-        return file.content_length <= MAX_FILE_SIZE
-    return True
-
-def sanitize_filename(filename):
-    """Additional filename sanitization for production"""
-    return secure_filename(filename)
-
-def validate_image_file(file):
-    """Enhanced file validation for production"""
-    if not file:
-        return False, "No file provided"
-    
-    if not allowed_file(file.filename):
-        return False, "File type not allowed. Only PNG, JPG, JPEG, and WEBP files are supported."
-    
-    if not validate_file_size(file):
-        return False, f"File size too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB."
-    
-    return True, "File is valid"
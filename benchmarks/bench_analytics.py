@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Time and memory of the analytics report statistics: one MongoDB $facet aggregation vs Python passes
+
+Seeds a scratch database with cards, then computes the statistics of the report's summary, company,
+geographic and contact sheets in a fresh process per engine so peak RSS is not shared between runs:
+
+    facet    get_card_analytics(): one aggregation, only the aggregates are sent back
+    python   the previous report: load every card, one pass per metric, Counter for companies/countries
+
+Both engines must agree on every number; the run stops if they do not. Reports time, cards per second
+and peak RSS (plus growth over the RSS before the run). MongoDB must be reachable at MONGODB_URI; the
+scratch database is dropped afterwards.
+
+Usage:
+    python benchmarks/bench_analytics.py                       # 10k and 100k cards
+    python benchmarks/bench_analytics.py --cards 10000 --json analytics.json
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import subprocess
+from collections import Counter
+
+import psutil
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+ENGINES = ['facet', 'python']
+
+# 1-40: Synthetic cards with every contact-method combination
+def seed_cards(collection, count, batch_size=5000):
+    """Insert cards where email, phone, company and country are each missing some of the time"""
+    countries = ['US', 'IN', 'GB', 'DE', 'AE', 'SG', '']
+    for start in range(0, count, batch_size):
+        collection.insert_many([{
+            'id': 10 ** 12 + number, 'card_id': str(10 ** 12 + number), 'filename': f"card_{number}.jpg",
+            'name': f"Contact {number}", 'designation': 'Sales Manager',
+            'email': f"c{number}@example.com" if number % 3 else '',
+            'phone': f"+1 555 {number:07d}" if number % 4 else ' ',
+            'company': f"Company {number % 997} Ltd" if number % 5 else '',
+            'website': f"www.company{number % 997}.example.com", 'address': f"{number % 900} Main Street",
+            'country': countries[number % len(countries)], 'flag': '🏳️', 'label_name': 'Unlabeled',
+            'event_name': 'Expo 2024', 'timestamp': '2024-01-01 00:00:00'
+        } for number in range(start, min(start + batch_size, count))])
+
+# 41-100: One engine per process
+def analytics_facet():
+    from app.mongo import get_card_analytics
+    return get_card_analytics()
+
+def analytics_python():
+    """The statistics as the report computed them before the aggregation, kept here for comparison"""
+    from app.mongo import load_extraction_data
+    data_list = load_extraction_data(view='export_row')
+    companies = [data.get('company', '').strip() for data in data_list if data.get('company', '').strip()]
+    countries = [data.get('country', '').strip() for data in data_list if data.get('country', '').strip()]
+    return {
+        'total': len(data_list),
+        'with_email': sum(1 for data in data_list if data.get('email', '').strip()),
+        'with_phone': sum(1 for data in data_list if data.get('phone', '').strip()),
+        'with_company': sum(1 for data in data_list if data.get('company', '').strip()),
+        'email_only': sum(1 for data in data_list if data.get('email', '').strip() and not data.get('phone', '').strip()),
+        'phone_only': sum(1 for data in data_list if data.get('phone', '').strip() and not data.get('email', '').strip()),
+        'both_contacts': sum(1 for data in data_list if data.get('email', '').strip() and data.get('phone', '').strip()),
+        'no_contact': sum(1 for data in data_list if not data.get('email', '').strip() and not data.get('phone', '').strip()),
+        'companies': Counter(companies).most_common(20),
+        'countries': Counter(countries).most_common()
+    }
+
+def comparable(analytics):
+    """Counter breaks ties by first appearance and the pipeline by name, so compare sorted counts"""
+    result = dict(analytics)
+    result['companies'] = sorted(count for _, count in analytics['companies'])
+    result['countries'] = sorted(map(list, analytics['countries']))
+    return result
+
+def run_child(engine):
+    from app import mongo  # Connect before measuring the baseline
+    mongo.collection.find_one({}, {'_id': 1})
+    baseline_rss = psutil.Process().memory_info().rss
+    started = time.perf_counter()
+    analytics = analytics_facet() if engine == 'facet' else analytics_python()
+    elapsed = time.perf_counter() - started
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Kilobytes on Linux
+    print(json.dumps({'engine': engine, 'seconds': round(elapsed, 3), 'peak_rss_bytes': peak_rss,
+                      'baseline_rss_bytes': baseline_rss, 'analytics': comparable(analytics)}))
+
+# 101-150: Driver
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cards', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=ENGINES)
+    parser.add_argument('--database', default='visiting_card_bench', help='Scratch database (dropped afterwards)')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    parser.add_argument('--child', choices=ENGINES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Point the app at the scratch database before it connects
+    os.environ['MONGODB_DATABASE'] = args.database
+    os.environ.setdefault('QUERY_STATS_ENABLED', 'False')
+    if args.child:
+        run_child(args.child)
+        return
+
+    from app import mongo
+    collection = mongo.collection
+    results = []
+    try:
+        for cards in sorted(args.cards):
+            collection.delete_many({})
+            seed_cards(collection, cards)
+            print(f"\n📊 {cards} cards")
+            statistics = {}
+            for engine in args.engines:
+                output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', engine,
+                                         '--database', args.database], capture_output=True, text=True,
+                                        cwd=PROJECT_ROOT, check=True).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                statistics[engine] = result.pop('analytics')
+                result['cards'] = cards
+                result['cards_per_second'] = round(cards / result['seconds']) if result['seconds'] else None
+                results.append(result)
+                print(f"   {engine:<7} {result['seconds']:8.3f}s  {result['cards_per_second']:>9} cards/s  "
+                      f"peak RSS {result['peak_rss_bytes'] / 1048576:7.1f} MB "
+                      f"(+{(result['peak_rss_bytes'] - result['baseline_rss_bytes']) / 1048576:.1f} MB)")
+            if len(statistics) == 2 and statistics['facet'] != statistics['python']:
+                sys.exit(f"❌ Engines disagree at {cards} cards:\n{statistics}")
+    finally:
+        collection.database.client.drop_database(args.database)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
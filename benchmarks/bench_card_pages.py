@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Wire size and memory of the card list pages with images embedded in card documents vs stored apart
+
+Seeds a scratch database with cards in the legacy layout (full image as a base64 data URI in
+'image_base64'), then measures /manage and /results through the Flask test client: response bytes,
+bytes fetched from MongoDB, peak Python allocations and time. It then runs the image migration and
+measures again. MongoDB must be reachable at MONGODB_URI; the scratch database is dropped afterwards.
+
+Usage:
+    python benchmarks/bench_card_pages.py                    # 200 cards
+    python benchmarks/bench_card_pages.py --cards 1000 --json after.json
+
+To compare against a checkout from before the image store, run the same command there with
+--json before.json (the migration step is skipped when it does not exist).
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import argparse
+import tracemalloc
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bson
+from PIL import Image, ImageDraw
+
+PAGES = ['/manage', '/results']
+
+def synthetic_card(seed, width=1600, height=1000):
+    """A card photo sized like a phone upload, with some noise so JPEG cannot shrink it to nothing"""
+    img = Image.effect_noise((width, height), 40).convert('RGB')
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((60, 60, width - 60, height - 60), outline=(20, 20, 20), width=6)
+    draw.text((120, 140), f"Contact {seed:06d}", fill=(0, 0, 0))
+    buffered = BytesIO()
+    img.save(buffered, format='JPEG', quality=90)
+    return buffered.getvalue()
+
+def seed_legacy_cards(collection, count):
+    """Insert cards the way store_card_with_image used to: image inline as a data URI"""
+    images = [synthetic_card(seed) for seed in range(min(count, 20))]
+    documents = []
+    for number in range(count):
+        image_bytes = images[number % len(images)] + number.to_bytes(4, 'big')  # Distinct content per card
+        documents.append({
+            'id': 10 ** 12 + number, 'card_id': str(10 ** 12 + number), 'filename': f"card_{number}.jpg",
+            'image_base64': f"data:image/jpeg;base64,{base64.b64encode(image_bytes).decode()}",
+            'name': f"Contact {number}", 'company': f"Company {number % 50}", 'email': f"c{number}@example.com",
+            'phone': f"+1 555 {number:07d}", 'country': 'US', 'flag': '🇺🇸', 'is_sorted': number % 2 == 0,
+            'timestamp': '2024-01-01 00:00:00'
+        })
+    for start in range(0, len(documents), 100):
+        collection.insert_many(documents[start:start + 100])
+
+def fetched_bytes(collection, projection):
+    """BSON bytes MongoDB sends for a full card list query with this projection"""
+    return sum(len(bson.encode(document)) for document in collection.find({}, projection))
+
+def measure_pages(client):
+    results = {}
+    for page in PAGES:
+        tracemalloc.start()
+        started = time.perf_counter()
+        response = client.get(page)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[page] = {'status': response.status_code, 'response_bytes': len(response.data),
+                         'peak_alloc_bytes': peak, 'seconds': round(elapsed, 3)}
+    return results
+
+def print_stage(name, stage):
+    print(f"\n{name}")
+    print(f"   stored documents  {stage['stored_bytes'] / 1048576:9.1f} MB")
+    print(f"   list query        {stage['list_query_bytes'] / 1048576:9.1f} MB fetched")
+    for page, result in stage['pages'].items():
+        print(f"   {page:<17} {result['response_bytes'] / 1048576:9.2f} MB response, "
+              f"{result['peak_alloc_bytes'] / 1048576:8.1f} MB peak alloc, {result['seconds']:6.2f}s (HTTP {result['status']})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cards', type=int, default=200)
+    parser.add_argument('--database', default='visiting_card_bench', help='Scratch database (dropped afterwards)')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    # Point the app at the scratch database before it connects
+    os.environ['MONGODB_DATABASE'] = args.database
+    os.environ.setdefault('FLASK_ENV', 'development')
+    from app import create_app
+    from app import mongo
+
+    collection = mongo.collection
+    collection.delete_many({})
+    seed_legacy_cards(collection, args.cards)
+    client = create_app().test_client()
+    try:
+        from app.queries import view_projection
+        list_projection = view_projection('list_row')
+    except ImportError:
+        list_projection = getattr(mongo, 'CARD_PROJECTION', {'_id': 0})
+
+    stages = {}
+    stages['embedded'] = {
+        'stored_bytes': fetched_bytes(collection, None),
+        'list_query_bytes': fetched_bytes(collection, list_projection),
+        'legacy_list_query_bytes': fetched_bytes(collection, {'_id': 0}),
+        'pages': measure_pages(client)
+    }
+    print(f"🖼️ {args.cards} cards")
+    print_stage('Images embedded in card documents', stages['embedded'])
+
+    if hasattr(mongo, 'migrate_card_images'):
+        started = time.perf_counter()
+        migration = mongo.migrate_card_images()
+        migration['seconds'] = round(time.perf_counter() - started, 2)
+        stages['migration'] = migration
+        stages['image_store'] = {
+            'stored_bytes': fetched_bytes(collection, None),
+            'list_query_bytes': fetched_bytes(collection, list_projection),
+            'pages': measure_pages(client)
+        }
+        print(f"\nMigrated {migration['migrated']} images in {migration['seconds']}s")
+        print_stage('Images in the image store', stages['image_store'])
+
+        before, after = stages['embedded'], stages['image_store']
+        print(f"\n   list query: {before['legacy_list_query_bytes'] / 1048576:.1f} MB -> "
+              f"{after['list_query_bytes'] / 1048576:.2f} MB fetched per request")
+
+    collection.database.client.drop_database(args.database)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'cards': args.cards, 'stages': stages}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
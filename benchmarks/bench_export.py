@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Throughput and memory of the Excel export: streamed from a MongoDB cursor vs built in memory
+
+Seeds a scratch database with cards, then exports them in a fresh process per engine so peak RSS
+is not shared between runs:
+
+    streaming   generate_excel_from_mongo(): cursor batches written straight into a chunked .xlsx
+    in-memory   the previous exporter: load every card, fill an openpyxl Workbook, save to BytesIO
+
+Reports rows/sec, time to first byte, file size and peak RSS (plus growth over the RSS before the
+export started). MongoDB must be reachable at MONGODB_URI; the scratch database is dropped afterwards.
+
+Usage:
+    python benchmarks/bench_export.py                          # 100k rows
+    python benchmarks/bench_export.py --rows 10000 20000 100000 --json export.json
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import subprocess
+from io import BytesIO
+from datetime import datetime, timedelta
+
+import psutil
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+ENGINES = ['streaming', 'in-memory']
+
+# 1-40: Synthetic cards
+def seed_cards(collection, count, batch_size=5000):
+    """Insert cards with every exported field filled in"""
+    base = datetime(2024, 1, 1)
+    for start in range(0, count, batch_size):
+        collection.insert_many([{
+            'id': 10 ** 12 + number, 'card_id': str(10 ** 12 + number), 'filename': f"card_{number}.jpg",
+            'name': f"Contact {number}", 'company': f"Company {number % 500} Ltd", 'email': f"c{number}@example.com",
+            'phone': f"+1 555 {number:07d}", 'website': f"www.company{number % 500}.example.com",
+            'address': f"{number % 900} Main Street, Springfield", 'designation': 'Sales Manager',
+            'country': 'US', 'flag': '🇺🇸', 'label_id': number % 7 or None, 'label_name': f"Label {number % 7}",
+            'event_name': 'Expo 2024', 'event_description': 'Annual trade show', 'event_host': 'Expo Group',
+            'event_date': '2024-05-01', 'event_location': 'Hall B', 'timestamp': '2024-01-01 00:00:00',
+            'created_at': base + timedelta(seconds=number)
+        } for number in range(start, min(start + batch_size, count))])
+
+# 41-90: One export per process
+def export_streaming():
+    from app.utils import generate_excel_from_mongo
+    started = time.perf_counter()
+    first_byte = None
+    size = 0
+    for chunk in generate_excel_from_mongo():
+        if first_byte is None and chunk:
+            first_byte = time.perf_counter() - started
+        size += len(chunk)
+    return size, first_byte
+
+def export_in_memory():
+    """The exporter as it was before streaming, kept here for comparison"""
+    from openpyxl import Workbook
+    from app.mongo import load_extraction_data
+    started = time.perf_counter()
+    data_list = load_extraction_data(view='export_row')
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.append(['Name', 'Phone', 'Email', 'Company', 'Website', 'Address', 'Filename', 'Timestamp',
+                      'Event Name', 'Event Description', 'Event Host', 'Event Date', 'Event Location'])
+    fields = ['name', 'phone', 'email', 'company', 'website', 'address', 'filename', 'timestamp', 'event_name',
+              'event_description', 'event_host', 'event_date', 'event_location']
+    for data in data_list:
+        worksheet.append([data.get(field, '') for field in fields])
+    excel_buffer = BytesIO()
+    workbook.save(excel_buffer)
+    workbook.close()
+    return len(excel_buffer.getvalue()), time.perf_counter() - started  # Nothing is sent before the end
+
+def run_child(engine):
+    from app import mongo  # Connect before measuring the baseline
+    mongo.collection.find_one({}, {'_id': 1})
+    baseline_rss = psutil.Process().memory_info().rss
+    started = time.perf_counter()
+    size, first_byte = export_streaming() if engine == 'streaming' else export_in_memory()
+    elapsed = time.perf_counter() - started
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Kilobytes on Linux
+    print(json.dumps({'engine': engine, 'seconds': round(elapsed, 2), 'first_byte_seconds': round(first_byte, 3),
+                      'file_bytes': size, 'peak_rss_bytes': peak_rss, 'baseline_rss_bytes': baseline_rss}))
+
+# 91-140: Driver
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000])
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=ENGINES)
+    parser.add_argument('--database', default='visiting_card_bench', help='Scratch database (dropped afterwards)')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    parser.add_argument('--child', choices=ENGINES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Point the app at the scratch database before it connects
+    os.environ['MONGODB_DATABASE'] = args.database
+    os.environ.setdefault('QUERY_STATS_ENABLED', 'False')
+    if args.child:
+        run_child(args.child)
+        return
+
+    from app import mongo
+    collection = mongo.collection
+    results = []
+    try:
+        for rows in sorted(args.rows):
+            collection.delete_many({})
+            seed_cards(collection, rows)
+            print(f"\n📊 {rows} rows")
+            for engine in args.engines:
+                output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', engine,
+                                         '--database', args.database], capture_output=True, text=True,
+                                        cwd=PROJECT_ROOT, check=True).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                result['rows'] = rows
+                result['rows_per_second'] = round(rows / result['seconds']) if result['seconds'] else None
+                results.append(result)
+                print(f"   {engine:<10} {result['rows_per_second']:>8} rows/s  "
+                      f"first byte {result['first_byte_seconds']:6.2f}s  "
+                      f"{result['file_bytes'] / 1048576:6.1f} MB file  "
+                      f"peak RSS {result['peak_rss_bytes'] / 1048576:7.1f} MB "
+                      f"(+{(result['peak_rss_bytes'] - result['baseline_rss_bytes']) / 1048576:.1f} MB)")
+    finally:
+        collection.database.client.drop_database(args.database)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+End-to-end ingestion benchmark: drives /upload and /api/ocr with synthetic card images
+
+By default it starts benchmarks/gemini_stub.py and the app (gunicorn, or the Flask server with
+--server flask) pointed at the stub, so no API quota is spent. MongoDB must be reachable at
+MONGODB_URI. Reports cards/sec, p50/p95/p99 per-card latency and peak RSS per server process.
+
+Usage:
+    python benchmarks/bench_ingest.py                              # 10, 100 and 1000 cards
+    python benchmarks/bench_ingest.py --sizes 100 --workers 4 --latency-ms 800
+    python benchmarks/bench_ingest.py --engine fake                # pipeline only, no Gemini calls
+    python benchmarks/bench_ingest.py --url http://127.0.0.1:5000 --server-pid 1234   # running server
+
+Latency is measured per card: for /api/ocr it is the response time of the request carrying the
+card, for /upload it is the time from submitting the upload until the card is stored, as seen
+by polling /api/progress.
+"""
+
+import os
+import re
+import sys
+import time
+import json
+import signal
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+
+import psutil
+import requests
+from PIL import Image, ImageDraw
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 1-40: Synthetic input
+def synthetic_card(seed, width=1400, height=800):
+    """A card-sized JPEG with unique contact text, so neither the cache nor dedup short-circuits it"""
+    img = Image.new('RGB', (width, height), (248, 246, 240))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 0, width - 1, 90), fill=(30 + seed % 200, 60, 120))
+    lines = [f"Contact {seed:06d}", "Sales Manager", f"Company {seed % 97} Ltd",
+             f"+1 555 {seed % 1000:03d} {seed % 10000:04d}", f"contact{seed}@example.com", "www.example.com"]
+    for number, line in enumerate(lines):
+        draw.text((80, 140 + number * 90), line, fill=(20, 20, 20))
+    buffered = BytesIO()
+    img.save(buffered, format='JPEG', quality=90)
+    return buffered.getvalue()
+
+def percentiles(samples):
+    """p50/p95/p99 of a list of samples"""
+    if not samples:
+        return None, None, None
+    if len(samples) == 1:
+        return samples[0], samples[0], samples[0]
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return cuts[49], cuts[94], cuts[98]
+
+# 41-90: Process memory sampling
+class RssSampler(threading.Thread):
+    """Samples the RSS of a process and all its children, keeping the peak per PID"""
+
+    def __init__(self, pid, interval=0.2):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peaks = {}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                root = psutil.Process(self.pid)
+                for process in [root] + root.children(recursive=True):
+                    try:
+                        rss = process.memory_info().rss
+                    except psutil.Error:
+                        continue
+                    self.peaks[process.pid] = max(self.peaks.get(process.pid, 0), rss)
+            except psutil.Error:
+                pass
+            self._stop_event.wait(self.interval)
+
+    def reset(self):
+        self.peaks = {}
+
+    def stop(self):
+        self._stop_event.set()
+
+# 91-160: Stub and server lifecycle
+def wait_for(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=2).status_code < 500:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.3)
+    return False
+
+def start_stub(args):
+    command = [sys.executable, os.path.join(PROJECT_ROOT, 'benchmarks', 'gemini_stub.py'),
+               '--port', str(args.stub_port), '--latency-ms', str(args.latency_ms),
+               '--latency-dist', args.latency_dist, '--error-rate', str(args.error_rate)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+    if not wait_for(f"http://127.0.0.1:{args.stub_port}/"):
+        process.kill()
+        sys.exit('❌ Gemini stub did not start')
+    return process
+
+def start_server(args):
+    env = dict(os.environ)
+    env.update({
+        'GEMINI_API_URL': f"http://127.0.0.1:{args.stub_port}/v1beta/models/stub:generateContent",
+        # The stub has no quota; keep the node-wide limiter from being the bottleneck
+        'GEMINI_RPM': str(args.rpm),
+        'GEMINI_BURST': str(args.rpm),
+        'GEMINI_RATE_LIMIT_DB': os.path.join(tempfile.mkdtemp(prefix='bench-'), 'rate_limit.sqlite3'),
+        'EXTRACTION_CACHE_ENABLED': 'False',
+        # Development config: production cookies are HTTPS-only, which breaks /upload's flash over plain HTTP
+        'FLASK_ENV': 'development',
+        'PORT': str(args.port)
+    })
+
+    if args.server == 'gunicorn':
+        command = ['gunicorn', '--bind', f"127.0.0.1:{args.port}", '--workers', str(args.workers),
+                   '--threads', str(args.threads), '--timeout', '600', '--preload', 'main:app']
+    else:
+        command = [sys.executable, 'main.py']
+
+    process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env,
+                               stdout=subprocess.DEVNULL if not args.verbose else None,
+                               stderr=subprocess.DEVNULL if not args.verbose else None)
+    if not wait_for(f"http://127.0.0.1:{args.port}/health", timeout=120):
+        process.kill()
+        sys.exit('❌ App server did not become healthy')
+    return process
+
+def stop(process):
+    if process and process.poll() is None:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+# 161-260: Load drivers
+def chunks(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def multipart(batch, engine):
+    files = [('files', (f"card_{seed}.jpg", data, 'image/jpeg')) for seed, data in batch]
+    return files, ({'engine': engine} if engine else {})
+
+def drive_api_ocr(base_url, batches, engine, concurrency):
+    """
+    Synchronous extraction: every card's latency is its request's response time
+    API tokens live in each worker's memory, so a 401 means registering on whichever worker answered
+    """
+    tokens = []
+    token_lock = threading.Lock()
+
+    def send(batch):
+        session = requests.Session()
+        files, data = multipart(batch, engine)
+        while True:
+            with token_lock:
+                token = tokens[-1] if tokens else ''
+            start = time.perf_counter()
+            response = session.post(f"{base_url}/api/ocr", files=files, data=data,
+                                    headers={'Authorization': f"Bearer {token}"}, timeout=900)
+            elapsed = (time.perf_counter() - start) * 1000
+            if response.status_code != 401:
+                break
+            registered = session.post(f"{base_url}/api/auth/register", timeout=30,
+                                      json={'username': 'bench', 'email': 'bench@example.com', 'password': 'bench'})
+            with token_lock:
+                tokens.append(registered.json()['api_key'])
+
+        stored = response.json().get('total_processed', 0) if response.ok else 0
+        return [elapsed] * len(batch), stored
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send, batches))
+    latencies = [latency for batch_latencies, _ in results for latency in batch_latencies]
+    return latencies, sum(stored for _, stored in results)
+
+def drive_upload(base_url, batches, engine, concurrency, poll_interval=0.1):
+    """
+    Background extraction: submit through the HTML form endpoint, then poll job progress
+    """
+    def send(batch):
+        session = requests.Session()
+        files, data = multipart(batch, engine)
+        start = time.perf_counter()
+        response = session.post(f"{base_url}/upload", files=files, data=data, timeout=300)
+        match = re.search(r'job ([0-9a-f]{32})', response.text)
+        if not match:
+            return [], 0
+
+        finished = {}
+        while len(finished) < len(batch):
+            progress = session.get(f"{base_url}/api/progress/{match.group(1)}", timeout=30).json()
+            now = (time.perf_counter() - start) * 1000
+            for index, entry in enumerate(progress.get('files', [])):
+                if entry['state'] in ('stored', 'failed') and index not in finished:
+                    finished[index] = (now, entry['state'])
+            if progress.get('status') in ('completed', 'failed'):
+                break
+            time.sleep(poll_interval)
+
+        latencies = [latency for latency, state in finished.values() if state == 'stored']
+        return latencies, len(latencies)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send, batches))
+    return [latency for latencies, _ in results for latency in latencies], sum(stored for _, stored in results)
+
+# 261-330: Benchmark runner
+def run_case(name, driver, base_url, size, args, sampler, seed_offset):
+    cards = [(seed_offset + seed, synthetic_card(seed_offset + seed)) for seed in range(size)]
+    batches = chunks(cards, args.batch_size)
+
+    if sampler:
+        sampler.reset()
+    start = time.perf_counter()
+    latencies, stored = driver(base_url, batches, args.engine, args.concurrency)
+    wall = time.perf_counter() - start
+
+    p50, p95, p99 = percentiles(latencies)
+    peaks = sorted(sampler.peaks.values(), reverse=True) if sampler else []
+    return {
+        'endpoint': name,
+        'cards': size,
+        'stored': stored,
+        'failed': size - stored,
+        'wall_seconds': round(wall, 2),
+        'cards_per_sec': round(stored / wall, 2) if wall else 0.0,
+        'p50_ms': round(p50, 1) if p50 is not None else None,
+        'p95_ms': round(p95, 1) if p95 is not None else None,
+        'p99_ms': round(p99, 1) if p99 is not None else None,
+        'peak_rss_mb_per_process': [round(peak / 1024 / 1024, 1) for peak in peaks]
+    }
+
+def print_row(result):
+    def fmt(value):
+        return f"{value:>9.0f}" if value is not None else f"{'-':>9}"
+    rss = result['peak_rss_mb_per_process']
+    print(f"{result['endpoint']:<10}{result['cards']:>7}{result['stored']:>8}{result['failed']:>8}"
+          f"{result['wall_seconds']:>9.1f}{result['cards_per_sec']:>10.2f}"
+          f"{fmt(result['p50_ms'])}{fmt(result['p95_ms'])}{fmt(result['p99_ms'])}"
+          f"{(max(rss) if rss else 0):>12.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000], help='Cards per run')
+    parser.add_argument('--endpoints', nargs='+', choices=['upload', 'api_ocr'], default=['upload', 'api_ocr'])
+    parser.add_argument('--batch-size', type=int, default=10, help='Images per HTTP request')
+    parser.add_argument('--concurrency', type=int, default=4, help='Concurrent client requests')
+    parser.add_argument('--engine', help="OCR engine form field (e.g. 'fake'); default is the server's")
+    parser.add_argument('--url', help='Benchmark an already running server instead of starting one')
+    parser.add_argument('--server-pid', type=int, help='PID to sample RSS from when using --url')
+    parser.add_argument('--server', choices=['gunicorn', 'flask'], default='gunicorn')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--rpm', type=int, default=100000, help='GEMINI_RPM/GEMINI_BURST for the started server')
+    parser.add_argument('--stub-port', type=int, default=8089)
+    parser.add_argument('--latency-ms', type=float, default=1500)
+    parser.add_argument('--latency-dist', choices=['fixed', 'uniform', 'lognormal'], default='lognormal')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    parser.add_argument('--verbose', action='store_true', help='Show server output')
+    args = parser.parse_args()
+
+    stub = server = sampler = None
+    try:
+        if args.url:
+            base_url = args.url.rstrip('/')
+            server_pid = args.server_pid
+        else:
+            stub = start_stub(args)
+            server = start_server(args)
+            base_url = f"http://127.0.0.1:{args.port}"
+            server_pid = server.pid
+            print(f"🚀 {args.server} on {base_url} -> Gemini stub on :{args.stub_port} ({args.latency_ms:.0f} ms {args.latency_dist})")
+
+        if server_pid:
+            sampler = RssSampler(server_pid)
+            sampler.start()
+
+        print(f"\n{'endpoint':<10}{'cards':>7}{'stored':>8}{'failed':>8}{'wall s':>9}{'cards/s':>10}"
+              f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'peak RSS MB':>12}")
+
+        results = []
+        seed_offset = int(time.time()) % 100000 * 10000  # Fresh cards on every run
+        for size in args.sizes:
+            for endpoint in args.endpoints:
+                driver = drive_upload if endpoint == 'upload' else drive_api_ocr
+                result = run_case(endpoint, driver, base_url, size, args, sampler, seed_offset)
+                seed_offset += size
+                results.append(result)
+                print_row(result)
+
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump({'args': vars(args), 'results': results}, f, indent=2)
+            print(f"\n📝 Results written to {args.json}")
+
+    finally:
+        if sampler:
+            sampler.stop()
+        stop(server)
+        stop(stub)
+
+if __name__ == '__main__':
+    main()
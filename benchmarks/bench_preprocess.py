@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: legacy card preprocessing vs app.preprocess
+
+Usage:
+    python benchmarks/bench_preprocess.py                 # synthetic 12 MP phone photos
+    python benchmarks/bench_preprocess.py card1.jpg ...   # your own images
+    python benchmarks/bench_preprocess.py --count 20 --width 4000 --height 3000
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageOps
+from app.preprocess import preprocess_image_bytes
+
+def legacy_preprocess(image_bytes):
+    """Preprocessing as previously done inline in extract_data_from_image_gemini"""
+    pil_img = Image.open(BytesIO(image_bytes)).convert('RGB')
+    pil_img = ImageOps.exif_transpose(pil_img)
+    pil_img = pil_img.resize((min(1200, pil_img.width), min(800, pil_img.height)), Image.LANCZOS)
+    pil_img = ImageOps.grayscale(pil_img)
+    pil_img = ImageOps.autocontrast(pil_img)
+    buffered = BytesIO()
+    pil_img.save(buffered, format="JPEG")
+    return buffered.getvalue()
+
+def synthetic_card_photo(width, height, seed):
+    """Generate a phone-photo-sized JPEG with a card-like block of text"""
+    img = Image.new('RGB', (width, height), (90 + seed % 40, 110, 95))
+    draw = ImageDraw.Draw(img)
+    card = (width // 8, height // 5, width * 7 // 8, height * 4 // 5)
+    draw.rectangle(card, fill=(245, 243, 238))
+    line_height = max(12, height // 40)
+    for line in range(12):
+        y = card[1] + line_height * (line + 1)
+        draw.text((card[0] + line_height, y), f"Jane Doe {seed}-{line}  +1 555 0100  jane{seed}@example.com", fill=(20, 20, 20))
+    buffered = BytesIO()
+    img.save(buffered, format='JPEG', quality=92)
+    return buffered.getvalue()
+
+def measure(fn, images, repeat):
+    """Return (ms per image samples, output sizes)"""
+    timings, sizes = [], []
+    for _ in range(repeat):
+        for image_bytes in images:
+            start = time.perf_counter()
+            output = fn(image_bytes)
+            timings.append((time.perf_counter() - start) * 1000)
+            sizes.append(len(output))
+    return timings, sizes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('images', nargs='*', help='Image files to benchmark (default: synthetic photos)')
+    parser.add_argument('--count', type=int, default=10, help='Number of synthetic images')
+    parser.add_argument('--width', type=int, default=4032)
+    parser.add_argument('--height', type=int, default=3024)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.images:
+        images = [open(path, 'rb').read() for path in args.images]
+    else:
+        print(f"🖼️ Generating {args.count} synthetic {args.width}x{args.height} photos...")
+        images = [synthetic_card_photo(args.width, args.height, seed) for seed in range(args.count)]
+
+    print(f"📊 Input: {len(images)} images, avg {statistics.mean(len(i) for i in images) / 1024:.0f} KB\n")
+    print(f"{'engine':<12}{'ms/img p50':>12}{'ms/img mean':>13}{'out KB avg':>12}{'out KB max':>12}")
+
+    for name, fn in (('legacy', legacy_preprocess), ('preprocess', preprocess_image_bytes)):
+        fn(images[0])  # warm up
+        timings, sizes = measure(fn, images, args.repeat)
+        print(f"{name:<12}{statistics.median(timings):>12.1f}{statistics.mean(timings):>13.1f}"
+              f"{statistics.mean(sizes) / 1024:>12.1f}{max(sizes) / 1024:>12.1f}")
+
+if __name__ == '__main__':
+    main()
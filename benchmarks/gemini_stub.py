@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Gemini generateContent endpoint, for load tests without API quota
+
+Answers every POST with a card extraction in Gemini's response format after a simulated
+latency, optionally failing a share of requests. Multi-image (batch mode) requests get
+a JSON array with one entry per image.
+
+Usage:
+    python benchmarks/gemini_stub.py --port 8089
+    python benchmarks/gemini_stub.py --latency-ms 800 --latency-dist lognormal --error-rate 0.02
+    python benchmarks/gemini_stub.py --responses canned_cards.json   # JSON list of card objects
+
+Point the app at it:
+    GEMINI_API_URL=http://127.0.0.1:8089/v1beta/models/stub:generateContent
+"""
+
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_CARDS = [
+    {"name": "Jane Doe", "phone": "+1 415 555 0100", "email": "jane.doe@acme.com", "company": "Acme Inc", "country": "United States"},
+    {"name": "Rahul Mehta", "phone": "+91 98765 43210", "email": "rahul@sunrise-tech.in", "company": "Sunrise Technologies Pvt Ltd", "country": "India"},
+    {"name": "Anna Schmidt", "phone": "+49 30 1234567", "email": "a.schmidt@nordwerk.de", "company": "Nordwerk GmbH", "country": "Germany"},
+    {"name": "Tom Baker", "phone": "+44 20 7946 0958", "email": "tom@baker-partners.co.uk", "company": "Baker & Partners Ltd", "country": "United Kingdom"},
+]
+
+class StubState:
+    """Settings and counters shared by all handler threads"""
+
+    def __init__(self, args):
+        self.args = args
+        self.cards = DEFAULT_CARDS
+        if args.responses:
+            with open(args.responses) as f:
+                self.cards = json.load(f)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def latency(self):
+        """Sample one response latency in seconds"""
+        base = self.args.latency_ms / 1000.0
+        if self.args.latency_dist == 'fixed':
+            return base
+        if self.args.latency_dist == 'uniform':
+            return random.uniform(base * (1 - self.args.jitter), base * (1 + self.args.jitter))
+        # lognormal with its median at latency_ms and a long right tail
+        return random.lognormvariate(math.log(max(base, 1e-6)), self.args.jitter)
+
+    def next_card(self, number):
+        card = dict(self.cards[number % len(self.cards)])
+        # Distinct contacts so dedup and indexes see realistic data
+        local, _, domain = card.get('email', '').partition('@')
+        if domain:
+            card['email'] = f"{local}+{number}@{domain}"
+        return card
+
+def gemini_response(text):
+    return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP"}]}
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real endpoint
+
+    def log_message(self, format, *args):
+        if self.server.state.args.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        state = self.server.state
+        with state.lock:
+            self._send_json(200, {'requests': state.requests, 'errors': state.errors})
+
+    def do_POST(self):
+        state = self.server.state
+        payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        parts = payload.get('contents', [{}])[0].get('parts', [])
+        images = sum(1 for part in parts if 'inline_data' in part)
+
+        with state.lock:
+            state.requests += 1
+            number = state.requests
+            failed = random.random() < state.args.error_rate
+            if failed:
+                state.errors += 1
+
+        time.sleep(state.latency())
+
+        if failed:
+            status = random.choice(state.args.error_status)
+            headers = {'Retry-After': '1'} if status == 429 else None
+            self._send_json(status, {'error': {'code': status, 'message': 'Simulated failure'}}, headers)
+            return
+
+        if images > 1:
+            cards = [dict(state.next_card(number * 100 + i), index=i) for i in range(images)]
+            text = '```json\n' + json.dumps(cards) + '\n```'
+        else:
+            text = json.dumps(state.next_card(number))
+        self._send_json(200, gemini_response(text))
+
+def make_server(args):
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    server.daemon_threads = True
+    server.state = StubState(args)
+    return server
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency-ms', type=float, default=1500, help='Median response latency')
+    parser.add_argument('--latency-dist', choices=['fixed', 'uniform', 'lognormal'], default='lognormal')
+    parser.add_argument('--jitter', type=float, default=0.35,
+                        help='Relative spread for uniform, sigma for lognormal')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests that fail (0-1)')
+    parser.add_argument('--error-status', type=int, nargs='+', default=[429, 503],
+                        help='HTTP statuses returned for simulated failures')
+    parser.add_argument('--responses', help='JSON file with a list of card objects to answer with')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    server = make_server(args)
+    print(f"🧪 Gemini stub listening on http://{args.host}:{args.port} "
+          f"({args.latency_dist} latency ~{args.latency_ms:.0f} ms, error rate {args.error_rate:.1%})")
+    print(f"   GEMINI_API_URL=http://{args.host}:{args.port}/v1beta/models/stub:generateContent")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Stress test for record IDs: many processes x many threads inserting cards concurrently
+
+Each forked process gets its own SnowflakeIds node leased from MongoDB, exactly like
+gunicorn workers, and every thread inserts documents into a scratch collection with a
+unique index on 'id'. Reports duplicate-key failures, per-thread ordering and IDs/sec.
+With --range every process is pinned to the same host range (ID_NODE_RANGE), like the
+preloaded workers of one host, and each must still have leased a node of its own.
+MongoDB must be reachable at MONGODB_URI; the scratch collection is dropped afterwards.
+
+Usage:
+    python benchmarks/stress_ids.py                                  # 4 processes x 8 threads x 500 inserts
+    python benchmarks/stress_ids.py --processes 8 --threads 16 --count 2000
+    python benchmarks/stress_ids.py --range 64-79                    # one host's workers sharing a pinned range
+    python benchmarks/stress_ids.py --legacy                         # int(time.time() * 1000) for comparison
+    python benchmarks/stress_ids.py --no-insert --count 100000       # generator only, no MongoDB writes
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import MongoClient, ASCENDING
+from pymongo.errors import DuplicateKeyError
+from app import ids
+from app.ids import SnowflakeIds, lease_node_id, renew_node_lease, node_range, NODE_BITS, SEQUENCE_BITS
+
+SCRATCH_COLLECTION = 'id_stress'
+
+def scratch_collection():
+    client = MongoClient(os.getenv('MONGODB_URI', 'mongodb://localhost:27017/'), serverSelectionTimeoutMS=5000)
+    return client[os.getenv('MONGODB_DATABASE', 'visiting_card_db')][SCRATCH_COLLECTION]
+
+# Created before forking so every child has to notice the new pid and lease its own node
+generator = None
+
+def legacy_id():
+    return int(time.time() * 1000)
+
+def worker(process_no, args, results):
+    """One process: args.threads threads each minting (and inserting) args.count IDs"""
+    collection = scratch_collection()
+    next_id = legacy_id if args.legacy else generator.next_id
+    per_thread = [None] * args.threads
+    failures = [0] * args.threads
+
+    def run(thread_no):
+        ids = []
+        for number in range(args.count):
+            record_id = next_id()
+            if not args.no_insert:
+                try:
+                    collection.insert_one({'id': record_id, 'process': process_no, 'thread': thread_no, 'n': number})
+                except DuplicateKeyError:
+                    failures[thread_no] += 1
+            ids.append(record_id)
+        per_thread[thread_no] = ids
+
+    threads = [threading.Thread(target=run, args=(thread_no,)) for thread_no in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    results.put({
+        'process': process_no,
+        'ids': [record_id for ids in per_thread for record_id in ids],
+        'nodes': sorted({(record_id >> SEQUENCE_BITS) & ((1 << NODE_BITS) - 1)
+                         for ids in per_thread for record_id in ids}) if not args.legacy else [],
+        'ordered': all(ids == sorted(ids) and len(set(ids)) == len(ids) for ids in per_thread),
+        'failures': sum(failures)
+    })
+
+def main():
+    global generator
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--count', type=int, default=500, help='IDs per thread')
+    parser.add_argument('--legacy', action='store_true', help='Mint millisecond-timestamp IDs like the old insert paths')
+    parser.add_argument('--no-insert', action='store_true', help='Only generate IDs')
+    parser.add_argument('--range', help='Pin every process to this ID_NODE_RANGE, e.g. 64-79')
+    args = parser.parse_args()
+    if args.range:
+        node_range(args.range)  # Reject a bad range before forking
+        ids.ID_NODE_RANGE = args.range
+
+    collection = scratch_collection()
+    collection.drop()
+    collection.create_index([('id', ASCENDING)], unique=True, name='id_idx')
+    generator = SnowflakeIds(lambda: lease_node_id(scratch_collection()),  # A fresh client per forked process
+                             renew=lambda node: renew_node_lease(scratch_collection(), node))
+
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(process_no, args, results)) for process_no in range(args.processes)]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    all_ids = [record_id for report in reports for record_id in report['ids']]
+    total = len(all_ids)
+    unique = len(set(all_ids))
+    failures = sum(report['failures'] for report in reports)
+    stored = collection.count_documents({}) if not args.no_insert else None
+    collection.drop()
+
+    print(f"🆔 {'legacy millisecond' if args.legacy else 'snowflake'} IDs: "
+          f"{args.processes} processes x {args.threads} threads x {args.count}")
+    print(f"   generated      {total} in {elapsed:.2f}s ({total / elapsed:,.0f}/s)")
+    print(f"   unique         {unique} ({total - unique} collisions)")
+    if stored is not None:
+        print(f"   stored         {stored} ({failures} duplicate-key failures)")
+    nodes = [report['nodes'] for report in reports]
+    nodes_ok = True
+    if not args.legacy:
+        first, last = node_range()
+        leased = [node for process_nodes in nodes for node in process_nodes]
+        nodes_ok = len(leased) == len(set(leased)) and all(first <= node <= last for node in leased)
+        print(f"   nodes          {nodes} in {first}-{last} "
+              f"({'one per process' if nodes_ok else 'SHARED or outside the range'})")
+    print(f"   thread order   {'strictly increasing' if all(report['ordered'] for report in reports) else 'NOT strictly increasing'}")
+    print(f"   max id         {max(all_ids)} ({'fits' if max(all_ids) < 2 ** 53 else 'exceeds'} 2^53)")
+
+    ok = unique == total and failures == 0 and nodes_ok
+    print("✅ No collisions" if ok else "❌ Collisions found")
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,372 @@
+// Paged and virtualized card lists for /manage and /results
+// The server renders the first page of each list; further pages come from /api/cards/list
+// as HTML rendered with the same Jinja macros, so markup lives in templates/_cards.html only.
+
+const CARD_LIST_URL = '/api/cards/list';
+
+// 1-30: Fetching pages
+function fetchCardListPage(list, params, cursor) {
+    const query = new URLSearchParams();
+    query.set('list', list);
+    Object.entries(params || {}).forEach(([key, value]) => {
+        if (value !== undefined && value !== null && value !== '') {
+            query.set(key, value);
+        }
+    });
+    if (cursor) {
+        query.set('cursor', cursor);
+    }
+
+    return fetch(`${CARD_LIST_URL}?${query.toString()}`)
+        .then(response => response.json())
+        .then(data => {
+            if (!data.success) {
+                throw new Error(data.message || 'Failed to load cards');
+            }
+            return data;
+        });
+}
+
+// 31-120: Append-only list, loaded by a "Load more" button or when a sentinel scrolls into view
+class PagedCardList {
+    constructor(container, options) {
+        this.container = container;
+        this.list = options.list;
+        this.filters = options.filters || {};
+        this.params = options.params || (() => ({}));
+        this.nextCursor = options.nextCursor || null;
+        this.button = options.button || null;
+        this.sentinel = options.sentinel || null;
+        this.onLoad = options.onLoad || (() => {});
+        this.loading = null;
+        this.generation = 0;
+
+        if (this.button) {
+            this.button.addEventListener('click', (e) => {
+                e.preventDefault();
+                this.loadMore();
+            });
+        }
+        if (this.sentinel && 'IntersectionObserver' in window) {
+            this.observer = new IntersectionObserver(entries => {
+                if (entries.some(entry => entry.isIntersecting)) {
+                    this.loadMore();
+                }
+            }, { rootMargin: '600px 0px' });
+            this.observer.observe(this.sentinel);
+        }
+        this.updateControls();
+    }
+
+    updateControls() {
+        if (this.button) {
+            this.button.style.display = this.nextCursor ? '' : 'none';
+        }
+    }
+
+    // Resolves to false when the page could not be loaded (nextCursor is left as it was)
+    loadMore() {
+        if (!this.nextCursor || this.loading) {
+            return this.loading || Promise.resolve(true);
+        }
+        const generation = this.generation;
+        this.loading = fetchCardListPage(this.list, { ...this.filters, ...this.params() }, this.nextCursor)
+            .then(data => {
+                if (generation !== this.generation) return true;
+                this.append(data.items);
+                this.nextCursor = data.next_cursor;
+                this.onLoad(data);
+                return true;
+            })
+            .catch(error => {
+                console.error(`❌ Error loading ${this.list} cards:`, error);
+                return false;
+            })
+            .finally(() => {
+                this.loading = null;
+                this.updateControls();
+            });
+        return this.loading;
+    }
+
+    // Rejects on the first page that fails rather than asking for it again
+    async loadAll() {
+        while (this.nextCursor) {
+            if (!await this.loadMore()) {
+                throw new Error(`Failed to load all ${this.list} cards`);
+            }
+        }
+    }
+
+    append(items) {
+        this.container.insertAdjacentHTML('beforeend', items.join(''));
+    }
+
+    // Replace the contents with the first page for new filters
+    reload(filters) {
+        this.filters = filters || {};
+        this.generation += 1;
+        const generation = this.generation;
+        return fetchCardListPage(this.list, { ...this.filters, ...this.params() })
+            .then(data => {
+                if (generation !== this.generation) return;
+                this.container.innerHTML = '';
+                this.append(data.items);
+                this.nextCursor = data.next_cursor;
+                this.updateControls();
+                this.onLoad(data);
+            })
+            .catch(error => console.error(`❌ Error reloading ${this.list} cards:`, error));
+    }
+}
+
+// 121-330: Virtualized list; only the chunks near the viewport are in the DOM
+// Chunks scrolled far away are replaced by spacers of their measured height, so the DOM
+// size (and the render work per scroll) stays the same however many cards have been loaded.
+class VirtualCardList {
+    constructor(container, options) {
+        this.container = container;
+        this.scroller = options.scroller || container;
+        this.list = options.list;
+        this.itemSelector = options.itemSelector;
+        this.filters = options.filters || {};
+        this.nextCursor = options.nextCursor || null;
+        this.emptyHtml = options.emptyHtml || '';
+        this.onRender = options.onRender || (() => {});
+        this.onLoad = options.onLoad || (() => {});
+        this.chunkSize = options.chunkSize || 50;
+        this.loading = null;
+        this.generation = 0;
+        this.frozen = false;
+        this.failures = 0;
+        this.retryAt = 0;
+
+        // Adopt the server-rendered first page
+        this.items = Array.from(container.querySelectorAll(this.itemSelector)).map(element => ({
+            id: element.dataset.cardId,
+            html: element.outerHTML
+        }));
+        this.heights = [];
+        this.first = 0;
+        this.last = -1;
+
+        this.container.style.position = 'relative';
+        this.container.style.overflowAnchor = 'none';
+        this.topSpacer = this.createSpacer();
+        this.bottomSpacer = this.createSpacer();
+
+        this.alignChunks();
+        this.render(0, Math.min(this.chunkCount() - 1, 0));
+
+        this.scheduled = false;
+        this.scroller.addEventListener('scroll', () => this.schedule(), { passive: true });
+        window.addEventListener('resize', () => {
+            this.alignChunks();
+            this.heights = [];
+            this.render(this.first, this.last, true);
+        });
+        this.schedule();
+    }
+
+    createSpacer() {
+        const spacer = document.createElement('div');
+        spacer.className = 'virtual-spacer';
+        spacer.style.display = 'none';
+        return spacer;
+    }
+
+    // Chunks of a grid hold whole rows so measured heights add up
+    alignChunks() {
+        const columns = getComputedStyle(this.container).gridTemplateColumns;
+        const count = columns && columns !== 'none' ? columns.split(' ').length : 1;
+        this.chunkSize = Math.max(count, Math.ceil(this.chunkSize / count) * count);
+    }
+
+    chunkCount() {
+        return Math.ceil(this.items.length / this.chunkSize);
+    }
+
+    gap() {
+        const style = getComputedStyle(this.container);
+        return parseFloat(style.rowGap) || 0;
+    }
+
+    averageHeight() {
+        const known = this.heights.filter(height => height > 0);
+        return known.length ? known.reduce((sum, height) => sum + height, 0) / known.length : 0;
+    }
+
+    chunkHeight(index) {
+        return this.heights[index] || this.averageHeight();
+    }
+
+    // Record the height of every rendered chunk, gap to the next chunk included
+    measure() {
+        const elements = Array.from(this.container.querySelectorAll(this.itemSelector));
+        for (let chunk = this.first; chunk <= this.last; chunk++) {
+            const offset = (chunk - this.first) * this.chunkSize;
+            const firstElement = elements[offset];
+            const nextElement = elements[offset + this.chunkSize] || this.bottomSpacer;
+            if (firstElement && nextElement) {
+                this.heights[chunk] = nextElement.offsetTop - firstElement.offsetTop;
+            }
+        }
+    }
+
+    // The bottom spacer always stays in the layout so the last chunk can be measured against it
+    setSpacer(spacer, height) {
+        const size = Math.max(0, height - this.gap());
+        spacer.style.display = height > 0 || spacer === this.bottomSpacer ? '' : 'none';
+        spacer.style.height = `${size}px`;
+    }
+
+    render(first, last, force = false) {
+        if (!force && first === this.first && last === this.last) return;
+        if (this.last >= this.first) {
+            this.measure();
+        }
+        this.first = first;
+        this.last = last;
+
+        let above = 0;
+        for (let chunk = 0; chunk < first; chunk++) above += this.chunkHeight(chunk);
+        let below = 0;
+        for (let chunk = last + 1; chunk < this.chunkCount(); chunk++) below += this.chunkHeight(chunk);
+
+        const visible = this.items.slice(first * this.chunkSize, (last + 1) * this.chunkSize);
+        this.container.innerHTML = '';
+        this.container.appendChild(this.topSpacer);
+        if (visible.length) {
+            this.container.insertAdjacentHTML('beforeend', visible.map(item => item.html).join(''));
+        } else if (!this.items.length && this.emptyHtml) {
+            const emptyHtml = typeof this.emptyHtml === 'function' ? this.emptyHtml() : this.emptyHtml;
+            this.container.insertAdjacentHTML('beforeend', emptyHtml);
+        }
+        this.container.appendChild(this.bottomSpacer);
+        this.setSpacer(this.topSpacer, above);
+        this.setSpacer(this.bottomSpacer, below);
+
+        this.measure();
+        this.onRender(this.container.querySelectorAll(this.itemSelector));
+    }
+
+    schedule() {
+        if (this.scheduled) return;
+        this.scheduled = true;
+        requestAnimationFrame(() => {
+            this.scheduled = false;
+            this.update();
+        });
+    }
+
+    viewport() {
+        const containerTop = this.scroller === this.container ? 0
+            : this.container.getBoundingClientRect().top - this.scroller.getBoundingClientRect().top + this.scroller.scrollTop;
+        const top = this.scroller.scrollTop - containerTop;
+        const margin = this.scroller.clientHeight;
+        return { low: top - margin, high: top + this.scroller.clientHeight + margin };
+    }
+
+    update() {
+        if (this.frozen || this.scroller.offsetParent === null) return;  // Hidden views are updated when shown
+        this.measure();
+        const { low, high } = this.viewport();
+        const chunks = this.chunkCount();
+
+        let first = 0;
+        let last = -1;
+        let top = parseFloat(getComputedStyle(this.container).paddingTop) || 0;
+        for (let chunk = 0; chunk < chunks; chunk++) {
+            const bottom = top + this.chunkHeight(chunk);
+            if (bottom < low) first = chunk + 1;
+            if (top <= high) last = chunk;
+            top = bottom;
+        }
+        first = Math.min(first, Math.max(chunks - 1, 0));
+        last = Math.max(last, first);
+        if (chunks) {
+            this.render(first, Math.min(last, chunks - 1));
+        }
+
+        // Fetch the next page when the end of the loaded cards is near (after a failure, not
+        // before the back-off has passed and the user scrolls again)
+        if (this.nextCursor && !this.loading && top <= high && Date.now() >= this.retryAt) {
+            this.loadMore();
+        }
+    }
+
+    // Resolves to false when the page could not be loaded; auto-loading then backs off
+    loadMore() {
+        if (!this.nextCursor || this.loading) {
+            return this.loading || Promise.resolve(true);
+        }
+        const generation = this.generation;
+        this.loading = fetchCardListPage(this.list, this.filters, this.nextCursor)
+            .then(data => {
+                if (generation !== this.generation) return true;
+                this.addItems(data);
+                this.render(this.first, this.last, true);
+                this.onLoad(data);
+                this.failures = 0;
+                this.retryAt = 0;
+                return true;
+            })
+            .catch(error => {
+                console.error(`❌ Error loading ${this.list} cards:`, error);
+                this.failures += 1;
+                this.retryAt = Date.now() + Math.min(1000 * 2 ** (this.failures - 1), 30000);
+                return false;
+            })
+            .finally(() => {
+                this.loading = null;
+                this.schedule();
+            });
+        return this.loading;
+    }
+
+    addItems(data) {
+        data.items.forEach((html, index) => {
+            this.items.push({ id: String(data.ids[index]), html: html });
+        });
+        this.nextCursor = data.next_cursor;
+    }
+
+    // Replace the list with the first page for new filters
+    reload(filters) {
+        this.filters = filters || {};
+        this.generation += 1;
+        const generation = this.generation;
+        return fetchCardListPage(this.list, this.filters)
+            .then(data => {
+                if (generation !== this.generation) return;
+                this.items = [];
+                this.heights = [];
+                this.failures = 0;
+                this.retryAt = 0;
+                this.addItems(data);
+                this.scroller.scrollTop = 0;
+                this.render(0, Math.min(this.chunkCount() - 1, 0), true);
+                this.onLoad(data);
+                this.schedule();
+            })
+            .catch(error => console.error(`❌ Error reloading ${this.list} cards:`, error));
+    }
+
+    removeCard(cardId) {
+        const index = this.items.findIndex(item => item.id === String(cardId));
+        if (index === -1) return;
+        this.items.splice(index, 1);
+        this.heights.length = Math.floor(index / this.chunkSize);  // Later chunks shift; measure them again
+        this.render(this.first, Math.min(this.last, Math.max(this.chunkCount() - 1, 0)), true);
+    }
+
+    // Keep the DOM still while a card is being dragged
+    freeze() {
+        this.frozen = true;
+    }
+
+    unfreeze() {
+        this.frozen = false;
+        this.schedule();
+    }
+}
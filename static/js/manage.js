@@ -46,15 +46,14 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Initialize interface with a small delay to ensure all elements are loaded
     setTimeout(() => {
+        initializeCardLists();
         initializeManageInterface();
         setupEventListeners();
         initializeDragAndDrop();
         initializePreviewPanel();
         
-        // Populate country filter after a slight delay to ensure cards are rendered
-        setTimeout(() => {
-            populateCountryFilter();
-        }, 500);
+        // Populate country filter from the counts rendered with the page
+        populateCountryFilter();
         
         // Enhance filter dropdowns
         enhanceFilterDropdowns();
@@ -447,47 +446,157 @@ function handleSearch(e) {
     const query = e.target.value.trim();
     const clearBtn = document.getElementById('clearSearch');
     
-    if (query.length > 0) {
-        clearBtn.style.display = 'block';
-        performSearch(query);
+    clearBtn.style.display = query.length > 0 ? 'block' : 'none';
+    scheduleCardListReload();
+}
+
+// 81-120: Paged card lists; search and filters run on the server over all cards
+const FILTER_DEBOUNCE_MS = 250;
+let unsortedList = null;
+let galleryList = null;
+const labelLists = {};
+const cardListTotals = { unsorted: 0, sorted: 0, gallery: 0, labels: {} };
+let filterReloadTimer = null;
+
+function initializeCardLists() {
+    const readCount = (element) => parseInt((element && element.textContent || '').replace(/[()]/g, '')) || 0;
+    cardListTotals.unsorted = readCount(document.getElementById('unsortedCount'));
+    cardListTotals.sorted = readCount(document.getElementById('sortedCount'));
+    cardListTotals.gallery = readCount(document.getElementById('galleryTotalCount'));
+    
+    const unsortedContainer = document.getElementById('unsortedContainer');
+    if (unsortedContainer) {
+        unsortedList = new VirtualCardList(unsortedContainer, {
+            list: 'unsorted',
+            itemSelector: '.card-item',
+            nextCursor: unsortedContainer.dataset.nextCursor,
+            emptyHtml: unsortedEmptyHtml,
+            onRender: cards => applyRenderedCardState(cards),
+            onLoad: data => updateListTotal('unsorted', data)
+        });
+    }
+    
+    const galleryGrid = document.getElementById('galleryGrid');
+    if (galleryGrid) {
+        galleryList = new VirtualCardList(galleryGrid, {
+            list: 'all',
+            scroller: galleryGrid.closest('.gallery-grid-container'),
+            itemSelector: '.gallery-card-item',
+            nextCursor: galleryGrid.dataset.nextCursor,
+            emptyHtml: '<div class="empty-state"><i class="fas fa-search"></i><h3>No matching cards</h3></div>',
+            onRender: cards => applyGallerySelection(cards),
+            onLoad: data => updateListTotal('gallery', data)
+        });
+    }
+    
+    document.querySelectorAll('.label-cards').forEach(container => {
+        const labelId = container.dataset.labelId;
+        const labelGroup = container.closest('.label-group');
+        cardListTotals.labels[labelId] = readCount(labelGroup.querySelector('.label-count'));
+        labelLists[labelId] = new PagedCardList(container, {
+            list: 'label',
+            params: () => ({ label_id: labelId }),
+            nextCursor: container.dataset.nextCursor,
+            button: labelGroup.querySelector('.load-more-btn'),
+            onLoad: data => {
+                applyRenderedCardState(container.querySelectorAll('.card-item'));
+                updateListTotal('label', data, labelId);
+            }
+        });
+    });
+    
+    console.log('✅ Card lists initialized');
+}
+
+function unsortedEmptyHtml() {
+    if (hasActiveFilters()) {
+        return `
+            <div class="empty-state">
+                <i class="fas fa-search"></i>
+                <h3>No matching cards</h3>
+                <p>No unsorted cards match the current search and filters.</p>
+            </div>`;
+    }
+    return `
+        <div class="empty-state">
+            <i class="fas fa-check-circle"></i>
+            <h3>All cards are organized!</h3>
+            <p>Great job! All your business cards have been sorted into labels.</p>
+        </div>`;
+}
+
+// Rendered cards start from server markup; restore client-side state on them
+function applyRenderedCardState(cards) {
+    loadAllApprovalStatuses(cards);
+    const query = document.getElementById('searchInput')?.value.trim();
+    if (query) {
+        cards.forEach(card => highlightSearchTerms(card, query));
+    }
+}
+
+function applyGallerySelection(cards) {
+    if (!currentGalleryCard) return;
+    cards.forEach(card => {
+        card.classList.toggle('selected', card.dataset.cardId === String(currentGalleryCard.id));
+    });
+}
+
+// First pages report the total matching the current filters
+function updateListTotal(list, data, labelId) {
+    if (data.total === undefined) return;
+    if (list === 'label') {
+        cardListTotals.labels[labelId] = data.total;
+        const labelCount = document.querySelector(`.label-group[data-label-id="${labelId}"] .label-count`);
+        if (labelCount) {
+            labelCount.textContent = `(${data.total})`;
+        }
+        cardListTotals.sorted = visibleLabelIds().reduce((sum, id) => sum + (cardListTotals.labels[id] || 0), 0);
     } else {
-        clearBtn.style.display = 'none';
-        showAllCards();
+        cardListTotals[list] = data.total;
     }
+    updateCounters();
 }
 
-function performSearch(query) {
-    // Search both normal view cards and gallery view cards
-    const normalCards = document.querySelectorAll('.card-item');
-    const galleryCards = document.querySelectorAll('.gallery-card-item');
-    const allCards = [...normalCards, ...galleryCards];
-    const queryLower = query.toLowerCase();
+function currentFilters() {
+    return {
+        q: document.getElementById('searchInput')?.value.trim() || '',
+        label_id: document.getElementById('labelFilter')?.value || '',
+        country: document.getElementById('countryFilter')?.value || ''
+    };
+}
+
+function hasActiveFilters() {
+    return Object.values(currentFilters()).some(value => value !== '');
+}
+
+function visibleLabelIds() {
+    const labelId = currentFilters().label_id;
+    return Object.keys(labelLists).filter(id => !labelId || id === labelId);
+}
+
+function scheduleCardListReload() {
+    clearTimeout(filterReloadTimer);
+    filterReloadTimer = setTimeout(reloadCardLists, FILTER_DEBOUNCE_MS);
+}
+
+// Reload every list from its first page with the current search and filters
+function reloadCardLists() {
+    clearTimeout(filterReloadTimer);
+    const filters = currentFilters();
+    console.log('🔍 Reloading card lists with filters:', filters);
     
-    allCards.forEach(card => {
-        const cardData = safelyCallFunction(parseCardData, card);
-        if (!cardData) return; // Skip if parsing failed
-        
-        const searchableText = [
-            cardData.name || '',
-            cardData.company || '',
-            cardData.email || '',
-            cardData.phone || '',
-            cardData.country || '',
-            cardData.designation || '',
-            cardData.event_name || '',
-            cardData.event_host || '',
-            cardData.event_location || ''
-        ].join(' ').toLowerCase();
-        
-        if (searchableText.includes(queryLower)) {
-            card.style.display = 'block';
-            highlightSearchTerms(card, query);
-        } else {
-            card.style.display = 'none';
+    const reloads = [];
+    if (unsortedList) reloads.push(unsortedList.reload(filters));
+    if (galleryList) reloads.push(galleryList.reload(filters));
+    Object.entries(labelLists).forEach(([labelId, list]) => {
+        const labelGroup = list.container.closest('.label-group');
+        const visible = !filters.label_id || filters.label_id === labelId;
+        labelGroup.style.display = visible ? '' : 'none';
+        if (visible) {
+            reloads.push(list.reload(filters));
         }
     });
-    
-    updateVisibleCounters();
+    return Promise.all(reloads);
 }
 
 function highlightSearchTerms(card, query) {
@@ -507,25 +616,7 @@ function clearSearchInput() {
     
     searchInput.value = '';
     clearBtn.style.display = 'none';
-    showAllCards();
-    removeSearchHighlights();
-}
-
-function removeSearchHighlights() {
-    const highlighted = document.querySelectorAll('.search-highlight');
-    highlighted.forEach(el => el.classList.remove('search-highlight'));
-}
-
-function showAllCards() {
-    // Show both normal view cards and gallery view cards
-    const normalCards = document.querySelectorAll('.card-item');
-    const galleryCards = document.querySelectorAll('.gallery-card-item');
-    const allCards = [...normalCards, ...galleryCards];
-    
-    allCards.forEach(card => {
-        card.style.display = 'block';
-    });
-    updateVisibleCounters();
+    reloadCardLists();
 }
 
 // 121-160: Filter functionality
@@ -536,114 +627,35 @@ function populateCountryFilter() {
         return;
     }
     
-    console.log('🌍 Populating country filter with counts...');
-    
     // Clear existing options except "All Countries"
     while (countryFilter.children.length > 1) {
         countryFilter.removeChild(countryFilter.lastChild);
     }
     
-    // Get all cards and count by country (both normal and gallery view)
-    const normalCards = document.querySelectorAll('.card-item');
-    const galleryCards = document.querySelectorAll('.gallery-card-item');
-    // Use Set to avoid double counting the same card
-    const allCardIds = new Set();
-    const uniqueCards = [];
-    
-    [...normalCards, ...galleryCards].forEach(card => {
-        const cardId = card.dataset.cardId;
-        if (cardId && !allCardIds.has(cardId)) {
-            allCardIds.add(cardId);
-            uniqueCards.push(card);
-        }
+    // Counts over all cards come with the page; option values are the stored country codes
+    getCountryCounts().forEach(({ country, flag, count }) => {
+        const countryData = COUNTRIES.find(c => c.flag === flag);
+        const name = country === 'UNKNOWN' ? 'Unknown' : (countryData ? countryData.name : country);
+        
+        const option = document.createElement('option');
+        option.value = country;
+        option.textContent = `${flag} ${name} (${count})`;
+        option.dataset.flag = flag;
+        countryFilter.appendChild(option);
     });
     
-    const countryCount = new Map();
-    
-    console.log(`Found ${uniqueCards.length} unique cards to analyze`);
-    
-    if (uniqueCards.length === 0) {
-        console.warn('No cards found for country analysis');
-        return;
+    console.log(`✅ Country filter populated with ${countryFilter.children.length - 1} countries`);
+}
+
+function getCountryCounts() {
+    const element = document.getElementById('countryCounts');
+    if (!element) return [];
+    try {
+        return JSON.parse(element.textContent);
+    } catch (error) {
+        console.error('Error reading country counts:', error);
+        return [];
     }
-    
-    uniqueCards.forEach((card, index) => {
-        try {
-            const cardData = parseCardData(card);
-            console.log(`Card ${index + 1}:`, cardData);
-            
-            if (cardData) {
-                let country = 'Unknown';
-                
-                // Try to get country from different sources
-                if (cardData.country && cardData.country !== 'UNKNOWN' && cardData.country.toUpperCase() !== 'UNKNOWN' && cardData.country.trim() !== '') {
-                    // If it's a country code, convert to country name
-                    const countryCode = cardData.country.toUpperCase();
-                    const countryCodeMapping = {
-                        'IN': 'India', 'US': 'United States', 'GB': 'United Kingdom', 'DE': 'Germany',
-                        'FR': 'France', 'IT': 'Italy', 'NL': 'Netherlands', 'SE': 'Sweden', 'AU': 'Australia',
-                        'CA': 'Canada', 'JP': 'Japan', 'CN': 'China', 'RU': 'Russia', 'BR': 'Brazil'
-                    };
-                    
-                    if (countryCodeMapping[countryCode]) {
-                        country = countryCodeMapping[countryCode];
-                    } else if (cardData.country.length > 2) {
-                        // It's already a country name
-                        country = cardData.country;
-                    } else {
-                        country = cardData.country;
-                    }
-                } else {
-                    // Try to extract from flag if available
-                    const flagElement = card.querySelector('.country-flag');
-                    if (flagElement && flagElement.textContent !== '🌍') {
-                        // Try to match flag to country name
-                        const flag = flagElement.textContent;
-                        const countryFromFlag = COUNTRIES.find(c => c.flag === flag);
-                        if (countryFromFlag) {
-                            country = countryFromFlag.name;
-                        }
-                    }
-                }
-                
-                console.log(`Card ${index + 1} country:`, country);
-                countryCount.set(country, (countryCount.get(country) || 0) + 1);
-            }
-        } catch (error) {
-            console.error(`Error processing card ${index + 1}:`, error);
-        }
-    });
-    
-    console.log('Country counts:', Array.from(countryCount.entries()));
-    
-    // Convert to array and sort by count (descending) then by name
-    const sortedCountries = Array.from(countryCount.entries())
-        .sort((a, b) => {
-            if (b[1] !== a[1]) return b[1] - a[1]; // Sort by count descending
-            return a[0].localeCompare(b[0]); // Then by name ascending
-        });
-    
-    console.log('Sorted countries:', sortedCountries);
-    
-    // Add options with flags and counts
-    sortedCountries.forEach(([country, count]) => {
-        try {
-            const countryData = COUNTRIES.find(c => c.name.toLowerCase() === country.toLowerCase());
-            const flag = countryData ? countryData.flag : '🌍';
-            
-            const option = document.createElement('option');
-            option.value = country;
-            option.textContent = `${flag} ${country} (${count})`;
-            option.dataset.flag = flag;
-            countryFilter.appendChild(option);
-            
-            console.log(`Added option: ${flag} ${country} (${count})`);
-        } catch (error) {
-            console.error(`Error adding country option for ${country}:`, error);
-        }
-    });
-    
-    console.log(`✅ Country filter populated with ${sortedCountries.length} countries`);
 }
 
 function handleFilterChange(event) {
@@ -655,8 +667,6 @@ function handleFilterChange(event) {
     const selectedLabel = labelFilter ? labelFilter.value : '';
     const selectedCountry = countryFilter ? countryFilter.value : '';
     
-    console.log('Filter values:', { selectedLabel, selectedCountry });
-    
     // Show feedback to user
     if (event && event.target) {
         const filterType = event.target.id === 'labelFilter' ? 'label' : 'country';
@@ -675,86 +685,12 @@ function handleFilterChange(event) {
 function filterCards(labelId, country) {
     console.log('🎯 Filtering cards with:', { labelId, country });
     
-    // Filter both normal view cards and gallery view cards
-    const normalCards = document.querySelectorAll('.card-item');
-    const galleryCards = document.querySelectorAll('.gallery-card-item');
-    const allCards = [...normalCards, ...galleryCards];
-    
-    let visibleCount = 0;
-    let hiddenCount = 0;
-    
-    allCards.forEach((card, index) => {
-        try {
-            const cardData = parseCardData(card);
-            if (!cardData) {
-                console.warn(`Skipping card ${index} - failed to parse data`);
-                return;
-            }
-            
-            let show = true;
-            
-            // Filter by label
-            if (labelId && labelId !== '') {
-                if (cardData.label_id != labelId) {
-                    show = false;
-                    console.log(`Card ${cardData.id} hidden by label filter: ${cardData.label_id} != ${labelId}`);
-                }
-            }
-        
-        // Filter by country
-        if (country && country !== '') {
-            let cardCountry = 'Unknown';
-            
-            // Convert card country code to name if needed
-            if (cardData.country && cardData.country !== 'UNKNOWN' && cardData.country.toUpperCase() !== 'UNKNOWN' && cardData.country.trim() !== '') {
-                const countryCode = cardData.country.toUpperCase();
-                const countryCodeMapping = {
-                    'IN': 'India', 'US': 'United States', 'GB': 'United Kingdom', 'DE': 'Germany',
-                    'FR': 'France', 'IT': 'Italy', 'NL': 'Netherlands', 'SE': 'Sweden', 'AU': 'Australia',
-                    'CA': 'Canada', 'JP': 'Japan', 'CN': 'China', 'RU': 'Russia', 'BR': 'Brazil'
-                };
-                
-                if (countryCodeMapping[countryCode]) {
-                    cardCountry = countryCodeMapping[countryCode];
-                } else if (cardData.country.length > 2) {
-                    cardCountry = cardData.country;
-                } else {
-                    cardCountry = cardData.country;
-                }
-            } else {
-                // Card has no country or UNKNOWN country
-                cardCountry = 'Unknown';
-            }
-            
-            console.log(`Card ${cardData.id} country comparison: "${cardCountry}" vs filter "${country}"`);
-            
-            if (cardCountry !== country) {
-                show = false;
-                console.log(`Card ${cardData.id} hidden by country filter: ${cardCountry} != ${country}`);
-            }
-        }
-        
-        // Apply visibility
-        if (show) {
-            card.style.display = 'block';
-            visibleCount++;
-        } else {
-            card.style.display = 'none';
-            hiddenCount++;
-        }
-        } catch (error) {
-            console.error(`Error filtering card ${index}:`, error);
+    reloadCardLists().then(() => {
+        if (labelId || country) {
+            const matching = cardListTotals.unsorted + cardListTotals.sorted;
+            showToast(`Found ${matching} matching cards`, 'info');
         }
     });
-    
-    console.log(`Filter results: ${visibleCount} visible, ${hiddenCount} hidden`);
-    
-    updateVisibleCounters();
-    
-    // Show results to user if any filters are active
-    if (labelId || country) {
-        showToast(`Found ${visibleCount} matching cards`, 'info');
-    }
 }
 
 function resetAllFilters() {
@@ -765,48 +701,15 @@ function resetAllFilters() {
     const searchInput = document.getElementById('searchInput');
     const clearBtn = document.getElementById('clearSearch');
     
-    // Reset label filter to "All Labels"
-    if (labelFilter) {
-        labelFilter.value = '';
-        console.log('✅ Label filter reset to "All Labels"');
-    } else {
-        console.warn('❌ Label filter element not found');
-    }
+    if (labelFilter) labelFilter.value = '';
+    if (countryFilter) countryFilter.value = '';
+    if (searchInput) searchInput.value = '';
+    if (clearBtn) clearBtn.style.display = 'none';
     
-    // Reset country filter to "All Countries"
-    if (countryFilter) {
-        countryFilter.value = '';
-        console.log('✅ Country filter reset to "All Countries"');
-    } else {
-        console.warn('❌ Country filter element not found');
-    }
-    
-    // Clear search input
-    if (searchInput) {
-        searchInput.value = '';
-        console.log('✅ Search input cleared');
-    } else {
-        console.warn('❌ Search input element not found');
-    }
-    
-    // Hide clear search button
-    if (clearBtn) {
-        clearBtn.style.display = 'none';
-    }
-    
-    // Show all cards
-    showAllCards();
-    
-    // Remove search highlights
-    removeSearchHighlights();
-    
-    // Update counters
-    updateCounters();
-    
-    // Show success feedback
-    showToast('All filters reset successfully!', 'success');
-    
-    console.log('✅ All filters reset completed');
+    reloadCardLists().then(() => {
+        showToast('All filters reset successfully!', 'success');
+        console.log('✅ All filters reset completed');
+    });
 }
 
 function enhanceFilterDropdowns() {
@@ -1551,8 +1454,7 @@ function handleDeleteCard(button) {
         if (data.success) {
             showSuccessToast('Card deleted successfully!');
             // Remove the card from the UI
-            card.remove();
-            updateCounters();
+            removeCardFromLists(cardData.id);
         } else {
             showErrorToast(data.message || 'Failed to delete card');
         }
@@ -1581,23 +1483,41 @@ function handleToggleLabel(button) {
     }
 }
 
+// Counts cover every card matching the filters, not only the loaded pages
 function updateCounters() {
-    const unsortedCards = document.querySelectorAll('#unsortedContainer .card-item:not([style*="display: none"])');
-    const sortedCards = document.querySelectorAll('.labeled-card:not([style*="display: none"])');
-    
-    const unsortedCount = document.getElementById('unsortedCount');
-    const sortedCount = document.getElementById('sortedCount');
-    
-    if (unsortedCount) {
-        unsortedCount.textContent = unsortedCards.length;
-    }
-    
-    if (sortedCount) {
-        sortedCount.textContent = sortedCards.length;
-    }
+    const counters = {
+        unsortedCount: cardListTotals.unsorted,
+        sortedCount: cardListTotals.sorted,
+        galleryTotalCount: cardListTotals.gallery
+    };
+    Object.entries(counters).forEach(([id, total]) => {
+        const counter = document.getElementById(id);
+        if (counter) {
+            counter.textContent = total;
+        }
+    });
 }
 
-function updateVisibleCounters() {
+// Drop a deleted card from every list and count it out of the totals
+function removeCardFromLists(cardId) {
+    const labeled = document.querySelector(`.labeled-card[data-card-id="${cardId}"]`);
+    if (labeled) {
+        const labelId = labeled.closest('.label-cards').dataset.labelId;
+        labeled.remove();
+        cardListTotals.labels[labelId] = Math.max(0, (cardListTotals.labels[labelId] || 1) - 1);
+        cardListTotals.sorted = Math.max(0, cardListTotals.sorted - 1);
+        const labelCount = document.querySelector(`.label-group[data-label-id="${labelId}"] .label-count`);
+        if (labelCount) {
+            labelCount.textContent = `(${cardListTotals.labels[labelId]})`;
+        }
+    } else if (unsortedList && unsortedList.items.some(item => item.id === String(cardId))) {
+        unsortedList.removeCard(cardId);
+        cardListTotals.unsorted = Math.max(0, cardListTotals.unsorted - 1);
+    }
+    if (galleryList && galleryList.items.some(item => item.id === String(cardId))) {
+        galleryList.removeCard(cardId);
+        cardListTotals.gallery = Math.max(0, cardListTotals.gallery - 1);
+    }
     updateCounters();
 }
 
@@ -1725,22 +1645,10 @@ function populateExportCountries() {
     const container = document.getElementById('countryCheckboxes');
     if (!container) return;
     
-    // Get unique countries from current cards
-    const cards = document.querySelectorAll('.card-item');
+    // Counts over all cards come with the page
     const countryStats = {};
-    
-    cards.forEach(card => {
-        try {
-            const cardData = parseCardData(card);
-            if (cardData && cardData.country) {
-                const country = cardData.country;
-                const flag = cardData.flag || '🌍';
-                const key = `${flag} ${country}`;
-                countryStats[key] = (countryStats[key] || 0) + 1;
-            }
-        } catch (e) {
-            console.error('Error parsing card for country stats:', e);
-        }
+    getCountryCounts().forEach(({ country, flag, count }) => {
+        countryStats[`${flag} ${country}`] = count;
     });
     
     container.innerHTML = '';
@@ -1967,8 +1875,10 @@ function initializeDragAndDrop() {
         new Sortable(unsortedContainer, {
             group: 'cards',
             animation: 150,
+            draggable: '.card-item',
             onStart: function(evt) {
                 evt.item.classList.add('dragging');
+                if (unsortedList) unsortedList.freeze();
                 
                 // Check if card is approved for dragging
                 const cardId = evt.item.dataset.cardId;
@@ -1985,6 +1895,7 @@ function initializeDragAndDrop() {
             },
             onEnd: function(evt) {
                 evt.item.classList.remove('dragging');
+                if (unsortedList) unsortedList.unfreeze();
                 // Reset styling
                 evt.item.style.opacity = '';
                 evt.item.style.border = '';
@@ -2015,6 +1926,7 @@ function initializeDragAndDrop() {
         new Sortable(container, {
             group: 'cards',
             animation: 150,
+            draggable: '.card-item',
             onStart: function(evt) {
                 evt.item.classList.add('dragging');
                 
@@ -2354,8 +2266,10 @@ function populatePreviewData(card) {
     // Set image
     const previewImage = document.getElementById('previewImage');
     
-    if (previewImage && card.image_base64) {
-        previewImage.src = card.image_base64;
+    if (previewImage && (card.image_url || card.image_base64)) {
+        // Show the cacheable preview rendition; the image modal opens the original
+        previewImage.src = card.preview_url || card.image_url || card.image_base64;
+        previewImage.dataset.fullSrc = card.image_url || card.image_base64;
         previewImage.alt = `Business card for ${card.name || 'Unknown'}`;
     }
     
@@ -2610,6 +2524,7 @@ function deletePreviewCard() {
     }
     
     const cardName = currentPreviewCard.name || 'Unknown';
+    const cardId = currentPreviewCard.id;
     
     if (!confirm(`Delete the business card for "${cardName}"?\n\nThis action cannot be undone.`)) {
         return;
@@ -2617,7 +2532,7 @@ function deletePreviewCard() {
     
     showLoading('Deleting card...');
     
-    fetch(`/api/cards/${currentPreviewCard.id}`, {
+    fetch(`/api/cards/${cardId}`, {
         method: 'DELETE',
         headers: {
             'Content-Type': 'application/json',
@@ -2631,12 +2546,7 @@ function deletePreviewCard() {
             closePreview();
             
             // Remove the card from the UI
-            const cardElement = document.querySelector(`[data-card-id="${currentPreviewCard.id}"]`);
-            if (cardElement) {
-                cardElement.remove();
-            }
-            
-            updateCounters();
+            removeCardFromLists(cardId);
         } else {
             showToast(data.message || 'Failed to delete card', 'error');
         }
@@ -2717,15 +2627,25 @@ function switchViewMode(mode) {
 
 // Gallery View Functions
 let currentGalleryCard = null;
+let galleryViewInitialized = false;
 
 function initializeGalleryView() {
     console.log('🖼️ Initializing gallery view');
     
-    // Add event listeners to gallery cards
-    const galleryCards = document.querySelectorAll('.gallery-card-item');
-    galleryCards.forEach(card => {
-        card.addEventListener('click', () => selectGalleryCard(card));
-    });
+    if (galleryViewInitialized) {
+        if (galleryList) galleryList.schedule();  // Render the chunks for the now visible grid
+        return;
+    }
+    galleryViewInitialized = true;
+    
+    // One delegated listener covers cards rendered later by the virtual list
+    const galleryGrid = document.getElementById('galleryGrid');
+    if (galleryGrid) {
+        galleryGrid.addEventListener('click', (e) => {
+            const card = e.target.closest('.gallery-card-item');
+            if (card) selectGalleryCard(card);
+        });
+    }
     
     // Add event listeners to gallery action buttons
     const galleryEditBtn = document.getElementById('galleryEditBtn');
@@ -2780,8 +2700,8 @@ function populateGalleryPreview(card) {
     
     // Set image
     const previewImage = document.getElementById('galleryPreviewImage');
-    if (previewImage && card.image_base64) {
-        previewImage.src = card.image_base64;
+    if (previewImage && (card.preview_url || card.image_base64)) {
+        previewImage.src = card.preview_url || card.image_base64;
         previewImage.alt = `Business card for ${card.name || 'Unknown'}`;
     }
     
@@ -2969,11 +2889,11 @@ function loadApprovalStatusLocally(cardId) {
 }
 
 // Load all saved approval statuses
-function loadAllApprovalStatuses() {
-    const cards = document.querySelectorAll('.card-item[data-card-id]');
+function loadAllApprovalStatuses(cards = document.querySelectorAll('.card-item[data-card-id]')) {
+    const approvalData = JSON.parse(localStorage.getItem('cardApprovalStatus') || '{}');
     cards.forEach(card => {
         const cardId = card.dataset.cardId;
-        const savedStatus = loadApprovalStatusLocally(cardId);
+        const savedStatus = approvalData[cardId] || 'pending';
         
         const indicator = card.querySelector('.status-indicator');
         if (indicator) {
@@ -2988,7 +2908,7 @@ function loadAllApprovalStatuses() {
         }
     });
     
-    console.log('✅ All approval statuses loaded and visual styling applied');
+    console.log(`✅ Approval statuses applied to ${cards.length} cards`);
 }
 
 // Initialize on DOM load
@@ -3023,7 +2943,7 @@ function openImageModal() {
     const imageModal = document.getElementById('imageModal');
     
     if (previewImage && modalImage && imageModal) {
-        modalImage.src = previewImage.src;
+        modalImage.src = previewImage.dataset.fullSrc || previewImage.src;
         modalImage.alt = previewImage.alt;
         
         if (modalFilename) {
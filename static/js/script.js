@@ -267,13 +267,19 @@ document.addEventListener('DOMContentLoaded', function() {
         // Show enhanced loading with file count
         showLoadingOverlay();
         updateLoadingMessage(`Processing ${fileCount} file${fileCount !== 1 ? 's' : ''}...`);
-        animateProgressBar();
+        setProgress(0);
 
         const formData = new FormData();
         selectedFiles.forEach(fileObj => {
             formData.append('files', fileObj.file);
         });
 
+        // Let the server crop each card out of multi-card flatbed scans
+        const segmentSheets = document.getElementById('segmentSheets');
+        if (segmentSheets && segmentSheets.checked) {
+            formData.append('segment', 'true');
+        }
+
         console.log(`🚀 Starting bulk upload of ${fileCount} files`);
 
         // Start immediate upload for bulk processing
@@ -288,18 +294,21 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
     function submitFormData(formData) {
-        fetch(uploadForm.action, {
+        // Queue the upload as a background job, then poll its real progress
+        fetch('/api/upload', {
             method: 'POST',
             body: formData
         })
-        .then(response => {
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
+        .then(response => response.json().then(data => ({ ok: response.ok, data })))
+        .then(({ ok, data }) => {
+            if (!ok || !data.job_id) {
+                throw new Error(data.error || 'Upload was not accepted');
             }
-            return response.text();
+            console.log(`📥 Upload accepted as job ${data.job_id}`);
+            return pollJobProgress(data.job_id);
         })
-        .then(html => {
-            handleUploadSuccess(html);
+        .then(job => {
+            handleUploadSuccess(job);
         })
         .catch(error => {
             handleUploadError(error);
@@ -310,27 +319,56 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    function pollJobProgress(jobId) {
+        return new Promise((resolve, reject) => {
+            const poll = () => {
+                fetch(`/api/progress/${jobId}`)
+                    .then(response => {
+                        if (!response.ok) {
+                            throw new Error(`HTTP error! status: ${response.status}`);
+                        }
+                        return response.json();
+                    })
+                    .then(job => {
+                        setProgress(job.progress);
+                        let message = job.message;
+                        if (job.status === 'running' && job.eta_seconds) {
+                            message += ` (about ${Math.ceil(job.eta_seconds)}s left)`;
+                        }
+                        updateLoadingMessage(message);
+
+                        if (job.status === 'completed' || job.status === 'failed') {
+                            resolve(job);
+                        } else {
+                            setTimeout(poll, 1000);
+                        }
+                    })
+                    .catch(reject);
+            };
+            poll();
+        });
+    }
+
     // 181-200: Upload response handling
-    function handleUploadSuccess(html) {
-        // Parse response for flash messages
-        const tempDiv = document.createElement('div');
-        tempDiv.innerHTML = html;
-        const messages = tempDiv.querySelectorAll('.alert');
-
-        if (messages.length > 0) {
-            updateFlashMessages(messages);
-            
-            // Check for success messages
-            const successMessages = tempDiv.querySelectorAll('.alert-success');
-            if (successMessages.length > 0) {
-                showSuccessToast();
-                clearAllFiles();
-                loadRecentResults(); // Refresh recent results
+    function handleUploadSuccess(job) {
+        const stored = job.counts ? job.counts.stored : 0;
+        const duplicates = job.counts ? (job.counts.duplicate || 0) : 0;
+        const failed = job.counts ? job.counts.failed : 0;
+
+        if (stored > 0 || duplicates > 0) {
+            let message = `Successfully processed ${stored} visiting card${stored !== 1 ? 's' : ''}`;
+            if (duplicates > 0) {
+                message += `, merged ${duplicates} duplicate${duplicates !== 1 ? 's' : ''}`;
             }
-        } else {
-            showNotification('Files processed successfully!', 'success');
+            if (failed > 0) {
+                message += ` (${failed} failed)`;
+            }
+            showNotification(message, 'success');
+            showSuccessToast();
             clearAllFiles();
-            loadRecentResults();
+            loadRecentResults(); // Refresh recent results
+        } else {
+            showNotification('No valid data extracted from any uploaded files', 'error');
         }
 
         // Scroll to top to show messages
@@ -368,18 +406,9 @@ document.addEventListener('DOMContentLoaded', function() {
         if (progressBar) progressBar.style.width = '0%';
     }
 
-    function animateProgressBar() {
+    function setProgress(percent) {
         if (!progressBar) return;
-        
-        let width = 0;
-        const interval = setInterval(() => {
-            width += Math.random() * 15;
-            if (width >= 90) {
-                width = 90;
-                clearInterval(interval);
-            }
-            progressBar.style.width = width + '%';
-        }, 200);
+        progressBar.style.width = Math.min(100, Math.max(0, percent)) + '%';
     }
 
     function showSuccessToast() {
@@ -0,0 +1,61 @@
+"""
+Duplicate detection on upload: a shared email or phone only folds cards that name the same person
+
+Runs against a scratch database at MONGODB_URI (dropped afterwards); skipped when MongoDB is not reachable.
+
+Usage:
+    python -m pytest tests
+"""
+
+import os
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+os.environ['MONGODB_DATABASE'] = 'visiting_card_test'
+os.environ.setdefault('QUERY_STATS_ENABLED', 'False')
+
+try:
+    MongoClient(os.getenv('MONGODB_URI', 'mongodb://localhost:27017/'),
+                serverSelectionTimeoutMS=2000).admin.command('ping')
+except PyMongoError:
+    pytest.skip('MongoDB is not reachable at MONGODB_URI', allow_module_level=True)
+
+from app import mongo
+from app.contacts import contact_keys
+from app.ingest import find_upload_duplicates
+
+SWITCHBOARD = '+91 80 4000 1000'
+
+def card(name, phone='', email=''):
+    return {'name': name, 'phone': phone, 'email': email, 'company': 'Acme Pvt Ltd', 'country': 'IN'}
+
+@pytest.fixture(autouse=True)
+def scratch_cards():
+    mongo.collection.delete_many({})
+    yield mongo.collection
+    mongo.collection.database.client.drop_database(os.environ['MONGODB_DATABASE'])
+
+def store(record_id, fields):
+    mongo.collection.insert_one(dict(fields, id=record_id, **contact_keys(fields)))
+
+def test_shared_phone_with_different_names_keeps_both_cards():
+    store(1, card('Asha Rao', SWITCHBOARD))
+    matches = find_upload_duplicates([card('Vikram Shah', SWITCHBOARD), card('Meera Iyer', SWITCHBOARD)])
+    assert matches == [None, None]
+
+def test_shared_email_with_different_names_keeps_both_cards():
+    store(1, card('Asha Rao', email='info@acme.example'))
+    matches = find_upload_duplicates([card('Vikram Shah', email='Info@Acme.example')])
+    assert matches == [None]
+
+def test_shared_phone_matches_the_same_or_an_unnamed_card():
+    store(1, card('Asha Rao', SWITCHBOARD))
+    matches = find_upload_duplicates([card('ASHA  RAO', SWITCHBOARD), card('', SWITCHBOARD)])
+    assert [match and match['id'] for match in matches] == [1, 1]
+
+def test_upload_repeat_matches_the_colleague_with_the_same_name():
+    matches = find_upload_duplicates([card('Asha Rao', SWITCHBOARD), card('Vikram Shah', SWITCHBOARD),
+                                      card('Vikram Shah', SWITCHBOARD)])
+    assert matches == [None, None, 1]